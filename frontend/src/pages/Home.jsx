@@ -14,12 +14,9 @@ const Home = () => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [popularData, topRatedData] = await Promise.all([
-          movieAPI.getPopular(),
-          movieAPI.getTopRated(),
-        ]);
-        setPopular(popularData.results || popularData);
-        setTopRated(topRatedData.results || topRatedData);
+        const { rails } = await movieAPI.getHome(['popular', 'top_rated']);
+        setPopular(rails.popular);
+        setTopRated(rails.top_rated);
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
@@ -34,6 +34,10 @@ export const movieAPI = {
   // Get all movies
   getMovies: (page = 1) => api.get(`/api/movies/?page=${page}`),
   
+  // Get stored movies, one cursor page at a time (sort: 'rating' or 'newest')
+  getStoredMovies: (cursor = '', sort = 'rating') =>
+    api.get('/api/movies/', { params: cursor ? { cursor } : { source: 'stored', sort } }),
+  
   // Get movie by ID
   getMovieById: (id) => api.get(`/api/movie/${id}/`),
   
@@ -54,12 +58,20 @@ export const movieAPI = {
   
   // Get latest movies
   getLatest: () => api.get('/api/latest/'),
+  
+  // Get several home rails in one request, e.g. ['trending', 'popular'] (default: all)
+  getHome: (rails = []) =>
+    api.get('/api/home/', { params: rails.length ? { rails: rails.join(',') } : {} }),
 };
 
 export const seriesAPI = {
   // Get all series
   getSeries: (page = 1) => api.get(`/api/series/?page=${page}`),
   
+  // Get stored series, one cursor page at a time (sort: 'rating' or 'newest')
+  getStoredSeries: (cursor = '', sort = 'rating') =>
+    api.get('/api/series/', { params: cursor ? { cursor } : { source: 'stored', sort } }),
+  
   // Get series by ID
   getSeriesById: (id) => api.get(`/api/series/${id}/`),
   
@@ -75,6 +87,12 @@ export const seriesAPI = {
     api.get(`/api/series/${seriesId}/season/${seasonNumber}/episode/${episodeNumber}/`),
 };
 
+export const batchAPI = {
+  // Get many movies and series in one request; results are keyed by ID (null if unknown)
+  getDetails: (movieIds = [], seriesIds = []) =>
+    api.get('/api/batch/', { params: { movies: movieIds.join(','), series: seriesIds.join(',') } }),
+};
+
 export const genreAPI = {
   // Get all genres
   getGenres: () => api.get('/api/genres/'),
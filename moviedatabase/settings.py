@@ -66,6 +66,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'moviedb.response_cache.ResponseCacheMiddleware',  # Cached responses skip the view entirely
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True 
@@ -172,16 +173,34 @@ TRAKT_CLIENT_ID = os.environ.get('TRAKT_CLIENT_ID', '2ee18be50fdd6de3809e54c7415
 TRAKT_CLIENT_SECRET = os.environ.get('TRAKT_CLIENT_SECRET', 'affbb6723f87ca290c18c5b414af351e6355af55a101bbb2fecf0af15333337a')
 
 # Cache Configuration
+# Small per-process LRU in front of an on-disk cache shared by all workers
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'moviedb.cache_backends.TieredCache',
+        'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / '.cache')),
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': int(os.environ.get('CACHE_L1_TIMEOUT', 30)),
+            'L2_BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'L2_OPTIONS': {
+                'MAX_ENTRIES': 20000,
+            },
         }
     }
 }
 
+# Seconds an upstream API response is kept (and served while refreshing) after it goes stale
+API_CACHE_STALE_TTL = int(os.environ.get('API_CACHE_STALE_TTL', 60 * 60 * 24))
+
+# Maximum number of upstream API calls a single page render runs concurrently
+API_FAN_OUT_MAX_WORKERS = int(os.environ.get('API_FAN_OUT_MAX_WORKERS', 8))
+
+# Serve the /api/ routes from moviedb.async_api_views (enable when running under ASGI)
+ASYNC_API_VIEWS = os.environ.get('ASYNC_API_VIEWS', 'False') == 'True'
+
+# Queue catalog upserts from page views and write them from a background thread (moviedb.write_behind)
+WRITE_BEHIND_ENABLED = os.environ.get('WRITE_BEHIND_ENABLED', 'True') == 'True'
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
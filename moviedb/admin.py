@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.html import format_html
-from .models import Category, Movie, Genre, Series, Season, Episode
+from .models import Category, Movie, Genre, Series, Season, Episode, SyncCheckpoint
+from .search import search_ids
 
 
 # Customize admin site header and title
@@ -25,8 +27,24 @@ class GenreAdmin(admin.ModelAdmin):
     ordering = ('name',)
 
 
+class FullTextSearchMixin:
+    """Admin search through the full-text index instead of icontains scans, plus exact ID lookups."""
+    full_text_search_limit = 500
+    
+    def get_search_results(self, request, queryset, search_term):
+        ids = search_ids(self.model, search_term, self.full_text_search_limit) if search_term else None
+        if ids is None:
+            return super().get_search_results(request, queryset, search_term)
+        
+        term = search_term.strip()
+        matches = Q(id__in=ids) | Q(imdb_id=term)
+        if term.isdigit():
+            matches |= Q(id=int(term)) | Q(tmdb_id=int(term))
+        return queryset.filter(matches), False
+
+
 @admin.register(Movie)
-class MovieAdmin(admin.ModelAdmin):
+class MovieAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Enhanced admin interface for Movie model."""
     list_display = ('id', 'title', 'poster_thumbnail', 'release_date', 'vote_average', 'runtime', 'get_genres')
     list_filter = ('release_date', 'vote_average', 'genres')
@@ -81,7 +99,7 @@ class MovieAdmin(admin.ModelAdmin):
 
 
 @admin.register(Series)
-class SeriesAdmin(admin.ModelAdmin):
+class SeriesAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Enhanced admin interface for Series model."""
     list_display = ('id', 'title', 'poster_thumbnail', 'release_date', 'vote_average', 'status', 'number_of_seasons', 'number_of_episodes')
     list_filter = ('status', 'release_date', 'vote_average', 'genres')
@@ -177,4 +195,12 @@ class EpisodeAdmin(admin.ModelAdmin):
         """Get the season number for this episode."""
         return obj.season.season_number
     get_season_number.short_description = 'Season'
-    get_season_number.admin_order_field = 'season__season_number'
\ No newline at end of file
+    get_season_number.admin_order_field = 'season__season_number'
+
+@admin.register(SyncCheckpoint)
+class SyncCheckpointAdmin(admin.ModelAdmin):
+    """Admin interface for SyncCheckpoint model."""
+    list_display = ('name', 'state', 'updated_at')
+    search_fields = ('name',)
+    readonly_fields = ('updated_at',)
+    ordering = ('name',)
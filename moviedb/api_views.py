@@ -3,26 +3,50 @@ API Views for React Frontend
 Returns JSON responses for all endpoints
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
 from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import add_never_cache_headers
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
 from .models import Movie, Series, Genre, Season, Episode
+from . import utils
 from .utils import (
+    fetch_concurrently,
     fetch_movies_by_genre,
     fetch_latest_movies,
     fetch_popular_movies,
     fetch_movie_details,
     fetch_series_details,
-    search_movies,
-    search_series,
+    details_url,
+    get_cached_responses,
     GENRE_IDS,
     make_api_request,
+    series_seasons_cache_key,
+    SERIES_DETAILS_CACHE_TIMEOUT,
+    SERIES_SEASONS_CACHE_TIMEOUT,
     TMDB_API_KEY
 )
+from .catalog import CATALOG_KINDS, upsert_batch
+from .pagination import InvalidCursor, paginate_request
+from .search import search_catalog, title_payload
+from .write_behind import enqueue_upserts
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stored detail payloads younger than this are served without asking TMDb
+DETAIL_PAYLOAD_MAX_AGE = timedelta(hours=6)
+
+_detail_refresh_executor = None
+_detail_refreshing = set()
+_detail_refreshing_lock = threading.Lock()
+
 
 def serialize_movie(movie_data, include_streaming=False):
     """Convert movie data to JSON-serializable format"""
@@ -73,22 +97,374 @@ def serialize_series(series_data, include_seasons=False):
     return result
 
 
+def store_detail_payloads(kind, datas):
+    """Store TMDb details payloads as their titles' rows and serialized detail JSON; returns ({id: payload}, fetched_at)"""
+    payloads = {data['id']: serialize_detail(kind, data) for data in datas}
+    fetched_at = timezone.now()
+    model = CATALOG_KINDS[kind].model
+    with transaction.atomic():
+        upsert_batch(CATALOG_KINDS[kind], datas, detailed=True)
+        model.objects.bulk_update(
+            [model(id=pk, payload=payload, payload_fetched_at=fetched_at) for pk, payload in payloads.items()],
+            ['payload', 'payload_fetched_at'],
+        )
+    return payloads, fetched_at
+
+
+def store_detail_payload(kind, data):
+    """Store a TMDb details payload as the title's row and serialized detail JSON; returns (payload, fetched_at)"""
+    payloads, fetched_at = store_detail_payloads(kind, [data])
+    return payloads[data['id']], fetched_at
+
+
+def serialize_detail(kind, data):
+    """Detail JSON of a TMDb details payload, as store_detail_payloads stores it"""
+    return serialize_movie(data) if kind == 'movie' else serialize_series(data)
+
+
+def fetch_detail_data(kind, pk):
+    """A title's TMDb details payload, with the fields stored for its kind (None if unknown)"""
+    if kind == 'movie':
+        return fetch_movie_details(pk)
+    return fetch_series_details(pk, append_to_response='external_ids')
+
+
+def refresh_detail_payload(kind, pk):
+    """Fetch a title's details from TMDb and store them; (None, None) if TMDb has no such title"""
+    data = fetch_detail_data(kind, pk)
+    return store_detail_payload(kind, data) if data else (None, None)
+
+
+def detail_payload_is_stale(fetched_at):
+    """Whether a payload fetched at ``fetched_at`` is past DETAIL_PAYLOAD_MAX_AGE"""
+    return fetched_at is None or timezone.now() - fetched_at > DETAIL_PAYLOAD_MAX_AGE
+
+
+def refresh_detail_in_background(kind, pk):
+    """Refresh a stored detail payload on a worker thread, once at a time per title"""
+    global _detail_refresh_executor
+    
+    with _detail_refreshing_lock:
+        if (kind, pk) in _detail_refreshing:
+            return
+        _detail_refreshing.add((kind, pk))
+        if _detail_refresh_executor is None:
+            _detail_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='detail-refresh')
+    _detail_refresh_executor.submit(_refresh_detail, kind, pk)
+
+
+def _refresh_detail(kind, pk):
+    try:
+        refresh_detail_payload(kind, pk)
+    except Exception as e:
+        logger.error(f"Error refreshing {kind} {pk}: {str(e)}")
+    finally:
+        close_old_connections()
+        with _detail_refreshing_lock:
+            _detail_refreshing.discard((kind, pk))
+
+
+def load_detail_payload(kind, pk):
+    """
+    Get the detail JSON of a movie or series from its stored row.
+    
+    A fresh payload costs one primary-key read and no TMDb call. A stale
+    one is served as is and refreshed in the background; a title without
+    one is fetched from TMDb and answered right away, its payload queued
+    for storage with enqueue_upserts. Movies get their streaming URLs
+    from the row.
+    
+    Returns (payload, fetched_at), or (None, None) if the title is
+    neither stored nor known to TMDb.
+    """
+    streaming_fields = ('wootly_url', 'dood_url') if kind == 'movie' else ()
+    row = CATALOG_KINDS[kind].model.objects.filter(id=pk).values(
+        'payload', 'payload_fetched_at', *streaming_fields,
+    ).first() or {}
+    
+    payload, fetched_at = row.get('payload'), row.get('payload_fetched_at')
+    if payload is None:
+        data = fetch_detail_data(kind, pk)
+        if not data:
+            return None, None
+        enqueue_upserts(kind, [data], detailed=True)
+        payload, fetched_at = serialize_detail(kind, data), timezone.now()
+    elif detail_payload_is_stale(fetched_at):
+        refresh_detail_in_background(kind, pk)
+    
+    return {**payload, **{field: row.get(field) for field in streaming_fields}}, fetched_at
+
+
+def batch_detail_rows(kind, ids):
+    """Stored payload columns of many titles, read with one id__in query"""
+    streaming_fields = ('wootly_url', 'dood_url') if kind == 'movie' else ()
+    return CATALOG_KINDS[kind].model.objects.filter(id__in=ids).values(
+        'id', 'payload', 'payload_fetched_at', *streaming_fields,
+    )
+
+
+def stored_batch_payloads(kind, rows):
+    """Stored payloads of the rows that have one, by ID; stale ones are refreshed in the background"""
+    payloads = {}
+    for pk, row in rows.items():
+        if row['payload'] is not None:
+            payloads[pk] = row['payload']
+            if detail_payload_is_stale(row['payload_fetched_at']):
+                refresh_detail_in_background(kind, pk)
+    return payloads
+
+
+def detail_payload_url(kind, pk):
+    """TMDb details URL a title's payload is fetched from, the one fetch_detail_data requests"""
+    return details_url(kind, pk, append_to_response='external_ids' if kind == 'tv' else None)
+
+
+def batch_detail_urls(kind, ids):
+    """TMDb details URL of each ID"""
+    return {pk: detail_payload_url(kind, pk) for pk in ids}
+
+
+def batch_cache_timeout(kind):
+    """Freshness of cached TMDb details responses, as fetch_movie_details / fetch_series_details use"""
+    return SERIES_DETAILS_CACHE_TIMEOUT if kind == 'tv' else 3600
+
+
+def batch_detail_results(kind, ids, payloads, rows):
+    """Detail JSON of each requested ID (None if unknown), movies with their streaming URLs"""
+    streaming_fields = ('wootly_url', 'dood_url') if kind == 'movie' else ()
+    return {
+        pk: {**payloads[pk], **{field: rows.get(pk, {}).get(field) for field in streaming_fields}}
+        if pk in payloads else None
+        for pk in ids
+    }
+
+
+def load_detail_payloads(kind, ids):
+    """
+    Get the detail JSON of many movies or series at once.
+    
+    Stored payloads come from one id__in query (stale ones are served and
+    refreshed in the background, as in load_detail_payload). For the
+    titles without one, cached TMDb responses are read with a single
+    get_many; only the remaining misses are fetched from TMDb,
+    concurrently. New payloads are queued for storage with enqueue_upserts.
+    
+    Returns a dict of each ID to its payload, or None if TMDb has no such title.
+    """
+    rows = {row['id']: row for row in batch_detail_rows(kind, ids)}
+    payloads = stored_batch_payloads(kind, rows)
+    
+    urls = batch_detail_urls(kind, [pk for pk in ids if pk not in payloads])
+    if urls:
+        cached = get_cached_responses(list(urls.values()), batch_cache_timeout(kind))
+        fetched = fetch_concurrently({
+            pk: (lambda url=url: make_api_request(url, batch_cache_timeout(kind)))
+            for pk, url in urls.items() if url not in cached
+        }, default_factory=lambda: None)
+        datas = [data for data in [*cached.values(), *fetched.values()] if data]
+        if datas:
+            enqueue_upserts(kind, datas, detailed=True)
+            payloads.update({data['id']: serialize_detail(kind, data) for data in datas})
+    
+    return batch_detail_results(kind, ids, payloads, rows)
+
+
+def load_series_seasons(series_id):
+    """
+    Load a series' seasons and episodes from the database (empty if not stored).
+    
+    The serialized tree is cached per series until a Season or Episode row
+    changes; on a miss it is built from two flat queries however many
+    episodes the series has.
+    """
+    cache_key = series_seasons_cache_key(series_id)
+    seasons_data = cache.get(cache_key)
+    if seasons_data is not None:
+        return seasons_data
+    
+    seasons_data = [{
+        'id': season['id'],
+        'season_number': season['season_number'],
+        'name': season['name'],
+        'overview': season['overview'],
+        'air_date': season['air_date'].isoformat() if season['air_date'] else None,
+        'episode_count': season['episode_count'],
+        'episodes': [],
+    } for season in Season.objects.filter(series_id=series_id).order_by('season_number').values(
+        'id', 'season_number', 'name', 'overview', 'air_date', 'episode_count',
+    )]
+    
+    if seasons_data:
+        # One query for every episode of the series, grouped by season in Python
+        episodes_by_season = {season['id']: season['episodes'] for season in seasons_data}
+        episodes = Episode.objects.filter(season__series_id=series_id).order_by('season_id', 'episode_number').values(
+            'id', 'season_id', 'episode_number', 'name', 'overview', 'air_date', 'vote_average',
+        )
+        for episode in episodes:
+            episodes_by_season[episode.pop('season_id')].append({
+                **episode,
+                'air_date': episode['air_date'].isoformat() if episode['air_date'] else None,
+            })
+    
+    cache.set(cache_key, seasons_data, SERIES_SEASONS_CACHE_TIMEOUT)
+    return seasons_data
+
+
+# Genre names accepted by the genre endpoint, mapped to TMDb genre IDs
+API_GENRE_MAP = {
+    'action': GENRE_IDS.get('action', 28),
+    'comedy': GENRE_IDS.get('comedy', 35),
+    'horror': GENRE_IDS.get('horror', 27),
+    'scifi': GENRE_IDS.get('science_fiction', 878),
+    'romance': GENRE_IDS.get('romance', 10749),
+    'animation': GENRE_IDS.get('animation', 16),
+    'drama': GENRE_IDS.get('drama', 18),
+    'thriller': GENRE_IDS.get('thriller', 53),
+    'fantasy': GENRE_IDS.get('fantasy', 14),
+    'adventure': GENRE_IDS.get('adventure', 12),
+    'crime': GENRE_IDS.get('crime', 80),
+    'mystery': GENRE_IDS.get('mystery', 9648),
+    'family': GENRE_IDS.get('family', 10751),
+    'documentary': GENRE_IDS.get('documentary', 99),
+    'history': GENRE_IDS.get('history', 36),
+}
+
+
+# Rails returned by /api/home/, in display order; genre rails use API_GENRE_MAP names
+API_HOME_RAILS = ('trending', 'popular', 'top_rated', 'latest', 'action', 'comedy', 'horror', 'scifi', 'animation')
+
+
+def home_rail_urls(rails=API_HOME_RAILS):
+    """
+    TMDb list URL of each home rail.
+
+    The URLs are the ones the single-rail endpoints request, so a rail
+    shares its cached upstream response with /api/trending/ etc.
+    """
+    base = utils.TMDB_BASE_URL
+    today = datetime.today().strftime('%Y-%m-%d')
+    urls = {
+        'trending': f'{base}/trending/movie/week?api_key={TMDB_API_KEY}',
+        'popular': f'{base}/movie/popular?api_key={TMDB_API_KEY}&language=en-US&page=1',
+        'top_rated': f'{base}/movie/top_rated?api_key={TMDB_API_KEY}&language=en-US&page=1',
+        'latest': (
+            f'{base}/discover/movie?api_key={TMDB_API_KEY}&language=en-US'
+            f'&sort_by=release_date.desc&release_date.lte={today}&page=1'
+        ),
+    }
+    for genre_name, genre_id in API_GENRE_MAP.items():
+        urls[genre_name] = f'{base}/discover/movie?api_key={TMDB_API_KEY}&language=en-US&with_genres={genre_id}&page=1'
+    return {rail: urls[rail] for rail in rails}
+
+
+def requested_home_rails(request):
+    """
+    Rails named in ?rails= (comma separated), or all of API_HOME_RAILS.
+
+    Raises:
+        ValueError: If a name is not a known rail
+    """
+    names = [name.strip() for name in request.GET.get('rails', '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in API_HOME_RAILS and name not in API_GENRE_MAP]
+    if unknown:
+        raise ValueError(f"Unknown rails: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(names)) or API_HOME_RAILS
+
+
+def home_rails_response(results_by_rail):
+    """JsonResponse of serialized rails; marked no-store if any rail came back empty"""
+    rails = {
+        rail: [
+            serialize_movie(movie) for movie in results
+            if rail != 'latest' or movie.get('poster_path')
+        ]
+        for rail, results in results_by_rail.items()
+    }
+    return upstream_results_response({'rails': rails}, all(rails.values()))
+
+
+# Most movie and series IDs one /api/batch/ request may ask for
+BATCH_MAX_IDS = 100
+
+
+def requested_batch_ids(request):
+    """
+    Movie and series IDs from ?movies=1,2&series=3, duplicates dropped.
+
+    Returns:
+        {'movie': [...], 'tv': [...]}
+
+    Raises:
+        ValueError: If an ID is not a number, or none or too many are given
+    """
+    ids = {}
+    for kind, param in (('movie', 'movies'), ('tv', 'series')):
+        try:
+            ids[kind] = list(dict.fromkeys(int(pk) for pk in request.GET.get(param, '').split(',') if pk.strip()))
+        except ValueError:
+            raise ValueError(f'{param} must be comma-separated IDs')
+    total = len(ids['movie']) + len(ids['tv'])
+    if not total:
+        raise ValueError('movies or series parameter required')
+    if total > BATCH_MAX_IDS:
+        raise ValueError(f'At most {BATCH_MAX_IDS} IDs per request')
+    return ids
+
+
+def batch_response(movies, series):
+    """JsonResponse of batch results; marked no-store if any title could not be loaded"""
+    return upstream_results_response(
+        {'movies': movies, 'series': series},
+        all(payload is not None for payload in [*movies.values(), *series.values()]),
+    )
+
+
+def wants_stored_catalog(request):
+    """Whether a list request asks for the stored catalog (by cursor) rather than TMDb's popular list"""
+    return request.GET.get('source') == 'stored' or bool(request.GET.get('cursor'))
+
+
+def serialize_page(kind, page):
+    """Convert a CursorPage of stored movies or series to the list JSON"""
+    serialize = serialize_movie if kind == 'movie' else serialize_series
+    return {
+        'results': [serialize(title_payload(kind, row)) for row in page.items],
+        'sort': page.sort,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    }
+
+
+def upstream_results_response(data, results):
+    """JsonResponse for a TMDb-backed list; an empty list (usually TMDb failing) is marked no-store"""
+    response = JsonResponse(data)
+    if not results:
+        add_never_cache_headers(response)
+    return response
+
+
 @require_http_methods(["GET"])
 def api_movies_list(request):
-    """Get list of all movies"""
+    """Get TMDb's popular movies (?page=); ?source=stored or ?cursor= pages the stored movies instead"""
+    if wants_stored_catalog(request):
+        try:
+            return JsonResponse(serialize_page('movie', paginate_request(request, Movie.objects.all())))
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    
     try:
         page = int(request.GET.get('page', 1))
         url = f'https://api.themoviedb.org/3/movie/popular?api_key={TMDB_API_KEY}&language=en-US&page={page}'
-        data = make_api_request(url)
+        data = make_api_request(url) or {}
         
         movies = [serialize_movie(movie) for movie in data.get('results', [])]
         
-        return JsonResponse({
+        return upstream_results_response({
             'results': movies,
             'page': page,
             'total_pages': data.get('total_pages', 1),
             'total_results': data.get('total_results', 0),
-        })
+        }, movies)
     except Exception as e:
         logger.error(f"Error fetching movies: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -98,20 +474,12 @@ def api_movies_list(request):
 def api_movie_detail(request, pk):
     """Get movie details by ID"""
     try:
-        movie_data = fetch_movie_details(pk)
-        if not movie_data:
+        movie, _ = load_detail_payload('movie', pk)
+        if movie is None:
             return JsonResponse({'error': 'Movie not found'}, status=404)
         
-        # Check if movie exists in database with streaming URLs
-        try:
-            db_movie = Movie.objects.get(id=pk)
-            movie_data['wootly_url'] = db_movie.wootly_url
-            movie_data['dood_url'] = db_movie.dood_url
-        except Movie.DoesNotExist:
-            movie_data['wootly_url'] = None
-            movie_data['dood_url'] = None
-        
-        return JsonResponse(serialize_movie(movie_data, include_streaming=True))
+        # No Last-Modified: the streaming URLs change independently of the payload; the ETag covers them
+        return JsonResponse(movie)
     except Exception as e:
         logger.error(f"Error fetching movie {pk}: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -119,20 +487,26 @@ def api_movie_detail(request, pk):
 
 @require_http_methods(["GET"])
 def api_series_list(request):
-    """Get list of all TV series"""
+    """Get TMDb's popular TV series (?page=); ?source=stored or ?cursor= pages the stored series instead"""
+    if wants_stored_catalog(request):
+        try:
+            return JsonResponse(serialize_page('tv', paginate_request(request, Series.objects.all())))
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    
     try:
         page = int(request.GET.get('page', 1))
         url = f'https://api.themoviedb.org/3/tv/popular?api_key={TMDB_API_KEY}&language=en-US&page={page}'
-        data = make_api_request(url)
+        data = make_api_request(url) or {}
         
         series = [serialize_series(show) for show in data.get('results', [])]
         
-        return JsonResponse({
+        return upstream_results_response({
             'results': series,
             'page': page,
             'total_pages': data.get('total_pages', 1),
             'total_results': data.get('total_results', 0),
-        })
+        }, series)
     except Exception as e:
         logger.error(f"Error fetching series: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -142,46 +516,15 @@ def api_series_list(request):
 def api_series_detail(request, pk):
     """Get series details by ID with seasons and episodes"""
     try:
-        series_data = fetch_series_details(pk)
-        if not series_data:
+        series, fetched_at = load_detail_payload('tv', pk)
+        if series is None:
             return JsonResponse({'error': 'Series not found'}, status=404)
         
-        # Fetch seasons and episodes from database if available
-        try:
-            db_series = Series.objects.get(id=pk)
-            seasons_data = []
-            
-            # Get all seasons ordered by season number
-            seasons = Season.objects.filter(series=db_series).order_by('season_number')
-            
-            for season in seasons:
-                # Get all episodes for this season ordered by episode number
-                episodes = Episode.objects.filter(season=season).order_by('episode_number')
-                
-                episodes_data = [{
-                    'id': episode.id,
-                    'episode_number': episode.episode_number,
-                    'name': episode.name,
-                    'overview': episode.overview,
-                    'air_date': episode.air_date.isoformat() if episode.air_date else None,
-                    'vote_average': episode.vote_average,
-                } for episode in episodes]
-                
-                seasons_data.append({
-                    'id': season.id,
-                    'season_number': season.season_number,
-                    'name': season.name,
-                    'overview': season.overview,
-                    'air_date': season.air_date.isoformat() if season.air_date else None,
-                    'episode_count': season.episode_count,
-                    'episodes': episodes_data,
-                })
-            
-            series_data['seasons'] = seasons_data
-        except Series.DoesNotExist:
-            series_data['seasons'] = []
+        # Seasons and episodes from the database (cached) if available
+        series['seasons'] = load_series_seasons(pk)
         
-        return JsonResponse(serialize_series(series_data, include_seasons=True))
+        # No Last-Modified: seasons change independently; the ETag covers them
+        return JsonResponse(series)
     except Exception as e:
         logger.error(f"Error fetching series {pk}: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -195,13 +538,9 @@ def api_search(request):
         if not query:
             return JsonResponse({'error': 'Query parameter required'}, status=400)
         
-        # Search movies
-        movies_data = search_movies(query)
-        movies = [serialize_movie(movie) for movie in movies_data]
-        
-        # Search series
-        series_data = search_series(query)
-        series = [serialize_series(show) for show in series_data]
+        # Local full-text search first; TMDb only when few titles match
+        movies = [serialize_movie(movie) for movie in search_catalog('movie', query)]
+        series = [serialize_series(show) for show in search_catalog('tv', query)]
         
         return JsonResponse({
             'movies': movies,
@@ -218,11 +557,11 @@ def api_trending(request):
     """Get trending movies"""
     try:
         url = f'https://api.themoviedb.org/3/trending/movie/week?api_key={TMDB_API_KEY}'
-        data = make_api_request(url)
+        data = make_api_request(url) or {}
         
         movies = [serialize_movie(movie) for movie in data.get('results', [])]
         
-        return JsonResponse({'results': movies})
+        return upstream_results_response({'results': movies}, movies)
     except Exception as e:
         logger.error(f"Error fetching trending: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -235,7 +574,7 @@ def api_popular(request):
         movies_data = fetch_popular_movies()
         movies = [serialize_movie(movie) for movie in movies_data]
         
-        return JsonResponse({'results': movies})
+        return upstream_results_response({'results': movies}, movies)
     except Exception as e:
         logger.error(f"Error fetching popular: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -246,11 +585,11 @@ def api_top_rated(request):
     """Get top rated movies"""
     try:
         url = f'https://api.themoviedb.org/3/movie/top_rated?api_key={TMDB_API_KEY}&language=en-US&page=1'
-        data = make_api_request(url)
+        data = make_api_request(url) or {}
         
         movies = [serialize_movie(movie) for movie in data.get('results', [])]
         
-        return JsonResponse({'results': movies})
+        return upstream_results_response({'results': movies}, movies)
     except Exception as e:
         logger.error(f"Error fetching top rated: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -260,26 +599,7 @@ def api_top_rated(request):
 def api_genre_movies(request, genre_name):
     """Get movies by genre"""
     try:
-        # Map genre name to ID
-        genre_map = {
-            'action': GENRE_IDS.get('action', 28),
-            'comedy': GENRE_IDS.get('comedy', 35),
-            'horror': GENRE_IDS.get('horror', 27),
-            'scifi': GENRE_IDS.get('science_fiction', 878),
-            'romance': GENRE_IDS.get('romance', 10749),
-            'animation': GENRE_IDS.get('animation', 16),
-            'drama': GENRE_IDS.get('drama', 18),
-            'thriller': GENRE_IDS.get('thriller', 53),
-            'fantasy': GENRE_IDS.get('fantasy', 14),
-            'adventure': GENRE_IDS.get('adventure', 12),
-            'crime': GENRE_IDS.get('crime', 80),
-            'mystery': GENRE_IDS.get('mystery', 9648),
-            'family': GENRE_IDS.get('family', 10751),
-            'documentary': GENRE_IDS.get('documentary', 99),
-            'history': GENRE_IDS.get('history', 36),
-        }
-        
-        genre_id = genre_map.get(genre_name.lower())
+        genre_id = API_GENRE_MAP.get(genre_name.lower())
         if not genre_id:
             return JsonResponse({'error': 'Invalid genre'}, status=400)
         
@@ -287,10 +607,10 @@ def api_genre_movies(request, genre_name):
         movies_data = fetch_movies_by_genre(genre_id, page)
         movies = [serialize_movie(movie) for movie in movies_data]
         
-        return JsonResponse({
+        return upstream_results_response({
             'results': movies,
             'genre': genre_name,
-        })
+        }, movies)
     except Exception as e:
         logger.error(f"Error fetching {genre_name} movies: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -303,7 +623,43 @@ def api_latest(request):
         movies_data = fetch_latest_movies()
         movies = [serialize_movie(movie) for movie in movies_data]
         
-        return JsonResponse({'results': movies})
+        return upstream_results_response({'results': movies}, movies)
     except Exception as e:
         logger.error(f"Error fetching latest: {str(e)}")
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def api_home(request):
+    """Get every home page rail in one response (?rails= picks some)"""
+    try:
+        rails = requested_home_rails(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        # Rails are fetched concurrently, so a cold cache costs about one round trip
+        results = fetch_concurrently({
+            rail: (lambda url=url: (make_api_request(url) or {}).get('results', []))
+            for rail, url in home_rail_urls(rails).items()
+        })
+        return home_rails_response(results)
+    except Exception as e:
+        logger.error(f"Error fetching home rails: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def api_batch(request):
+    """Get the details of many movies and series by ID (?movies=1,2&series=3), keyed by ID"""
+    try:
+        ids = requested_batch_ids(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        # Seasons are left out; a series' episodes come from its detail endpoint
+        return batch_response(load_detail_payloads('movie', ids['movie']), load_detail_payloads('tv', ids['tv']))
+    except Exception as e:
+        logger.error(f"Error fetching batch: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
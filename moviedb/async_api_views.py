@@ -0,0 +1,355 @@
+"""
+Async API Views for React Frontend
+Same endpoints and JSON as api_views, but upstream calls are awaited through
+httpx so one ASGI worker can hold many in-flight TMDb requests at once.
+Served on the /api/ routes when settings.ASYNC_API_VIEWS is enabled.
+"""
+
+import asyncio
+import functools
+import logging
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from . import upstream
+from .api_views import (
+    API_GENRE_MAP,
+    batch_detail_results,
+    batch_detail_rows,
+    batch_cache_timeout,
+    batch_detail_urls,
+    batch_response,
+    detail_payload_is_stale,
+    detail_payload_url,
+    home_rail_urls,
+    home_rails_response,
+    load_series_seasons,
+    refresh_detail_in_background,
+    requested_batch_ids,
+    requested_home_rails,
+    serialize_movie,
+    serialize_page,
+    serialize_detail,
+    serialize_series,
+    stored_batch_payloads,
+    upstream_results_response,
+    wants_stored_catalog,
+)
+from .catalog import CATALOG_KINDS
+from .models import Movie, Series
+from .pagination import InvalidCursor, paginate_request
+from .search import search_catalog
+from .utils import amake_api_request, get_cached_responses, TMDB_API_KEY, TMDB_BASE_URL
+from .write_behind import enqueue_upserts
+
+logger = logging.getLogger(__name__)
+
+
+def closes_upstream_clients(view):
+    """
+    Close the pooled upstream clients after the view unless it is served by ASGI.
+
+    Under WSGI (e.g. runserver) every async view call runs on its own event
+    loop, which ends with the request, so clients bound to it would never
+    be reused nor closed. Under ASGI the server's loop keeps them pooled.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        finally:
+            if not isinstance(request, ASGIRequest):
+                await upstream.aclose_async_clients()
+    return wrapper
+
+
+async def fetch_results(url):
+    """Fetch a TMDb list endpoint and return its results (empty on failure)"""
+    data = await amake_api_request(url)
+    return data.get('results', []) if data else []
+
+
+async def load_detail_payload(kind, pk):
+    """Async api_views.load_detail_payload; a title without a stored payload awaits TMDb through httpx"""
+    streaming_fields = ('wootly_url', 'dood_url') if kind == 'movie' else ()
+    row = await CATALOG_KINDS[kind].model.objects.filter(id=pk).values(
+        'payload', 'payload_fetched_at', *streaming_fields,
+    ).afirst() or {}
+
+    payload, fetched_at = row.get('payload'), row.get('payload_fetched_at')
+    if payload is None:
+        data = await amake_api_request(detail_payload_url(kind, pk), batch_cache_timeout(kind))
+        if not data:
+            return None, None
+        await sync_to_async(enqueue_upserts)(kind, [data], detailed=True)
+        payload, fetched_at = serialize_detail(kind, data), timezone.now()
+    elif detail_payload_is_stale(fetched_at):
+        refresh_detail_in_background(kind, pk)
+
+    return {**payload, **{field: row.get(field) for field in streaming_fields}}, fetched_at
+
+
+async def load_detail_payloads(kind, ids):
+    """Async api_views.load_detail_payloads; the uncached misses are awaited together through httpx"""
+    rows = {row['id']: row async for row in batch_detail_rows(kind, ids)}
+    payloads = stored_batch_payloads(kind, rows)
+
+    urls = batch_detail_urls(kind, [pk for pk in ids if pk not in payloads])
+    if urls:
+        # One get_many for the cached responses, as in the sync version; only the rest are awaited
+        cached = await sync_to_async(get_cached_responses)(list(urls.values()), batch_cache_timeout(kind))
+        fetched = await asyncio.gather(*(
+            amake_api_request(url, batch_cache_timeout(kind)) for url in urls.values() if url not in cached
+        ))
+        datas = [data for data in [*cached.values(), *fetched] if data]
+        if datas:
+            await sync_to_async(enqueue_upserts)(kind, datas, detailed=True)
+            payloads.update({data['id']: serialize_detail(kind, data) for data in datas})
+
+    return batch_detail_results(kind, ids, payloads, rows)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_movies_list(request):
+    """Get TMDb's popular movies (?page=); ?source=stored or ?cursor= pages the stored movies instead"""
+    if wants_stored_catalog(request):
+        try:
+            page = await sync_to_async(paginate_request)(request, Movie.objects.all())
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(serialize_page('movie', page))
+
+    try:
+        page = int(request.GET.get('page', 1))
+        url = f'{TMDB_BASE_URL}/movie/popular?api_key={TMDB_API_KEY}&language=en-US&page={page}'
+        data = await amake_api_request(url) or {}
+
+        movies = [serialize_movie(movie) for movie in data.get('results', [])]
+
+        return upstream_results_response({
+            'results': movies,
+            'page': page,
+            'total_pages': data.get('total_pages', 1),
+            'total_results': data.get('total_results', 0),
+        }, movies)
+    except Exception as e:
+        logger.error(f"Error fetching movies: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_movie_detail(request, pk):
+    """Get movie details by ID"""
+    try:
+        movie, _ = await load_detail_payload('movie', pk)
+        if movie is None:
+            return JsonResponse({'error': 'Movie not found'}, status=404)
+
+        # No Last-Modified, as in api_views.api_movie_detail
+        return JsonResponse(movie)
+    except Exception as e:
+        logger.error(f"Error fetching movie {pk}: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_series_list(request):
+    """Get TMDb's popular TV series (?page=); ?source=stored or ?cursor= pages the stored series instead"""
+    if wants_stored_catalog(request):
+        try:
+            page = await sync_to_async(paginate_request)(request, Series.objects.all())
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(serialize_page('tv', page))
+
+    try:
+        page = int(request.GET.get('page', 1))
+        url = f'{TMDB_BASE_URL}/tv/popular?api_key={TMDB_API_KEY}&language=en-US&page={page}'
+        data = await amake_api_request(url) or {}
+
+        series = [serialize_series(show) for show in data.get('results', [])]
+
+        return upstream_results_response({
+            'results': series,
+            'page': page,
+            'total_pages': data.get('total_pages', 1),
+            'total_results': data.get('total_results', 0),
+        }, series)
+    except Exception as e:
+        logger.error(f"Error fetching series: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_series_detail(request, pk):
+    """Get series details by ID with seasons and episodes"""
+    try:
+        (series, _), seasons = await asyncio.gather(
+            load_detail_payload('tv', pk),
+            sync_to_async(load_series_seasons)(pk),
+        )
+        if series is None:
+            return JsonResponse({'error': 'Series not found'}, status=404)
+
+        series['seasons'] = seasons
+
+        return JsonResponse(series)
+    except Exception as e:
+        logger.error(f"Error fetching series {pk}: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_search(request):
+    """Search for movies and series"""
+    query = request.GET.get('q', '').strip()
+    try:
+        if not query:
+            return JsonResponse({'error': 'Query parameter required'}, status=400)
+
+        # Local full-text search first; TMDb only when few titles match
+        movies_data, series_data = await asyncio.gather(
+            sync_to_async(search_catalog)('movie', query),
+            sync_to_async(search_catalog)('tv', query),
+        )
+
+        return JsonResponse({
+            'movies': [serialize_movie(movie) for movie in movies_data],
+            'series': [serialize_series(show) for show in series_data],
+            'query': query,
+        })
+    except Exception as e:
+        logger.error(f"Error searching for '{query}': {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_trending(request):
+    """Get trending movies"""
+    try:
+        movies_data = await fetch_results(f'{TMDB_BASE_URL}/trending/movie/week?api_key={TMDB_API_KEY}')
+        movies = [serialize_movie(movie) for movie in movies_data]
+
+        return upstream_results_response({'results': movies}, movies)
+    except Exception as e:
+        logger.error(f"Error fetching trending: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_popular(request):
+    """Get popular movies"""
+    try:
+        movies_data = await fetch_results(f'{TMDB_BASE_URL}/movie/popular?api_key={TMDB_API_KEY}&language=en-US&page=1')
+        movies = [serialize_movie(movie) for movie in movies_data]
+
+        return upstream_results_response({'results': movies}, movies)
+    except Exception as e:
+        logger.error(f"Error fetching popular: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_top_rated(request):
+    """Get top rated movies"""
+    try:
+        movies_data = await fetch_results(f'{TMDB_BASE_URL}/movie/top_rated?api_key={TMDB_API_KEY}&language=en-US&page=1')
+        movies = [serialize_movie(movie) for movie in movies_data]
+
+        return upstream_results_response({'results': movies}, movies)
+    except Exception as e:
+        logger.error(f"Error fetching top rated: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_genre_movies(request, genre_name):
+    """Get movies by genre"""
+    try:
+        genre_id = API_GENRE_MAP.get(genre_name.lower())
+        if not genre_id:
+            return JsonResponse({'error': 'Invalid genre'}, status=400)
+
+        page = int(request.GET.get('page', 1))
+        movies_data = await fetch_results(
+            f'{TMDB_BASE_URL}/discover/movie?api_key={TMDB_API_KEY}&language=en-US&with_genres={genre_id}&page={page}'
+        )
+        movies = [serialize_movie(movie) for movie in movies_data]
+
+        return upstream_results_response({
+            'results': movies,
+            'genre': genre_name,
+        }, movies)
+    except Exception as e:
+        logger.error(f"Error fetching {genre_name} movies: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_latest(request):
+    """Get latest movies"""
+    try:
+        today = datetime.today().strftime('%Y-%m-%d')
+        movies_data = await fetch_results(
+            f'{TMDB_BASE_URL}/discover/movie?api_key={TMDB_API_KEY}&language=en-US'
+            f'&sort_by=release_date.desc&release_date.lte={today}&page=1'
+        )
+        movies = [serialize_movie(movie) for movie in movies_data if movie.get('poster_path')]
+
+        return upstream_results_response({'results': movies}, movies)
+    except Exception as e:
+        logger.error(f"Error fetching latest: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_home(request):
+    """Get every home page rail in one response (?rails= picks some)"""
+    try:
+        rails = requested_home_rails(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        urls = home_rail_urls(rails)
+        results = await asyncio.gather(*(fetch_results(url) for url in urls.values()))
+        return home_rails_response(dict(zip(urls, results)))
+    except Exception as e:
+        logger.error(f"Error fetching home rails: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+@closes_upstream_clients
+async def api_batch(request):
+    """Get the details of many movies and series by ID (?movies=1,2&series=3), keyed by ID"""
+    try:
+        ids = requested_batch_ids(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        movies, series = await asyncio.gather(
+            load_detail_payloads('movie', ids['movie']),
+            load_detail_payloads('tv', ids['tv']),
+        )
+        return batch_response(movies, series)
+    except Exception as e:
+        logger.error(f"Error fetching batch: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
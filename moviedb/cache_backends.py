@@ -0,0 +1,259 @@
+"""
+Cache backends for the moviedb app.
+TieredCache puts a small in-process LRU (L1) in front of a cache shared by
+every worker process (L2, file- or database-backed by default), so workers
+share warm entries and keep them across restarts without an outside service.
+"""
+
+import logging
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TieredEntry(NamedTuple):
+    """A value as stored in L2, with the time.time() it expires at (None: never)."""
+    value: Any
+    expires_at: Optional[float]
+
+
+def _remove_if_expired(l2: FileBasedCache, fname: str) -> bool:
+    """Remove an expired cache file; whether the file is gone."""
+    try:
+        with open(fname, 'rb') as f:
+            try:
+                expires_at = pickle.load(f)
+            except EOFError:
+                return False  # Still being written (set() renames complete files into place)
+            if expires_at is None or expires_at >= time.time():
+                return False
+            # Only remove the file read, not one another worker has added since
+            if os.path.samestat(os.fstat(f.fileno()), os.stat(fname)):
+                os.remove(fname)
+    except FileNotFoundError:
+        pass
+    return True
+
+
+def file_add(l2: FileBasedCache, key: str, value: Any, timeout: Optional[float]) -> bool:
+    """
+    FileBasedCache.add that is atomic across processes.
+
+    The built-in one is has_key() then set(), so two workers can both add
+    the same key. Here the complete file is written under a temporary name
+    and hard-linked into place, which fails if the key's file exists.
+    """
+    l2._createdir()
+    fname = l2._key_to_file(key)
+    l2._cull()
+    fd, tmp_path = tempfile.mkstemp(dir=l2._dir)
+    try:
+        with open(fd, 'wb') as f:
+            l2._write_content(f, timeout, value)
+        for _ in range(2):
+            try:
+                os.link(tmp_path, fname)
+                return True
+            except FileExistsError:
+                if not _remove_if_expired(l2, fname):
+                    return False
+        return False  # Another worker took over the expired key first
+    finally:
+        os.remove(tmp_path)
+
+
+class TieredCache(BaseCache):
+    """
+    Two-tier cache: per-process LocMemCache L1 over a shared L2 backend.
+
+    Reads try L1 first and promote L2 hits into L1; writes and deletes go to
+    both tiers. L1 entries live at most ``L1_TIMEOUT`` seconds, which bounds
+    how long another worker can serve a value after it was deleted or
+    replaced, and never past the entry's own expiry: L2 stores each value
+    with its expiry time, so a promoted hit only gets its remaining
+    lifetime. L2 errors (e.g. a read-only disk) are logged and the cache
+    degrades to L1 only.
+
+    add() is decided by L2 alone, so it works as a lock across worker
+    processes: a FileBasedCache L2 adds with file_add, other backends
+    with their own add() (atomic for DatabaseCache and Redis). When L2
+    fails, add() returns False, since no worker can hold the key.
+
+    OPTIONS:
+        L1_MAX_ENTRIES: LRU size of the in-process tier (default: 1000)
+        L1_TIMEOUT: Maximum seconds an entry stays in L1 (default: 30)
+        L1_LOCATION: Name of the in-process tier (default: derived from LOCATION)
+        L2_BACKEND: Dotted path of the shared backend
+            (default: FileBasedCache; DatabaseCache also works after
+            ``manage.py createcachetable``)
+        L2_OPTIONS: OPTIONS passed to the L2 backend
+
+    LOCATION is passed to the L2 backend (a directory or a table name).
+    """
+
+    def __init__(self, location: str, params: Dict[str, Any]):
+        options = dict(params.get('OPTIONS', {}))
+        self.l1_timeout = options.pop('L1_TIMEOUT', 30)
+        l1_max_entries = options.pop('L1_MAX_ENTRIES', 1000)
+        # Instances with the same L1 location share it (one L1 per process, not per thread)
+        l1_location = options.pop('L1_LOCATION', f'tiered-l1:{location}')
+        l2_backend = options.pop('L2_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache')
+        l2_options = options.pop('L2_OPTIONS', {})
+        super().__init__({**params, 'OPTIONS': options})
+
+        # Keys are made once by this backend and passed through unchanged
+        passthrough = {'KEY_FUNCTION': lambda key, key_prefix, version: key}
+        self.l1 = LocMemCache(l1_location, {
+            **passthrough,
+            'TIMEOUT': self.l1_timeout,
+            'OPTIONS': {'MAX_ENTRIES': l1_max_entries},
+        })
+        self.l2 = import_string(l2_backend)(location, {
+            **passthrough,
+            'TIMEOUT': params.get('TIMEOUT', 300),
+            'OPTIONS': l2_options,
+        })
+
+    def _timeout(self, timeout: Any) -> Optional[float]:
+        """Relative seconds of a caller's timeout (None: never expire)."""
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _entry(self, value: Any, timeout: Optional[float]) -> TieredEntry:
+        return TieredEntry(value, None if timeout is None else time.time() + timeout)
+
+    def _l1_timeout(self, timeout: Optional[float]) -> float:
+        return self.l1_timeout if timeout is None else min(timeout, self.l1_timeout)
+
+    def _unwrap(self, stored: Any) -> Tuple[Any, Optional[float]]:
+        """Value and remaining seconds of an L2 entry."""
+        if not isinstance(stored, TieredEntry):
+            return stored, None  # Written before entries carried their expiry
+        if stored.expires_at is None:
+            return stored.value, None
+        return stored.value, stored.expires_at - time.time()
+
+    def _promote(self, key: str, stored: Any) -> Any:
+        value, remaining = self._unwrap(stored)
+        if remaining is None or remaining > 0:
+            self.l1.set(key, value, self._l1_timeout(remaining))
+        return value
+
+    def _l2_add(self, key: str, entry: TieredEntry, timeout: Optional[float]) -> bool:
+        if isinstance(self.l2, FileBasedCache):
+            return file_add(self.l2, key, entry, timeout)
+        return self.l2.add(key, entry, timeout)
+
+    def _l2_call(self, method: str, *args, default: Any = None) -> Any:
+        try:
+            return getattr(self.l2, method)(*args)
+        except Exception as e:
+            logger.warning(f"L2 cache {method} failed: {str(e)}")
+            return default
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        try:
+            if not self._l2_add(key, self._entry(value, timeout), timeout):
+                return False
+        except Exception as e:
+            logger.warning(f"L2 cache add failed: {str(e)}")
+            return False
+        self.l1.set(key, value, self._l1_timeout(timeout))
+        return True
+
+    def get(self, key, default=None, version=None) -> Any:
+        key = self.make_and_validate_key(key, version=version)
+        value = self.l1.get(key, _MISSING)
+        if value is _MISSING:
+            stored = self._l2_call('get', key, _MISSING, default=_MISSING)
+            if stored is _MISSING:
+                return default
+            # Promote the shared entry into this process
+            value = self._promote(key, stored)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None) -> None:
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        self._l2_call('set', key, self._entry(value, timeout), timeout)
+        self.l1.set(key, value, self._l1_timeout(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        stored = self._l2_call('get', key, _MISSING, default=_MISSING)
+        if stored is _MISSING:
+            self.l1.touch(key, self._l1_timeout(timeout))
+            return False
+        # The expiry is part of the stored entry, so it is rewritten with the value
+        value, _ = self._unwrap(stored)
+        self._l2_call('set', key, self._entry(value, timeout), timeout)
+        self.l1.set(key, value, self._l1_timeout(timeout))
+        return True
+
+    def delete(self, key, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        deleted_l1 = self.l1.delete(key)
+        return bool(self._l2_call('delete', key, default=False)) or deleted_l1
+
+    def has_key(self, key, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        return self.l1.has_key(key) or bool(self._l2_call('has_key', key, default=False))
+
+    def get_many(self, keys: Iterable[str], version=None) -> Dict[str, Any]:
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        found = self.l1.get_many(key_map)
+
+        missing = [key for key in key_map if key not in found]
+        if missing:
+            for key, stored in self._l2_call('get_many', missing, default={}).items():
+                found[key] = self._promote(key, stored)
+
+        return {key_map[key]: value for key, value in found.items()}
+
+    def set_many(self, data: Dict[str, Any], timeout=DEFAULT_TIMEOUT, version=None) -> list:
+        data = {self.make_and_validate_key(key, version=version): value for key, value in data.items()}
+        timeout = self._timeout(timeout)
+        entries = {key: self._entry(value, timeout) for key, value in data.items()}
+        failed = self._l2_call('set_many', entries, timeout, default=[])
+        self.l1.set_many(data, self._l1_timeout(timeout))
+        return failed or []
+
+    def delete_many(self, keys: Iterable[str], version=None) -> None:
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        self.l1.delete_many(keys)
+        self._l2_call('delete_many', keys)
+
+    def incr(self, key, delta=1, version=None) -> int:
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            stored = self.l2.get(key, _MISSING)
+            if stored is _MISSING:
+                raise ValueError(f"Key '{key}' not found")
+            value, remaining = self._unwrap(stored)
+            value += delta
+            # Keeps the entry's expiry (like the built-in backends' get-and-set incr)
+            timeout = None if remaining is None else max(remaining, 0)
+            self.l2.set(key, TieredEntry(value, getattr(stored, 'expires_at', None)), timeout)
+        finally:
+            self.l1.delete(key)
+        return value
+
+    def clear(self) -> None:
+        self.l1.clear()
+        self._l2_call('clear')
+
+    def close(self, **kwargs) -> None:
+        self._l2_call('close')
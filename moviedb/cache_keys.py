@@ -0,0 +1,90 @@
+"""
+Canonical cache keys for upstream API requests.
+Two URLs for the same resource get the same key no matter how they were
+built: credentials are dropped, query parameters are sorted and per-endpoint
+defaults are filled in. Each key also belongs to an endpoint family (the path
+with IDs replaced by ``{id}``) that cache statistics are grouped by.
+"""
+
+import re
+from typing import NamedTuple, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.core.cache.utils import make_template_fragment_key as make_key
+
+from .upstream import get_policy_name
+
+# Query parameters that identify the caller, not the resource
+CREDENTIAL_PARAMS = frozenset({'api_key', 'apikey', 'access_token', 'client_id', 'token'})
+
+# Parameters whose comma-separated values can be given in any order
+UNORDERED_LIST_PARAMS = frozenset({'append_to_response'})
+
+# (family pattern, defaults) - every matching rule's defaults apply
+ENDPOINT_DEFAULTS: Tuple[Tuple['re.Pattern', dict], ...] = (
+    (re.compile(r'^tmdb /3/'), {'language': 'en-US'}),
+    (re.compile(r'^tmdb /3/(discover|search|trending)/'), {'page': '1'}),
+    (re.compile(r'^tmdb /3/(movie|tv)/(popular|top_rated|now_playing|upcoming|airing_today|on_the_air)$'),
+     {'page': '1'}),
+)
+
+
+class RequestKey(NamedTuple):
+    """Cache key of an upstream request and the endpoint family it belongs to."""
+    cache_key: str
+    family: str
+    canonical_url: str
+
+
+def endpoint_family(url: str) -> str:
+    """
+    Get the endpoint family of a URL, e.g. ``tmdb /3/movie/{id}``.
+
+    Args:
+        url: Absolute upstream URL
+
+    Returns:
+        Host policy name and path with numeric IDs replaced by ``{id}``
+    """
+    segments = urlsplit(url).path.strip('/').split('/')
+    # A leading number is the API version (TMDb's /3), not an ID
+    path = '/'.join(
+        '{id}' if index and segment.isdigit() else segment
+        for index, segment in enumerate(segments)
+    )
+    return f'{get_policy_name(url)} /{path}'
+
+
+def canonicalize(url: str) -> RequestKey:
+    """
+    Build the canonical form and cache key of an upstream request URL.
+
+    Args:
+        url: Absolute upstream URL, possibly containing credentials
+
+    Returns:
+        RequestKey with the cache key, endpoint family and canonical URL
+        (which never contains credentials)
+    """
+    parts = urlsplit(url)
+    family = endpoint_family(url)
+
+    params = {}
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        if name.lower() in CREDENTIAL_PARAMS:
+            continue
+        if name in UNORDERED_LIST_PARAMS:
+            value = ','.join(sorted(filter(None, value.split(','))))
+        params.setdefault(name, []).append(value)
+
+    for pattern, defaults in ENDPOINT_DEFAULTS:
+        if pattern.match(family):
+            for name, value in defaults.items():
+                params.setdefault(name, [value])
+
+    query = urlencode(sorted((name, value) for name, values in params.items() for value in values))
+    canonical_url = f'{parts.scheme}://{parts.netloc.lower()}{parts.path.rstrip("/")}'
+    if query:
+        canonical_url = f'{canonical_url}?{query}'
+
+    return RequestKey(make_key('api_request', canonical_url), family, canonical_url)
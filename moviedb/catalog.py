@@ -0,0 +1,496 @@
+"""
+Bulk ingestion of the TMDb catalog into the local Movie, Series and Genre tables.
+TMDb payloads are mapped to unsaved model rows and upserted in batches with
+bulk_create(update_conflicts=True), so ingesting the same title twice updates
+it in place. Rows already stored are kept fresh from TMDb's change feeds.
+Used by the ingest_catalog and sync_catalog_changes management commands.
+"""
+
+import gzip
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import models, transaction
+from django.utils import timezone
+from requests.exceptions import RequestException
+
+from . import upstream
+from .models import Episode, Genre, Movie, Season, Series, SyncCheckpoint
+from .utils import TMDB_API_KEY, TMDB_BASE_URL, invalidate_series_seasons
+
+logger = logging.getLogger(__name__)
+
+TMDB_EXPORTS_BASE_URL = 'https://files.tmdb.org/p/exports'
+
+# TMDb refuses discover pages past 500
+DISCOVER_MAX_PAGES = 500
+
+# Longest date range one change feed request may cover
+CHANGES_MAX_DAYS = 14
+
+# append_to_response takes at most 20 items, one is external_ids
+MAX_APPENDED_SEASONS = 19
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    """Parse a TMDb date string, returning None for blank or invalid dates."""
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def movie_row(data: Dict[str, Any]) -> Movie:
+    """
+    Map a TMDb movie payload (list result or details) to an unsaved Movie.
+
+    Args:
+        data: TMDb movie dictionary
+
+    Returns:
+        Movie instance with the TMDb ID as primary key
+    """
+    return Movie(
+        id=data['id'],
+        tmdb_id=data['id'],
+        title=(data.get('title') or '')[:255],
+        overview=data.get('overview', ''),
+        release_date=parse_date(data.get('release_date')),
+        poster_path=data.get('poster_path'),
+        vote_average=data.get('vote_average') or 0,
+        runtime=data.get('runtime') or 0,
+        tagline=(data.get('tagline') or '')[:255],
+        imdb_id=data.get('imdb_id') or None,
+    )
+
+
+def series_row(data: Dict[str, Any]) -> Series:
+    """
+    Map a TMDb TV payload (list result or details) to an unsaved Series.
+
+    Args:
+        data: TMDb TV dictionary, optionally with appended external_ids
+
+    Returns:
+        Series instance with the TMDb ID as primary key
+    """
+    return Series(
+        id=data['id'],
+        tmdb_id=data['id'],
+        title=(data.get('name') or '')[:200],
+        overview=data.get('overview', ''),
+        release_date=parse_date(data.get('first_air_date')),
+        poster_path=data.get('poster_path'),
+        vote_average=data.get('vote_average') or 0,
+        runtime=(data.get('episode_run_time') or [0])[0],
+        tagline=(data.get('tagline') or '')[:255],
+        imdb_id=data.get('external_ids', {}).get('imdb_id') or None,
+        number_of_seasons=data.get('number_of_seasons') or 0,
+        number_of_episodes=data.get('number_of_episodes') or 0,
+        status=data.get('status'),
+    )
+
+
+def payload_genre_ids(data: Dict[str, Any]) -> List[int]:
+    """Get genre IDs from a list result (genre_ids) or details payload (genres)."""
+    if 'genre_ids' in data:
+        return list(data['genre_ids'])
+    return [genre['id'] for genre in data.get('genres', [])]
+
+
+@dataclass(frozen=True)
+class CatalogKind:
+    """How one TMDb media type maps onto a local model."""
+    name: str
+    model: type
+    to_row: Callable[[Dict[str, Any]], models.Model]
+    list_fields: Tuple[str, ...]  # fields present in list/discover results
+    detail_fields: Tuple[str, ...]  # fields present in details payloads
+    export_prefix: str
+    detail_params: Dict[str, str]
+
+
+_COMMON_FIELDS = ('tmdb_id', 'title', 'overview', 'release_date', 'poster_path', 'vote_average')
+
+CATALOG_KINDS: Dict[str, CatalogKind] = {
+    'movie': CatalogKind(
+        name='movie',
+        model=Movie,
+        to_row=movie_row,
+        list_fields=_COMMON_FIELDS,
+        detail_fields=_COMMON_FIELDS + ('runtime', 'tagline', 'imdb_id'),
+        export_prefix='movie_ids',
+        detail_params={},
+    ),
+    'tv': CatalogKind(
+        name='tv',
+        model=Series,
+        to_row=series_row,
+        list_fields=_COMMON_FIELDS,
+        detail_fields=_COMMON_FIELDS + (
+            'runtime', 'tagline', 'imdb_id', 'number_of_seasons', 'number_of_episodes', 'status',
+        ),
+        export_prefix='tv_series_ids',
+        detail_params={'append_to_response': 'external_ids'},
+    ),
+}
+
+
+def request_json(path: str, **params) -> Optional[Dict[str, Any]]:
+    """
+    GET a TMDb endpoint without going through the response cache.
+
+    Bulk ingestion touches far more resources than the cache should hold.
+
+    Args:
+        path: Path below TMDB_BASE_URL, e.g. '/movie/550'
+        **params: Query parameters
+
+    Returns:
+        JSON response as dictionary, or None if TMDb has no such resource
+
+    Raises:
+        requests.RequestException: If the request fails
+        ValueError: If the response is not JSON
+    """
+    url = f'{TMDB_BASE_URL}{path}'
+    response = upstream.get(url, params={'api_key': TMDB_API_KEY, 'language': 'en-US', **params})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_json(path: str, **params) -> Optional[Dict[str, Any]]:
+    """
+    request_json that logs failures instead of raising them.
+
+    Returns:
+        JSON response as dictionary or None if the request fails
+    """
+    try:
+        return request_json(path, **params)
+    except (RequestException, ValueError) as e:
+        logger.error(f"Catalog request failed for {path}: {str(e)}")
+        return None
+
+
+def upsert_genres(kind: CatalogKind) -> int:
+    """
+    Upsert TMDb's genre list for a media type into Genre.
+
+    Returns:
+        Number of genres written
+    """
+    data = fetch_json(f'/genre/{kind.name}/list') or {}
+    genres = [Genre(id=genre['id'], name=genre['name']) for genre in data.get('genres', [])]
+    Genre.objects.bulk_create(genres, update_conflicts=True, unique_fields=['id'], update_fields=['name'])
+    return len(genres)
+
+
+def upsert_batch(kind: CatalogKind, payloads: Iterable[Dict[str, Any]], detailed: bool = False) -> int:
+    """
+    Upsert TMDb payloads and their genre links in one transaction.
+
+    Stored rows are read in one query and only new or changed rows are
+    written, with a single bulk_create(update_conflicts=True), which is
+    also safe against concurrent upserts of the same title. Only the
+    fields the payload type carries are compared and updated, so a list
+    result never blanks out the runtime or IMDb ID stored from a details
+    payload.
+
+    Args:
+        kind: Media type of the payloads
+        payloads: TMDb list results or details payloads
+        detailed: Whether the payloads are details payloads
+
+    Returns:
+        Number of rows inserted or changed
+    """
+    by_id = {payload['id']: payload for payload in payloads if payload.get('id')}
+    if not by_id:
+        return 0
+
+    fields = list(kind.detail_fields if detailed else kind.list_fields)
+    stored = {
+        values.pop('id'): values
+        for values in kind.model.objects.filter(id__in=list(by_id)).values('id', *fields)
+    }
+    changed = [
+        row for row in _synced_rows(kind, by_id.values())
+        if stored.get(row.id) != {field: getattr(row, field) for field in fields}
+    ]
+
+    with transaction.atomic():
+        if changed:
+            kind.model.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=[*fields, 'synced_at'],
+            )
+        _sync_genre_links(kind, by_id)
+    return len(changed)
+
+
+def upsert_movies(payloads: Iterable[Dict[str, Any]], detailed: bool = False) -> List[Movie]:
+    """
+    Upsert TMDb movie payloads and return the stored rows in payload order.
+
+    Args:
+        payloads: TMDb movie list results or details payloads
+        detailed: Whether the payloads are details payloads
+
+    Returns:
+        List of Movie instances
+    """
+    return _upsert_and_load(CATALOG_KINDS['movie'], payloads, detailed)
+
+
+def upsert_series(payloads: Iterable[Dict[str, Any]], detailed: bool = False) -> List[Series]:
+    """
+    Upsert TMDb TV payloads and return the stored rows in payload order.
+
+    Args:
+        payloads: TMDb TV list results or details payloads
+        detailed: Whether the payloads are details payloads
+
+    Returns:
+        List of Series instances
+    """
+    return _upsert_and_load(CATALOG_KINDS['tv'], payloads, detailed)
+
+
+def _upsert_and_load(kind: CatalogKind, payloads: Iterable[Dict[str, Any]], detailed: bool) -> List[models.Model]:
+    payloads = [payload for payload in payloads if payload.get('id')]
+    upsert_batch(kind, payloads, detailed)
+    rows = kind.model.objects.in_bulk([payload['id'] for payload in payloads])
+    return [rows[payload['id']] for payload in payloads if payload['id'] in rows]
+
+
+def update_titles(kind: CatalogKind, payloads: Iterable[Dict[str, Any]]) -> int:
+    """
+    Apply details payloads to titles that are already stored.
+
+    Updates the rows with bulk_update (titles not stored are ignored) and,
+    for series, the stored seasons and episodes included in the payloads.
+
+    Args:
+        kind: Media type of the payloads
+        payloads: TMDb details payloads, see fetch_details
+
+    Returns:
+        Number of titles updated
+    """
+    by_id = {payload['id']: payload for payload in payloads if payload.get('id')}
+    by_id = {
+        object_id: by_id[object_id]
+        for object_id in kind.model.objects.filter(id__in=list(by_id)).values_list('id', flat=True)
+    }
+    if not by_id:
+        return 0
+
+    with transaction.atomic():
+        # Clearing payload_fetched_at marks the stored detail JSON stale
+        kind.model.objects.bulk_update(
+            _synced_rows(kind, by_id.values()), [*kind.detail_fields, 'synced_at', 'payload_fetched_at'],
+        )
+        _sync_genre_links(kind, by_id)
+        if kind.model is Series:
+            _update_seasons(by_id)
+    return len(by_id)
+
+
+def _synced_rows(kind: CatalogKind, payloads: Iterable[Dict[str, Any]]) -> List[models.Model]:
+    synced_at = timezone.now()
+    rows = [kind.to_row(payload) for payload in payloads]
+    for row in rows:
+        row.synced_at = synced_at
+    return rows
+
+
+def _sync_genre_links(kind: CatalogKind, by_id: Dict[int, Dict[str, Any]]) -> None:
+    # Payloads without genre information leave the stored links alone
+    wanted = {
+        object_id: set(payload_genre_ids(payload))
+        for object_id, payload in by_id.items()
+        if 'genre_ids' in payload or 'genres' in payload
+    }
+    if not wanted:
+        return
+
+    through = kind.model.genres.through
+    owner = f'{kind.model._meta.model_name}_id'
+    known_genres = set(Genre.objects.values_list('id', flat=True))
+    stored: Dict[int, set] = {}
+    for object_id, genre_id in through.objects.filter(**{f'{owner}__in': list(wanted)}).values_list(owner, 'genre_id'):
+        stored.setdefault(object_id, set()).add(genre_id)
+
+    changed = {
+        object_id: genre_ids & known_genres
+        for object_id, genre_ids in wanted.items()
+        if genre_ids & known_genres != stored.get(object_id, set())
+    }
+    if not changed:
+        return
+
+    relinked = [object_id for object_id in changed if object_id in stored]
+    if relinked:
+        through.objects.filter(**{f'{owner}__in': relinked}).delete()
+    through.objects.bulk_create(
+        [
+            through(**{owner: object_id, 'genre_id': genre_id})
+            for object_id, genre_ids in changed.items()
+            for genre_id in genre_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def load_checkpoint(name: str) -> Dict[str, Any]:
+    """Get the saved state of a job, or an empty dict if it never ran."""
+    checkpoint = SyncCheckpoint.objects.filter(name=name).first()
+    return checkpoint.state if checkpoint else {}
+
+
+def save_checkpoint(name: str, state: Dict[str, Any]) -> None:
+    """Save the resume state of a job."""
+    SyncCheckpoint.objects.update_or_create(name=name, defaults={'state': state})
+
+
+def fetch_discover_page(kind: CatalogKind, page: int) -> Optional[Dict[str, Any]]:
+    """Fetch one page of titles sorted by popularity."""
+    return fetch_json(f'/discover/{kind.name}', sort_by='popularity.desc', include_adult='false', page=page)
+
+
+def fetch_details(kind: CatalogKind, object_id: int, season_numbers: Iterable[int] = (),
+                  strict: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the details payload of one title.
+
+    Args:
+        kind: Media type of the title
+        object_id: TMDb ID
+        season_numbers: Seasons (with episodes) to append, for series
+        strict: Raise request failures (as request_json does) instead of
+            returning None, so None only means TMDb has no such title
+
+    Returns:
+        Details dictionary, with 'season/<number>' keys for appended seasons
+    """
+    params = dict(kind.detail_params)
+    seasons = [f'season/{number}' for number in sorted(season_numbers)[:MAX_APPENDED_SEASONS]]
+    if seasons:
+        params['append_to_response'] = ','.join(filter(None, [params.get('append_to_response'), *seasons]))
+    return (request_json if strict else fetch_json)(f'/{kind.name}/{object_id}', **params)
+
+
+def iter_changed_ids(kind: CatalogKind, start: date, end: date) -> Iterator[int]:
+    """
+    Stream the IDs TMDb reports as changed between two dates (inclusive).
+
+    Raises:
+        requests.RequestException: If a change feed page cannot be fetched,
+            so the caller does not move its watermark past missed changes
+    """
+    window_start = start
+    while window_start <= end:
+        window_end = min(end, window_start + timedelta(days=CHANGES_MAX_DAYS - 1))
+        page = total_pages = 1
+        while page <= total_pages:
+            data = fetch_json(
+                f'/{kind.name}/changes',
+                start_date=window_start.isoformat(),
+                end_date=window_end.isoformat(),
+                page=page,
+            )
+            if data is None:
+                raise RequestException(f'Change feed page {page} for {kind.name} from {window_start} failed')
+            total_pages = data.get('total_pages', 1)
+            for change in data.get('results', []):
+                if not change.get('adult'):
+                    yield change['id']
+            page += 1
+        window_start = window_end + timedelta(days=1)
+
+
+def stored_season_numbers(series_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """Get the season numbers stored for each series."""
+    numbers: Dict[int, List[int]] = {}
+    for series_id, number in Season.objects.filter(series_id__in=list(series_ids)).values_list(
+        'series_id', 'season_number'
+    ):
+        numbers.setdefault(series_id, []).append(number)
+    return numbers
+
+
+def _update_seasons(by_id: Dict[int, Dict[str, Any]]) -> None:
+    synced_at = timezone.now()
+    seasons = Season.objects.filter(series_id__in=list(by_id))
+    episodes = Episode.objects.filter(season__in=seasons)
+    episodes_by_key = {(episode.season_id, episode.episode_number): episode for episode in episodes}
+
+    changed_seasons, changed_episodes = [], []
+    for season in seasons:
+        payload = by_id[season.series_id]
+        summary = next(
+            (item for item in payload.get('seasons', []) if item.get('season_number') == season.season_number),
+            None,
+        )
+        details = payload.get(f'season/{season.season_number}')
+        if summary is None and details is None:
+            continue
+
+        source = {**(summary or {}), **(details or {})}
+        season.name = source.get('name') or season.name
+        season.overview = source.get('overview') or ''
+        season.air_date = parse_date(source.get('air_date'))
+        season.episode_count = source.get('episode_count') or len(source.get('episodes', []))
+        season.synced_at = synced_at
+        changed_seasons.append(season)
+
+        for item in (details or {}).get('episodes', []):
+            episode = episodes_by_key.get((season.id, item.get('episode_number')))
+            if episode is None:
+                continue
+            episode.name = item.get('name') or episode.name
+            episode.overview = item.get('overview') or ''
+            episode.air_date = parse_date(item.get('air_date'))
+            episode.vote_average = item.get('vote_average') or 0
+            episode.synced_at = synced_at
+            changed_episodes.append(episode)
+
+    Season.objects.bulk_update(changed_seasons, ['name', 'overview', 'air_date', 'episode_count', 'synced_at'])
+    Episode.objects.bulk_update(changed_episodes, ['name', 'overview', 'air_date', 'vote_average', 'synced_at'])
+
+    # bulk_update sends no model signals
+    series_ids = {season.series_id for season in changed_seasons}
+    transaction.on_commit(lambda: invalidate_series_seasons(*series_ids))
+
+
+def export_url(kind: CatalogKind, export_date: date) -> str:
+    """Get the URL of TMDb's daily ID export for a media type and date."""
+    return f'{TMDB_EXPORTS_BASE_URL}/{kind.export_prefix}_{export_date:%m_%d_%Y}.json.gz'
+
+
+def iter_export_entries(kind: CatalogKind, export_date: date) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the entries of a daily ID export without loading it into memory.
+
+    Each entry has 'id', 'popularity', 'adult' and the original title.
+
+    Raises:
+        requests.RequestException: If the export cannot be downloaded
+    """
+    response = upstream.get(export_url(kind, export_date), stream=True)
+    try:
+        response.raise_for_status()
+        with gzip.open(response.raw, 'rt', encoding='utf-8') as lines:
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        response.close()
@@ -0,0 +1,124 @@
+"""
+Local stand-in for the TMDb API used by tests and benchmarks.
+Serves canned JSON over HTTP with a configurable per-request latency.
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Union
+from urllib.parse import urlsplit
+
+
+def default_payload(path: str) -> Dict[str, Any]:
+    """
+    Build a TMDb-shaped list payload for any path.
+
+    Args:
+        path: Request path without the query string
+
+    Returns:
+        Dictionary with a page of 20 results
+    """
+    results = [
+        {
+            'id': index,
+            'title': f'Movie {index}',
+            'name': f'Series {index}',
+            'overview': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.',
+            'poster_path': f'/poster{index}.jpg',
+            'backdrop_path': f'/backdrop{index}.jpg',
+            'release_date': '2024-01-01',
+            'first_air_date': '2024-01-01',
+            'vote_average': 7.5,
+        }
+        for index in range(1, 21)
+    ]
+    return {'page': 1, 'results': results, 'total_pages': 1, 'total_results': len(results)}
+
+
+class FakeTMDBServer:
+    """
+    Threaded HTTP server answering every GET with JSON after a fixed delay.
+
+    Use as a context manager; ``base_url`` is only valid while it is running.
+    ``routes`` maps a request path to a payload, a callable returning one, or
+    an integer HTTP status to reply with instead. ``bytes`` payloads are sent
+    as they are (e.g. a gzipped export file).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        routes: Optional[Dict[str, Union[int, bytes, Dict[str, Any], Callable[[str], Any]]]] = None,
+    ):
+        self.latency = latency
+        self.routes = routes or {}
+        self.hits = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def total_hits(self) -> int:
+        return sum(self.hits.values())
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                with server._lock:
+                    server.hits[path] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                route = server.routes.get(path, default_payload)
+                if callable(route):
+                    route = route(path)
+                if isinstance(route, int):
+                    self.send_response(route)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                if isinstance(route, bytes):
+                    body, content_type = route, 'application/octet-stream'
+                else:
+                    body, content_type = json.dumps(route).encode(), 'application/json'
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'FakeTMDBServer':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> 'FakeTMDBServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
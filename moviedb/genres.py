@@ -0,0 +1,100 @@
+"""
+Genre sync service for the moviedb app.
+Keeps the Genre table and the movie/series genre links in step with TMDb
+in a few set-based queries, so genre pages can be served from the local
+database instead of upserting row by row on every view.
+"""
+
+import logging
+from typing import List
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from . import catalog
+from .models import Genre
+from .utils import TMDB_API_KEY, TMDB_BASE_URL, make_api_request
+
+logger = logging.getLogger(__name__)
+
+# TMDb changes its genre lists very rarely
+GENRE_CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+# How long a genre page's discover results count as stored
+GENRE_PAGE_SYNC_TIMEOUT = 60 * 60
+
+
+def get_genre_catalog(kind: str) -> List[Genre]:
+    """
+    Get TMDb's genre list for a media type, stored in Genre.
+
+    The list is cached; on a miss it is fetched and upserted with one
+    bulk_create. If TMDb is unavailable the stored genres are used.
+
+    Args:
+        kind: 'movie' or 'tv'
+
+    Returns:
+        List of Genre instances sorted by name
+    """
+    cache_key = f'genre_catalog:{kind}'
+    genres = cache.get(cache_key)
+    if genres is not None:
+        return genres
+
+    url = f'{TMDB_BASE_URL}/genre/{kind}/list?api_key={TMDB_API_KEY}&language=en-US'
+    data = make_api_request(url, cache_timeout=GENRE_CATALOG_CACHE_TIMEOUT)
+    if not data:
+        return list(Genre.objects.order_by('name'))
+
+    genres = sorted(
+        (Genre(id=genre['id'], name=genre['name']) for genre in data.get('genres', [])),
+        key=lambda genre: genre.name,
+    )
+    Genre.objects.bulk_create(genres, update_conflicts=True, unique_fields=['id'], update_fields=['name'])
+    cache.set(cache_key, genres, GENRE_CATALOG_CACHE_TIMEOUT)
+    return genres
+
+
+def sync_genre_titles(kind: str, genre_id: int) -> None:
+    """
+    Store the most popular titles of a genre and link them to it.
+
+    Runs at most once per GENRE_PAGE_SYNC_TIMEOUT per genre; the titles
+    are written with catalog.upsert_batch (one diff query, one bulk upsert
+    and one bulk insert of genre links).
+
+    Args:
+        kind: 'movie' or 'tv'
+        genre_id: TMDb genre ID
+    """
+    sync_key = f'genre_titles_synced:{kind}:{genre_id}'
+    if cache.get(sync_key):
+        return
+
+    url = (
+        f'{TMDB_BASE_URL}/discover/{kind}?api_key={TMDB_API_KEY}'
+        f'&language=en-US&sort_by=popularity.desc&with_genres={genre_id}'
+    )
+    data = make_api_request(url)
+    if data is None:
+        return  # Serve what is stored; try again on the next view
+
+    get_genre_catalog(kind)  # Links are only written for known genres
+    catalog.upsert_batch(catalog.CATALOG_KINDS[kind], data.get('results', []))
+    cache.set(sync_key, True, GENRE_PAGE_SYNC_TIMEOUT)
+
+
+def titles_in_genre(kind: str, genre_id: int) -> QuerySet:
+    """
+    Get the stored titles of a genre, best rated first.
+
+    Filters on the indexed genre link table; every (title, genre) link is
+    unique, so no DISTINCT is needed.
+    """
+    model = catalog.CATALOG_KINDS[kind].model
+    return (
+        model.objects.filter(genres__id=genre_id)
+        .only('id', 'title', 'overview', 'poster_path', 'release_date', 'vote_average')
+        .order_by('-vote_average', 'id')
+    )
@@ -0,0 +1,74 @@
+"""
+Benchmark the precompressed response variants against compressing per request.
+"""
+
+import gzip
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from moviedb import utils
+from moviedb.fake_tmdb import FakeTMDBServer
+
+# Isolated cache so clearing it between runs never touches the real one
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-compression',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare bytes sent and CPU per cached request for identity, precompressed and per-request gzip bodies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/', '/api/popular/', '/api/genre/action/'],
+            help='Cached routes to request (served from a local fake TMDb server)',
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Cached requests timed per encoding')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+
+        client = Client()
+        with FakeTMDBServer() as server, \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url), \
+                override_settings(CACHES=BENCHMARK_CACHES):
+            for path in options['paths']:
+                cache.clear()
+                start = time.process_time()
+                response = client.get(path)  # Fills the cache, compressing every variant once
+                fill_cpu = time.process_time() - start
+                if response.status_code != 200 or response.get('X-Cache') != 'MISS':
+                    self.stderr.write(f'{path}: not a cached route ({response.status_code}), skipped')
+                    continue
+
+                identity = response.content
+                self.stdout.write(f'{path}  {len(identity)} bytes, first request {fill_cpu * 1000:.1f}ms CPU')
+                for encoding in ('identity', 'gzip', 'br'):
+                    body, cpu = self.time_requests(client, path, encoding, options['requests'])
+                    self.report(encoding, len(identity), len(body), cpu)
+
+                # What a generic GZip middleware pays: the identity hit plus compressing it every time
+                _, identity_cpu = self.time_requests(client, path, 'identity', options['requests'])
+                start = time.process_time()
+                for _ in range(options['requests']):
+                    body = gzip.compress(identity, compresslevel=6)
+                gzip_cpu = (time.process_time() - start) / options['requests']
+                self.report('gzip/req', len(identity), len(body), identity_cpu + gzip_cpu)
+
+    def time_requests(self, client, path, encoding, count):
+        start = time.process_time()
+        for _ in range(count):
+            response = client.get(path, HTTP_ACCEPT_ENCODING=encoding)
+        return response.content, (time.process_time() - start) / count
+
+    def report(self, label, identity_size, size, cpu):
+        saved = 100 * (1 - size / identity_size) if identity_size else 0
+        self.stdout.write(f'  {label:<9} {size:>9} bytes  saved={saved:5.1f}%  cpu={cpu * 1000:7.3f}ms/request')
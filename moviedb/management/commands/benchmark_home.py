@@ -0,0 +1,63 @@
+"""
+Benchmark cold renders of the home page with sequential vs concurrent rail fetches.
+"""
+
+import statistics
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from moviedb import utils, views
+from moviedb.fake_tmdb import FakeTMDBServer
+
+# Isolated cache so clearing it between runs never touches the real one
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-home',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare sequential and concurrent cold-render latency of the home page against a local fake TMDb server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency', type=float, default=0.1, help='Fake upstream latency per request in seconds')
+        parser.add_argument('--runs', type=int, default=5, help='Cold renders per mode')
+        parser.add_argument('--workers', type=int, default=settings.API_FAN_OUT_MAX_WORKERS, help='Pool size for the concurrent mode')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        modes = (('sequential', 1), ('concurrent', options['workers']))
+
+        with FakeTMDBServer(latency=options['latency']) as server, \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url), \
+                override_settings(CACHES=BENCHMARK_CACHES):
+            self.stdout.write(
+                f"{len(views.HOME_MOVIE_RAILS)} rails, {options['latency'] * 1000:.0f}ms upstream latency, "
+                f"{options['runs']} cold renders per mode"
+            )
+            for label, workers in modes:
+                timings = []
+                with override_settings(API_FAN_OUT_MAX_WORKERS=workers):
+                    for _ in range(options['runs']):
+                        cache.clear()
+                        start = time.perf_counter()
+                        response = views.home(factory.get('/'))
+                        timings.append(time.perf_counter() - start)
+                        if response.status_code != 200:
+                            raise RuntimeError(f'Home page returned {response.status_code}')
+
+                self.stdout.write(
+                    f'{label:<11} workers={workers:<3} '
+                    f'median={statistics.median(timings) * 1000:8.1f}ms '
+                    f'min={min(timings) * 1000:8.1f}ms '
+                    f'max={max(timings) * 1000:8.1f}ms'
+                )
+
+            self.stdout.write(f'Upstream requests served: {server.total_hits}')
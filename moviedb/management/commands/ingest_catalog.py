@@ -0,0 +1,139 @@
+"""
+Mirror the TMDb catalog into the local Movie, Series and Genre tables.
+
+Two sources:
+  discover  Popular titles page by page (at most 500 pages of 20 per type)
+  export    Every ID in TMDb's daily export, with a details call per title
+
+Both stream in batches and save a checkpoint after each one, so an
+interrupted run picks up where it stopped. Export titles whose details
+fetch failed are kept in the checkpoint and retried, so a TMDb outage
+does not skip them.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from requests.exceptions import RequestException
+from urllib3.exceptions import HTTPError
+
+from moviedb import catalog
+from moviedb.response_cache import CATALOG_ROUTES, invalidate_api_responses
+
+
+class Command(BaseCommand):
+    help = 'Bulk-ingest TMDb discover pages or daily ID exports into the local catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=['movie', 'tv', 'all'], default='all', help='Media type to ingest')
+        parser.add_argument('--source', choices=['discover', 'export'], default='discover', help='What to ingest')
+        parser.add_argument('--pages', type=int, default=catalog.DISCOVER_MAX_PAGES, help='Last discover page to ingest')
+        parser.add_argument('--date', type=date.fromisoformat, help='Export date (default: yesterday, the newest complete export)')
+        parser.add_argument('--min-popularity', type=float, default=0, help='Skip export entries below this popularity')
+        parser.add_argument('--batch-size', type=int, default=200, help='Titles written per transaction')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent TMDb requests')
+        parser.add_argument('--restart', action='store_true', help='Ignore saved checkpoints and start over')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be at least 1')
+
+        kinds = ['movie', 'tv'] if options['kind'] == 'all' else [options['kind']]
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='ingest') as executor:
+            for name in kinds:
+                kind = catalog.CATALOG_KINDS[name]
+                genres = catalog.upsert_genres(kind)
+                self.stdout.write(f'{name}: {genres} genres')
+
+                if options['source'] == 'discover':
+                    written = self.ingest_discover(kind, executor, options)
+                else:
+                    written = self.ingest_export(kind, executor, options)
+                self.stdout.write(self.style.SUCCESS(f'{name}: {written} titles written'))
+                invalidate_api_responses(*CATALOG_ROUTES[name])
+
+    def ingest_discover(self, kind, executor, options):
+        checkpoint = f'discover:{kind.name}'
+        state = {} if options['restart'] else catalog.load_checkpoint(checkpoint)
+        last_page = min(options['pages'], state.get('total_pages', catalog.DISCOVER_MAX_PAGES))
+        page = state.get('next_page', 1)
+        written = 0
+
+        # One window of pages is fetched concurrently, then written as a batch
+        window = max(1, min(options['workers'], options['batch_size'] // 20))
+        while page <= last_page:
+            pages = range(page, min(page + window, last_page + 1))
+            responses = list(executor.map(lambda number: catalog.fetch_discover_page(kind, number), pages))
+            if any(response is None for response in responses):
+                raise CommandError(f'{kind.name}: failed to fetch discover pages {pages.start}-{pages.stop - 1}, rerun to resume')
+
+            results = [result for response in responses for result in response.get('results', [])]
+            written += catalog.upsert_batch(kind, results)
+
+            page = pages.stop
+            total_pages = min(catalog.DISCOVER_MAX_PAGES, max(response.get('total_pages', 0) for response in responses))
+            last_page = min(last_page, total_pages)
+            catalog.save_checkpoint(checkpoint, {'next_page': page, 'total_pages': total_pages})
+            self.stdout.write(f'{kind.name}: discover pages up to {page - 1} ({written} titles)')
+
+        return written
+
+    def ingest_export(self, kind, executor, options):
+        export_date = options['date'] or date.today() - timedelta(days=1)
+        checkpoint = f'export:{kind.name}:{export_date.isoformat()}'
+        state = {} if options['restart'] else catalog.load_checkpoint(checkpoint)
+        if state.get('done'):
+            self.stdout.write(f'{kind.name}: export of {export_date} already ingested')
+            return 0
+
+        position = state.get('position', 0)
+        failed = state.get('failed', [])  # IDs whose details fetch failed, retried before the export is done
+        written = 0
+        batch = []
+
+        def fetch(object_id):
+            try:
+                return catalog.fetch_details(kind, object_id, strict=True), None
+            except (RequestException, ValueError) as e:
+                self.stderr.write(f'{kind.name} {object_id}: details fetch failed: {e}')
+                return None, object_id
+
+        def write(object_ids):
+            """Fetch and store the titles; returns the IDs that failed"""
+            nonlocal written
+            results = list(executor.map(fetch, object_ids))
+            written += catalog.upsert_batch(kind, [payload for payload, _ in results if payload], detailed=True)
+            return [object_id for _, object_id in results if object_id is not None]
+
+        def flush(position):
+            failed.extend(write(batch))
+            batch.clear()
+            catalog.save_checkpoint(checkpoint, {'position': position, 'failed': failed})
+            self.stdout.write(f'{kind.name}: {position} export entries read ({written} titles)')
+
+        try:
+            for index, entry in enumerate(catalog.iter_export_entries(kind, export_date), start=1):
+                if index <= position:
+                    continue  # Written by an earlier run
+                if not entry.get('adult') and entry.get('popularity', 0) >= options['min_popularity']:
+                    batch.append(entry['id'])
+                if len(batch) >= options['batch_size']:
+                    flush(index)
+                position = index
+        except (RequestException, HTTPError, OSError, EOFError) as e:
+            raise CommandError(f'{kind.name}: export download failed: {e}, rerun to resume')
+
+        if batch:
+            flush(position)
+
+        # Retry the failed titles once; any still failing keep the export open for the next run
+        retry, failed = failed, []
+        for start in range(0, len(retry), options['batch_size']):
+            failed += write(retry[start:start + options['batch_size']])
+        if failed:
+            catalog.save_checkpoint(checkpoint, {'position': position, 'failed': failed})
+            raise CommandError(f'{kind.name}: {len(failed)} titles could not be fetched, rerun to retry them')
+
+        catalog.save_checkpoint(checkpoint, {'position': position, 'done': True})
+        return written
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:25
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_seasons_and_episodes(apps, schema_editor):
+    """Remove duplicates the new unique constraints would reject, keeping the oldest row."""
+    Season = apps.get_model('moviedb', 'Season')
+    Episode = apps.get_model('moviedb', 'Episode')
+
+    duplicate_seasons = (
+        Season.objects.values('series_id', 'season_number')
+        .annotate(keep_id=Min('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicate_seasons:
+        extra = Season.objects.filter(
+            series_id=duplicate['series_id'], season_number=duplicate['season_number'],
+        ).exclude(id=duplicate['keep_id'])
+        # Episodes of the duplicates move to the kept season before they are deleted
+        Episode.objects.filter(season__in=extra).update(season_id=duplicate['keep_id'])
+        extra.delete()
+
+    duplicate_episodes = (
+        Episode.objects.values('season_id', 'episode_number')
+        .annotate(keep_id=Min('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicate_episodes:
+        Episode.objects.filter(
+            season_id=duplicate['season_id'], episode_number=duplicate['episode_number'],
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('moviedb', '0020_synced_at'),
+    ]
+
+    # Separate from the constraints so the row changes are committed before
+    # the tables are altered (PostgreSQL refuses ALTER TABLE with pending
+    # foreign key checks in the same transaction)
+    operations = [
+        migrations.RunPython(merge_duplicate_seasons_and_episodes, migrations.RunPython.noop),
+    ]
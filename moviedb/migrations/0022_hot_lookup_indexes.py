@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+COVERING_EPISODE_INDEX = 'episode_listing_covering_idx'
+
+
+def create_covering_episode_index(apps, schema_editor):
+    # Index-only scans for episode listings; only PostgreSQL has INCLUDE
+    # (on SQLite unique_episode_per_season serves the ordered listing)
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {COVERING_EPISODE_INDEX} ON moviedb_episode (season_id, episode_number) '
+            f'INCLUDE (id, name, air_date, vote_average)'
+        )
+
+
+def drop_covering_episode_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {COVERING_EPISODE_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('moviedb', '0021_merge_duplicate_seasons_and_episodes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['tmdb_id'], name='movie_tmdb_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['imdb_id'], name='movie_imdb_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['release_date'], name='movie_release_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['vote_average'], name='movie_vote_average_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='series',
+            index=models.Index(fields=['imdb_id'], name='series_imdb_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='episode',
+            constraint=models.UniqueConstraint(fields=('season', 'episode_number'), name='unique_episode_per_season'),
+        ),
+        migrations.AddConstraint(
+            model_name='season',
+            constraint=models.UniqueConstraint(fields=('series', 'season_number'), name='unique_season_per_series'),
+        ),
+        migrations.RunPython(create_covering_episode_index, drop_covering_episode_index),
+    ]
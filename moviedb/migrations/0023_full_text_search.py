@@ -0,0 +1,63 @@
+# Full-text search indexes over movie and series titles and overviews.
+# SQLite: external-content FTS5 tables kept in sync by triggers, so inserts,
+# upserts and updates from any code path (including bulk_create/bulk_update)
+# are indexed. PostgreSQL: GIN expression indexes, which need no syncing.
+# The expressions must match moviedb.search.
+
+from django.db import migrations
+
+TABLES = ('moviedb_movie', 'moviedb_series')
+
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(overview, '')), 'B')"
+)
+
+
+def sqlite_statements(table):
+    fts = f'{table}_fts'
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"title, overview, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, title, overview) VALUES (new.id, new.title, new.overview); END",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, overview) VALUES ('delete', old.id, old.title, old.overview); END",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF title, overview ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, overview) VALUES ('delete', old.id, old.title, old.overview); "
+        f"INSERT INTO {fts}(rowid, title, overview) VALUES (new.id, new.title, new.overview); END",
+        # Index the rows that already exist
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in TABLES:
+        if vendor == 'sqlite':
+            for statement in sqlite_statements(table):
+                schema_editor.execute(statement)
+        elif vendor == 'postgresql':
+            schema_editor.execute(f'CREATE INDEX {table}_search_idx ON {table} USING GIN (({POSTGRES_SEARCH_VECTOR}))')
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in TABLES:
+        if vendor == 'sqlite':
+            for trigger in ('insert', 'delete', 'update'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{trigger}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        elif vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('moviedb', '0022_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -31,6 +31,18 @@ class Movie(models.Model):
     dood_url = models.URLField(blank=True, null=True)
     imdb_id = models.CharField(max_length=10, blank=True, null=True)
     tmdb_id = models.IntegerField(blank=True, null=True)
+    synced_at = models.DateTimeField(blank=True, null=True)  # Last refresh from TMDb
+    payload = models.JSONField(blank=True, null=True)  # Serialized detail API response
+    payload_fetched_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tmdb_id'], name='movie_tmdb_id_idx'),
+            models.Index(fields=['imdb_id'], name='movie_imdb_id_idx'),
+            # (sort key, id) pairs for keyset pagination, see pagination.py
+            models.Index(fields=['release_date', 'id'], name='movie_release_date_idx'),
+            models.Index(fields=['vote_average', 'id'], name='movie_vote_average_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -54,7 +66,17 @@ class Series(models.Model):
     number_of_seasons = models.IntegerField(default=0)
     number_of_episodes = models.IntegerField(default=0)
     status = models.CharField(max_length=100, blank=True, null=True)
+    synced_at = models.DateTimeField(blank=True, null=True)  # Last refresh from TMDb
+    payload = models.JSONField(blank=True, null=True)  # Serialized detail API response
+    payload_fetched_at = models.DateTimeField(blank=True, null=True)
     # Add more fields as needed
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['imdb_id'], name='series_imdb_id_idx'),
+            models.Index(fields=['release_date', 'id'], name='series_release_date_idx'),
+            models.Index(fields=['vote_average', 'id'], name='series_vote_average_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -66,6 +88,13 @@ class Season(models.Model):
     overview = models.TextField(blank=True)
     air_date = models.DateField(null=True, blank=True)
     episode_count = models.IntegerField(default=0)
+    synced_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # Also the index for listing a series' seasons in order
+            models.UniqueConstraint(fields=['series', 'season_number'], name='unique_season_per_series'),
+        ]
 
 class Episode(models.Model):
     season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='episodes')
@@ -74,4 +103,21 @@ class Episode(models.Model):
     overview = models.TextField(blank=True)
     air_date = models.DateField(null=True, blank=True)
     vote_average = models.FloatField(default=0)
+    synced_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # Also the index for listing a season's episodes in order
+            models.UniqueConstraint(fields=['season', 'episode_number'], name='unique_episode_per_season'),
+        ]
+
 
+
+class SyncCheckpoint(models.Model):
+    """Resume position of a catalog ingestion or sync job, keyed by job name."""
+    name = models.CharField(max_length=100, unique=True)
+    state = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
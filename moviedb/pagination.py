@@ -0,0 +1,158 @@
+"""
+Keyset (cursor) pagination for stored movies and series.
+Pages are read by seeking an index on (sort key, id) from the last row
+seen, so page 500 costs the same as page one: no COUNT and no OFFSET
+scan. Cursors are opaque URL-safe tokens; clients only pass them back.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q, QuerySet
+
+# Sort name -> (field, descending); every field is indexed together with id
+SORT_ORDERS = {
+    'rating': ('vote_average', True),
+    'newest': ('release_date', True),
+}
+DEFAULT_SORT = 'rating'
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """A cursor or sort that cannot be used to read a page."""
+
+
+@dataclass
+class CursorPage:
+    items: List[Any]
+    sort: str
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+def encode_cursor(sort: str, value: Any, pk: int, backwards: bool = False) -> str:
+    """Build the opaque cursor pointing just past (value, pk) in a sort order."""
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    token = json.dumps([sort, value, pk, backwards], separators=(',', ':'))
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
+
+
+def decode_cursor(model, cursor: str) -> Tuple[str, Any, int, bool]:
+    """
+    Read a cursor made by encode_cursor.
+
+    Returns:
+        Tuple of (sort, value, pk, backwards), value converted for the sort field
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or tampered with
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort, value, pk, backwards = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        field, _ = SORT_ORDERS[sort]
+        value = model._meta.get_field(field).to_python(value)
+        if not isinstance(pk, int) or not isinstance(backwards, bool) or value is None:
+            raise ValueError(cursor)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError, ValidationError):
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+    return sort, value, pk, backwards
+
+
+def list_queryset(queryset: QuerySet) -> QuerySet:
+    """Defer the large text and JSON columns list pages never render."""
+    large_fields = [
+        field.name for field in queryset.model._meta.concrete_fields
+        if isinstance(field, (models.TextField, models.JSONField))
+    ]
+    return queryset.defer(*large_fields)
+
+
+def paginate(queryset: QuerySet, cursor: Optional[str] = None, sort: str = DEFAULT_SORT,
+             page_size: int = PAGE_SIZE) -> CursorPage:
+    """
+    Read one page of a Movie or Series queryset in a stable keyset order.
+
+    Titles without a value for the sort field (e.g. no release date) are
+    left out of that order. A cursor carries its own sort, which wins
+    over ``sort``.
+
+    Args:
+        queryset: Movie or Series queryset, possibly filtered
+        cursor: next_cursor or previous_cursor of an earlier page, or None for the first page
+        sort: Key of SORT_ORDERS
+        page_size: Rows per page, capped at MAX_PAGE_SIZE
+
+    Returns:
+        CursorPage with the rows and the cursors of the neighbouring pages
+
+    Raises:
+        InvalidCursor: If the cursor or sort cannot be used
+    """
+    model = queryset.model
+    value = pk = None
+    backwards = False
+    if cursor:
+        sort, value, pk, backwards = decode_cursor(model, cursor)
+    if sort not in SORT_ORDERS:
+        raise InvalidCursor(f'Unknown sort: {sort!r}')
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    field, descending = SORT_ORDERS[sort]
+    queryset = list_queryset(queryset).filter(**{f'{field}__isnull': False})
+
+    # Reading backwards walks the same index in the opposite direction
+    reverse = descending != backwards
+    direction = '-' if reverse else ''
+    queryset = queryset.order_by(f'{direction}{field}', f'{direction}pk')
+    if cursor:
+        # The outer bound lets the planner seek the index; the OR breaks ties on pk
+        before, bound = ('lt', 'lte') if reverse else ('gt', 'gte')
+        queryset = queryset.filter(**{f'{field}__{bound}': value}).filter(
+            Q(**{f'{field}__{before}': value}) | Q(**{f'pk__{before}': pk})
+        )
+
+    rows = list(queryset[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    # A backwards read came from a later page, so there is always a next one
+    has_next = True if backwards else more
+    has_previous = more if backwards else cursor is not None
+
+    page = CursorPage(items=rows, sort=sort)
+    if rows:
+        first, last = rows[0], rows[-1]
+        if has_next:
+            page.next_cursor = encode_cursor(sort, getattr(last, field), last.pk)
+        if has_previous:
+            page.previous_cursor = encode_cursor(sort, getattr(first, field), first.pk, backwards=True)
+    return page
+
+
+def paginate_request(request, queryset: QuerySet, page_size: int = PAGE_SIZE) -> CursorPage:
+    """Paginate a queryset from the ``cursor`` and ``sort`` query parameters."""
+    return paginate(
+        queryset,
+        cursor=request.GET.get('cursor') or None,
+        sort=request.GET.get('sort') or DEFAULT_SORT,
+        page_size=page_size,
+    )
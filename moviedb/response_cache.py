@@ -0,0 +1,252 @@
+"""
+Full-response cache, conditional GETs and precompressed bodies.
+A hit returns the stored response bytes before the view runs, so it skips
+the upstream cache lookup, the serializers and the encoder. Entries are
+keyed by route, path and normalized query string, expire per route, and
+can be dropped per route with invalidate_api_responses.
+
+Bodies are compressed once, when the entry is stored: the gzip and
+brotli variants are kept next to the identity body and picked per
+request from Accept-Encoding.
+
+API responses carry a strong ETag (a hash of the body, stored with the
+cached bytes) and Last-Modified, and repeat requests that send
+If-None-Match or If-Modified-Since get an empty 304.
+"""
+
+import gzip
+import hashlib
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlencode
+
+import brotli
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, set_response_etag
+from django.utils.http import http_date, parse_http_date_safe
+
+# Seconds a response is cached, by URL name; other routes are not cached
+RESPONSE_CACHE_TTLS = {
+    'home': 60 * 5,
+    'api_trending': 60 * 10,
+    'api_popular': 60 * 30,
+    'api_top_rated': 60 * 60,
+    'api_latest': 60 * 10,
+    'api_genre_movies': 60 * 30,
+    'api_home': 60 * 10,  # As fresh as its shortest-lived rail
+    'api_search': 60 * 5,
+    'api_movies_list': 60 * 5,
+    'api_series_list': 60 * 5,
+    # Short: detail payloads refresh themselves once they go stale
+    'api_movie_detail': 60,
+    'api_series_detail': 60,
+    'api_batch': 60,
+}
+
+# Routes whose responses are built from the stored catalog, by media type
+CATALOG_ROUTES = {
+    'movie': ('api_movies_list', 'api_movie_detail', 'api_batch', 'api_search'),
+    'tv': ('api_series_list', 'api_series_detail', 'api_batch', 'api_search'),
+}
+
+# Query parameters that never change a response (cache busters, tracking)
+IGNORED_QUERY_PARAMS = {'_', 'utm_source', 'utm_medium', 'utm_campaign'}
+
+ROUTE_VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+# Smaller bodies are not worth a Content-Encoding
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9  # 10-11 compress far slower for a few percent
+
+
+def _version_key(route: str) -> str:
+    return f'api_response_version:{route}'
+
+
+def route_version(route: str) -> int:
+    """Current cache version of a route (set on first use); bumped by invalidate_api_responses."""
+    version = cache.get(_version_key(route))
+    if version is None:
+        # Never fall back to an old version whose entries may still be cached
+        cache.add(_version_key(route), time.time_ns(), ROUTE_VERSION_TIMEOUT)
+        version = cache.get(_version_key(route), 0)
+    return version
+
+
+def invalidate_api_responses(*routes: str) -> None:
+    """Drop every cached response of the given routes (URL names)."""
+    for route in routes:
+        cache.set(_version_key(route), time.time_ns(), ROUTE_VERSION_TIMEOUT)
+
+
+def normalized_query(query_dict) -> str:
+    """Query string with sorted parameters, without empty and ignored ones."""
+    items = sorted(
+        (name, value)
+        for name in query_dict
+        if name not in IGNORED_QUERY_PARAMS
+        for value in query_dict.getlist(name)
+        if value != ''
+    )
+    return urlencode(items)
+
+
+def response_cache_key(route: str, request) -> str:
+    """
+    Cache key of a request's response, see normalized_query.
+
+    The key does not contain the route version; entries store the version
+    they were built under, so a lookup reads the entry and the current
+    version with one get_many.
+    """
+    url = f'{request.path}?{normalized_query(request.GET)}'
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'api_response:{route}:{digest}'
+
+
+def compress_variants(content: bytes) -> Dict[str, bytes]:
+    """
+    Compress a body with every available encoding.
+
+    Returns:
+        Encoded bodies by Content-Encoding, only those smaller than the body
+    """
+    if len(content) < MIN_COMPRESS_SIZE:
+        return {}
+    variants = {
+        'gzip': gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0),
+        'br': brotli.compress(content, quality=BROTLI_QUALITY),
+    }
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(content)}
+
+
+def choose_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Pick the Content-Encoding to send for an Accept-Encoding header.
+
+    The accepted coding with the highest q-value wins, brotli over gzip
+    on a tie; codings with q=0 are refused.
+
+    Returns:
+        'br', 'gzip', or None for the identity body
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    qualities = {
+        encoding: accepted.get(encoding, accepted.get('*', 0))
+        for encoding in ('br', 'gzip') if encoding in available
+    }
+    best = max(qualities, key=qualities.get, default=None)  # First (br) on a tie
+    return best if best is not None and qualities[best] > 0 else None
+
+
+def encode_response(request, response, entry: Dict[str, Any]) -> HttpResponse:
+    """Send the entry's body variant the client accepts, with its own ETag."""
+    patch_vary_headers(response, ['Accept-Encoding'])
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), entry['variants'])
+    if encoding is None:
+        return response
+
+    # Each representation needs its own strong ETag
+    response.content = entry['variants'][encoding]
+    response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(response.content))
+    response['ETag'] = f'{entry["etag"][:-1]}-{encoding}"'
+    return response
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve cached responses of the routes in RESPONSE_CACHE_TTLS, and
+    answer conditional requests to them and any /api/ route with 304.
+
+    Only successful GET responses without credentials are stored, and
+    not if the view marks them no-store (e.g. because TMDb was down).
+    Works for both the sync and the async API views.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.finalize(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        # Compressing the variants and the cache write would stall the event loop
+        return await sync_to_async(self.finalize)(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs) -> Optional[HttpResponse]:
+        route = request.resolver_match.url_name if request.resolver_match else None
+        cacheable = route in RESPONSE_CACHE_TTLS
+        request.response_cache_route = route if cacheable or (route or '').startswith('api_') else None
+        if not cacheable or request.method != 'GET' or 'Authorization' in request.headers:
+            return None
+
+        request.response_cache_key = response_cache_key(route, request)
+        request.response_cache_timeout = RESPONSE_CACHE_TTLS[route]
+        found = cache.get_many([request.response_cache_key, _version_key(route)])
+        # Read before the view runs, so a change during it leaves the stored entry outdated
+        request.response_cache_version = found.get(_version_key(route))
+        entry = found.get(request.response_cache_key)
+        if entry is None or request.response_cache_version is None or entry['version'] != request.response_cache_version:
+            return None
+
+        request.response_cache_key = None  # Nothing to store
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        response['X-Cache'] = 'HIT'
+        return encode_response(request, response, entry)
+
+    def finalize(self, request, response):
+        if (getattr(request, 'response_cache_route', None) is None or request.method not in ('GET', 'HEAD')
+                or response.status_code != 200 or response.streaming):
+            return response
+
+        if not response.has_header('ETag'):
+            set_response_etag(response)
+        if not response.has_header('Cache-Control'):
+            # Browsers may keep the response but must revalidate it, which is a 304 when unchanged
+            patch_cache_control(response, no_cache=True)
+
+        cache_key = getattr(request, 'response_cache_key', None)
+        if cache_key and 'no-store' not in response['Cache-Control'] and not response.cookies:
+            entry = {
+                'version': request.response_cache_version or route_version(request.response_cache_route),
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': response['ETag'],
+                'last_modified': parse_http_date_safe(response.get('Last-Modified')) or int(time.time()),
+                'variants': compress_variants(response.content),
+            }
+            cache.set(cache_key, entry, request.response_cache_timeout)
+            response['Last-Modified'] = http_date(entry['last_modified'])
+            response['X-Cache'] = 'MISS'
+            response = encode_response(request, response, entry)
+
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            response=response,
+        )
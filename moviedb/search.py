@@ -0,0 +1,148 @@
+"""
+Local full-text search over stored movies and series.
+Titles and overviews are indexed in the database (an FTS5 table on SQLite,
+a GIN expression index on PostgreSQL, see migration 0023) and kept in sync
+by the database itself, so saves, bulk upserts and catalog ingestion are all
+searchable right away. TMDb is only asked when the local catalog has too
+few matches.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from django.db import connection
+
+from . import catalog, utils
+from .write_behind import enqueue_upserts
+
+logger = logging.getLogger(__name__)
+
+# Fewer local matches than this and TMDb is searched as well
+SEARCH_MIN_LOCAL_RESULTS = 5
+SEARCH_RESULT_LIMIT = 20
+
+# Search terms beyond this are ignored
+MAX_SEARCH_TERMS = 8
+
+# Expression behind the PostgreSQL GIN index; queries must use it verbatim
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(overview, '')), 'B')"
+)
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a user query into the word tokens used for matching."""
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_ids(model, query: str, limit: int = SEARCH_RESULT_LIMIT) -> Optional[List[int]]:
+    """
+    Find stored titles matching every word of a query (as prefixes), best match first.
+
+    Title matches rank above overview matches.
+
+    Args:
+        model: Movie or Series
+        query: User search query
+        limit: Maximum number of IDs
+
+    Returns:
+        Ranked primary keys, or None if the database has no full-text index
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        # Quoted, so FTS5 operators in the query are matched as plain words
+        sql = (
+            f'SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s '
+            f'ORDER BY bm25({table}_fts, 10.0, 1.0) LIMIT %s'
+        )
+        params = [' '.join(f'"{term}"*' for term in terms), limit]
+    elif connection.vendor == 'postgresql':
+        sql = (
+            f"SELECT id FROM {table}, to_tsquery('english', %s) query "
+            f"WHERE ({POSTGRES_SEARCH_VECTOR}) @@ query "
+            f"ORDER BY ts_rank({POSTGRES_SEARCH_VECTOR}, query) DESC, id LIMIT %s"
+        )
+        params = [' & '.join(f'{term}:*' for term in terms), limit]
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_local(model, query: str, limit: int = SEARCH_RESULT_LIMIT) -> List[Any]:
+    """
+    Search stored titles, best match first.
+
+    Falls back to a title icontains filter on databases without a
+    full-text index.
+
+    Args:
+        model: Movie or Series
+        query: User search query
+        limit: Maximum number of results
+
+    Returns:
+        List of model instances
+    """
+    ids = search_ids(model, query, limit)
+    if ids is None:
+        return list(model.objects.filter(title__icontains=query.strip()).order_by('-vote_average')[:limit])
+
+    rows = model.objects.in_bulk(ids)
+    return [rows[object_id] for object_id in ids if object_id in rows]
+
+
+def title_payload(kind: str, row) -> Dict[str, Any]:
+    """Convert a stored Movie or Series to the shape of a TMDb search result."""
+    release_date = row.release_date.isoformat() if row.release_date else None
+    payload = {
+        'id': row.id,
+        'poster_path': row.poster_path,
+        'vote_average': row.vote_average,
+    }
+    if 'overview' not in row.get_deferred_fields():  # Deferred on list pages
+        payload['overview'] = row.overview or ''
+    if kind == 'movie':
+        payload.update(title=row.title, release_date=release_date)
+    else:
+        payload.update(name=row.title, first_air_date=release_date)
+    return payload
+
+
+def search_catalog(kind: str, query: str, limit: int = SEARCH_RESULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Search movies or series locally, asking TMDb only when recall is low.
+
+    TMDb results are queued for storage, so later searches for them are
+    answered locally.
+
+    Args:
+        kind: 'movie' or 'tv'
+        query: User search query
+        limit: Maximum number of results
+
+    Returns:
+        List of TMDb-shaped result dictionaries, local matches first
+    """
+    model = catalog.CATALOG_KINDS[kind].model
+    results = [title_payload(kind, row) for row in search_local(model, query, limit)]
+    if len(results) >= SEARCH_MIN_LOCAL_RESULTS:
+        return results
+
+    logger.debug(f"Only {len(results)} local {kind} results for '{query}', searching TMDb")
+    upstream_results = utils.search_movies(query) if kind == 'movie' else utils.search_series(query)
+    if upstream_results:
+        enqueue_upserts(kind, upstream_results)
+
+    seen = {result['id'] for result in results}
+    results.extend(result for result in upstream_results if result.get('id') not in seen)
+    return results[:limit]
@@ -1,5 +1,7 @@
 import requests
-from .models import Movie, Series
+from . import upstream
+from .catalog import movie_row, series_row
+from .write_behind import enqueue_upserts
 
 class SearchService:
     def __init__(self, api_key):
@@ -18,24 +20,12 @@ class SearchService:
             'query': query
         }
         try:
-            movie_response = requests.get(movie_url, params=movie_params)
+            movie_response = upstream.get(movie_url, params=movie_params)
             movie_response.raise_for_status()
             movie_results = movie_response.json().get('results', [])
-            movies = []
-            for result in movie_results:
-                if result.get('poster_path'):
-                    movie, created = Movie.objects.update_or_create(
-                        id=result['id'],
-                        defaults={
-                            'title': result['title'],
-                            'overview': result.get('overview', ''),
-                            'release_date': result.get('release_date', None),
-                            'poster_path': result.get('poster_path', ''),
-                            'vote_average': result.get('vote_average', 0)
-                        }
-                    )
-                    movies.append(movie)
-            return movies
+            movie_results = [result for result in movie_results if result.get('poster_path')]
+            enqueue_upserts('movie', movie_results)
+            return [movie_row(result) for result in movie_results]
         except requests.RequestException as e:
             raise
 
@@ -47,23 +37,11 @@ class SearchService:
             'query': query
         }
         try:
-            series_response = requests.get(series_url, params=series_params)
+            series_response = upstream.get(series_url, params=series_params)
             series_response.raise_for_status()
             series_results = series_response.json().get('results', [])
-            series = []
-            for result in series_results:
-                if result.get('poster_path'):
-                    serie, created = Series.objects.update_or_create(
-                        id=result['id'],  # assuming TMDB ID is used as the primary key
-                        defaults={
-                            'title': result['name'],
-                            'summary': result.get('overview', ''),
-                            'release_date': result.get('first_air_date', None),
-                            'poster': result.get('poster_path', ''),
-                            'vote_average': result.get('vote_average', 0)
-                        }
-                    )
-                    series.append(serie)
-            return series
+            series_results = [result for result in series_results if result.get('poster_path')]
+            enqueue_upserts('tv', series_results)
+            return [series_row(result) for result in series_results]
         except requests.RequestException as e:
             raise
\ No newline at end of file
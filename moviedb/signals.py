@@ -0,0 +1,47 @@
+"""
+Model signal handlers for the moviedb app.
+Keep cached data derived from the database in step with row changes.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Episode, Movie, Season, Series
+from .response_cache import CATALOG_ROUTES, invalidate_api_responses
+from .utils import invalidate_series_seasons
+
+
+def _invalidate_after_commit(series_id):
+    # After commit, so a concurrent reader cannot re-cache the old rows
+    transaction.on_commit(lambda: invalidate_series_seasons(series_id))
+    transaction.on_commit(lambda: invalidate_api_responses('api_series_detail'))
+
+
+@receiver([post_save, post_delete], sender=Season)
+def season_changed(sender, instance, **kwargs):
+    """Drop the cached seasons payload and detail responses of the season's series."""
+    _invalidate_after_commit(instance.series_id)
+
+
+@receiver([post_save, post_delete], sender=Episode)
+def episode_changed(sender, instance, **kwargs):
+    """Drop the cached seasons payload and detail responses of the episode's series."""
+    if Episode.season.is_cached(instance):
+        series_id = instance.season.series_id
+    else:
+        series_id = Season.objects.filter(id=instance.season_id).values_list('series_id', flat=True).first()
+    if series_id is not None:
+        _invalidate_after_commit(series_id)
+
+
+@receiver([post_save, post_delete], sender=Movie)
+def movie_changed(sender, instance, **kwargs):
+    """Drop the cached API responses built from stored movies."""
+    transaction.on_commit(lambda: invalidate_api_responses(*CATALOG_ROUTES['movie']))
+
+
+@receiver([post_save, post_delete], sender=Series)
+def series_changed(sender, instance, **kwargs):
+    """Drop the cached API responses built from stored series."""
+    transaction.on_commit(lambda: invalidate_api_responses(*CATALOG_ROUTES['tv']))
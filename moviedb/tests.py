@@ -1,3 +1,1327 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import itertools
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import brotli
+import requests
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Q
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import api_views, async_api_views, catalog, genres, response_cache, upstream, utils, write_behind
+from .cache_backends import TieredCache
+from .cache_keys import canonicalize
+from .fake_tmdb import FakeTMDBServer
+from .api_views import load_series_seasons
+from .models import Episode, Genre, Movie, Season, Series, SyncCheckpoint
+from .pagination import InvalidCursor, paginate
+from .response_cache import RESPONSE_CACHE_TTLS, choose_encoding, invalidate_api_responses
+from .search import search_catalog, search_local
+from .write_behind import WriteBehindQueue
+from .utils import amake_api_request, get_endpoint_cache_stats, get_request_stats, make_api_request, reset_request_stats
+
+@contextmanager
+def no_upstream_retries(**policy):
+    """Give hosts without their own policy (the fake server) a test policy without retries."""
+    with mock.patch.dict(upstream.HOST_POLICIES, {'default': upstream.HostPolicy(hosts=(), retries=0, **policy)}):
+        upstream.close_sessions()
+        upstream.reset_circuit_breakers()
+        try:
+            yield
+        finally:
+            upstream.close_sessions()
+            upstream.reset_circuit_breakers()
+
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'moviedb-tests',
+    }
+}
+
+
+# The configured backend (see settings.CACHES), in a throwaway directory
+TIERED_TEST_CACHES = {
+    'default': {
+        'BACKEND': 'moviedb.cache_backends.TieredCache',
+        'LOCATION': tempfile.mkdtemp(prefix='moviedb-tests-'),
+        'OPTIONS': {'L1_LOCATION': 'moviedb-tests-tiered'},
+    }
+}
+
+
+def fetch_concurrently_at_once(url, callers):
+    """Call make_api_request for the same URL from many threads at the same moment."""
+    barrier = threading.Barrier(callers)
+
+    def fetch(_):
+        barrier.wait()
+        return make_api_request(url)
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        return list(executor.map(fetch, range(callers)))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MakeApiRequestCoalescingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_request_stats()
+
+    def test_concurrent_misses_share_one_upstream_request(self):
+        callers = 25
+        with FakeTMDBServer(latency=0.3) as server:
+            results = fetch_concurrently_at_once(f'{server.base_url}/movie/popular?page=1', callers)
+
+        self.assertEqual(server.hits['/movie/popular'], 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(len(results[0]['results']), 20)
+
+        stats = get_request_stats()
+        self.assertEqual(stats['upstream_fetches'], 1)
+        self.assertEqual(stats['coalesced_waits'], callers - 1)
+
+    def test_failed_fetch_is_shared_and_negatively_cached(self):
+        with FakeTMDBServer(latency=0.2, routes={'/movie/1': 404}) as server:
+            url = f'{server.base_url}/movie/1'
+            results = fetch_concurrently_at_once(url, 5)
+            self.assertEqual(results, [None] * 5)
+            self.assertEqual(server.hits['/movie/1'], 1)
+
+            self.assertIsNone(make_api_request(url))
+            self.assertEqual(server.hits['/movie/1'], 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MakeApiRequestStaleWhileRevalidateTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_request_stats()
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail('Timed out waiting for background refresh')
+            time.sleep(0.01)
+
+    def test_stale_response_is_served_and_refreshed_in_background(self):
+        routes = {'/movie/popular': {'results': ['first']}}
+        with FakeTMDBServer(latency=0.3, routes=routes) as server:
+            url = f'{server.base_url}/movie/popular'
+            self.assertEqual(make_api_request(url, cache_timeout=0), {'results': ['first']})
+
+            routes['/movie/popular'] = {'results': ['second']}
+            start = time.monotonic()
+            self.assertEqual(make_api_request(url, cache_timeout=0), {'results': ['first']})
+            self.assertLess(time.monotonic() - start, 0.2)
+
+            self.wait_for(lambda: get_request_stats()['background_refreshes'] == 1)
+            self.assertEqual(server.hits['/movie/popular'], 2)
+            self.assertEqual(make_api_request(url, cache_timeout=0), {'results': ['second']})
+            self.wait_for(lambda: get_request_stats()['background_refreshes'] == 2)
+
+    def test_failed_refresh_keeps_serving_stale_response(self):
+        routes = {'/movie/1': {'id': 1}}
+        with FakeTMDBServer(routes=routes) as server, no_upstream_retries():
+            url = f'{server.base_url}/movie/1'
+            make_api_request(url, cache_timeout=0)
+
+            routes['/movie/1'] = 503
+            self.assertEqual(make_api_request(url, cache_timeout=0), {'id': 1})
+            self.wait_for(lambda: get_request_stats()['refresh_failures'] == 1)
+
+            # The failure is negatively cached, so no new refresh is started
+            self.assertEqual(make_api_request(url, cache_timeout=0), {'id': 1})
+            self.assertEqual(server.hits['/movie/1'], 2)
+
+
+@override_settings(CACHES=TIERED_TEST_CACHES)
+class TieredMakeApiRequestCoalescingTests(MakeApiRequestCoalescingTests):
+    """The coalescing tests, through the tiered backend used in production."""
+
+
+@override_settings(CACHES=TIERED_TEST_CACHES)
+class MakeApiRequestTieredCacheTests(MakeApiRequestStaleWhileRevalidateTests):
+    """The stale-while-revalidate tests and cache timeouts, through the tiered backend used in production."""
+
+    def test_lock_of_a_dead_worker_expires(self):
+        with FakeTMDBServer() as server, mock.patch.object(utils, 'SINGLE_FLIGHT_LOCK_TIMEOUT', 1):
+            url = f'{server.base_url}/movie/popular'
+            cache_key = canonicalize(url).cache_key
+            # Taken by a worker that died before fetching or releasing it
+            self.assertTrue(cache.add(f'{cache_key}:lock', True, utils.SINGLE_FLIGHT_LOCK_TIMEOUT))
+
+            start = time.monotonic()
+            self.assertEqual(len(make_api_request(url)['results']), 20)
+            self.assertLess(time.monotonic() - start, 3)
+        self.assertEqual(get_request_stats()['coalesced_wait_timeouts'], 0)
+        self.assertIsNone(cache.get(f'{cache_key}:lock'))
+
+    def test_refresh_is_retried_once_the_failure_expires(self):
+        routes = {'/movie/1': {'id': 1}}
+        with FakeTMDBServer(routes=routes) as server, no_upstream_retries(), \
+                mock.patch.object(utils, 'FAILURE_CACHE_TIMEOUT', 1):
+            url = f'{server.base_url}/movie/1'
+            make_api_request(url, cache_timeout=0)
+
+            routes['/movie/1'] = 503
+            make_api_request(url, cache_timeout=0)
+            self.wait_for(lambda: get_request_stats()['refresh_failures'] == 1)
+
+            routes['/movie/1'] = {'id': 2}
+            time.sleep(1.1)
+            self.assertEqual(make_api_request(url, cache_timeout=0), {'id': 1})
+            self.wait_for(lambda: get_request_stats()['background_refreshes'] == 1)
+            self.assertEqual(make_api_request(url, cache_timeout=0), {'id': 2})
+
+    def test_failures_are_negatively_cached_only_for_their_timeout(self):
+        routes = {'/movie/1': 503}
+        with FakeTMDBServer(routes=routes) as server, no_upstream_retries(), \
+                mock.patch.object(utils, 'FAILURE_CACHE_TIMEOUT', 1):
+            url = f'{server.base_url}/movie/1'
+            self.assertIsNone(make_api_request(url))
+
+            routes['/movie/1'] = {'id': 1}
+            self.assertIsNone(make_api_request(url))
+            self.assertEqual(server.hits['/movie/1'], 1)
+
+            time.sleep(1.1)
+            self.assertEqual(make_api_request(url), {'id': 1})
+            self.assertEqual(server.hits['/movie/1'], 2)
+
+
+@override_settings(CACHES=TIERED_TEST_CACHES)
+class AsyncMakeApiRequestTests(SimpleTestCase):
+    """amake_api_request behaves like make_api_request under concurrent async callers."""
+
+    def setUp(self):
+        cache.clear()
+        reset_request_stats()
+
+    async def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail('Timed out waiting for background refresh')
+            await asyncio.sleep(0.01)
+
+    async def test_concurrent_misses_share_one_upstream_request(self):
+        callers = 10
+        with FakeTMDBServer(latency=0.3) as server:
+            url = f'{server.base_url}/movie/popular?page=1'
+            results = await asyncio.gather(*(amake_api_request(url) for _ in range(callers)))
+
+        self.assertEqual(server.hits['/movie/popular'], 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        stats = get_request_stats()
+        self.assertEqual((stats['upstream_fetches'], stats['coalesced_waits']), (1, callers - 1))
+
+    async def test_waits_on_a_fetch_by_another_worker(self):
+        with FakeTMDBServer() as server:
+            url = f'{server.base_url}/movie/popular'
+            cache_key = canonicalize(url).cache_key
+            await cache.aadd(f'{cache_key}:lock', True, 15)
+            waiter = asyncio.ensure_future(amake_api_request(url))
+            await asyncio.sleep(0.1)
+            # The lock holder (another worker) fills the cache and releases the lock
+            await cache.aset(cache_key, *utils._build_entry({'id': 1}, 60))
+            await cache.adelete(f'{cache_key}:lock')
+            self.assertEqual(await waiter, {'id': 1})
+        self.assertEqual(server.total_hits, 0)
+        self.assertEqual(get_request_stats()['coalesced_remote_waits'], 1)
+
+    async def test_stale_response_is_served_and_refreshed_in_background(self):
+        routes = {'/movie/popular': {'results': ['first']}}
+        with FakeTMDBServer(routes=routes) as server:
+            url = f'{server.base_url}/movie/popular'
+            self.assertEqual(await amake_api_request(url, cache_timeout=0), {'results': ['first']})
+
+            routes['/movie/popular'] = {'results': ['second']}
+            threads = []
+            refresh = utils._refresh_in_background
+            with mock.patch.object(utils, '_refresh_in_background',
+                                   side_effect=lambda *args: threads.append(threading.get_ident()) or refresh(*args)):
+                self.assertEqual(await amake_api_request(url, cache_timeout=0), {'results': ['first']})
+            # Its cache read runs on a worker thread, not on the event loop
+            self.assertNotIn(threading.get_ident(), threads)
+            await self.wait_for(lambda: get_request_stats()['background_refreshes'] == 1)
+            self.assertEqual(await amake_api_request(url, cache_timeout=0), {'results': ['second']})
+        self.assertGreaterEqual(server.hits['/movie/popular'], 2)
+
+    async def test_failures_are_negatively_cached(self):
+        with FakeTMDBServer(routes={'/movie/1': 404}) as server, no_upstream_retries():
+            url = f'{server.base_url}/movie/1'
+            self.assertIsNone(await amake_api_request(url))
+            self.assertIsNone(await amake_api_request(url))
+        self.assertEqual(server.hits['/movie/1'], 1)
+
+
+@override_settings(CACHES=TEST_CACHES, WRITE_BEHIND_ENABLED=False)
+class AsyncApiViewTests(TestCase):
+    """The async /api/ views (served when settings.ASYNC_API_VIEWS is on) against a fake TMDb."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    @contextmanager
+    def fake_tmdb(self, **kwargs):
+        with FakeTMDBServer(**kwargs) as server, \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url), \
+                mock.patch.object(async_api_views, 'TMDB_BASE_URL', server.base_url):
+            yield server
+
+    async def test_lists_and_home_rails(self):
+        with self.fake_tmdb() as server:
+            popular = await async_api_views.api_popular(self.factory.get('/api/popular/'))
+            home = await async_api_views.api_home(self.factory.get('/api/home/', {'rails': 'popular,action'}))
+        self.assertEqual(len(json.loads(popular.content)['results']), 20)
+        self.assertEqual(list(json.loads(home.content)['rails']), ['popular', 'action'])
+        # The popular rail reuses the popular list's cached response
+        self.assertEqual(server.total_hits, 2)
+
+        bad = await async_api_views.api_home(self.factory.get('/api/home/', {'rails': 'nope'}))
+        self.assertEqual(bad.status_code, 400)
+
+    async def test_upstream_clients_are_closed_after_wsgi_requests_only(self):
+        loop = asyncio.get_running_loop()
+        self.addCleanup(lambda: upstream._async_clients.pop(loop, None))
+        with self.fake_tmdb():
+            await async_api_views.api_popular(RequestFactory().get('/api/popular/'))
+            self.assertNotIn(loop, upstream._async_clients)  # Its loop ends with the request under WSGI
+
+            await async_api_views.api_trending(self.factory.get('/api/trending/'))
+            clients = list(upstream._async_clients[loop].values())
+            self.assertEqual(len(clients), 1)
+            self.assertFalse(clients[0].is_closed)  # Pooled on the ASGI server's loop
+            await upstream.aclose_async_clients()
+
+    async def test_detail_is_fetched_once_then_served_from_the_stored_payload(self):
+        with self.fake_tmdb(routes={'/movie/7': {'id': 7, 'title': 'Se7en'}, '/movie/8': 404}) as server, \
+                no_upstream_retries():
+            for _ in range(2):
+                response = await async_api_views.api_movie_detail(self.factory.get('/api/movie/7/'), pk=7)
+                self.assertEqual(json.loads(response.content)['title'], 'Se7en')
+            missing = await async_api_views.api_movie_detail(self.factory.get('/api/movie/8/'), pk=8)
+        self.assertEqual(server.hits['/movie/7'], 1)
+        self.assertEqual(missing.status_code, 404)
+        self.assertTrue(await Movie.objects.filter(id=7, payload__isnull=False).aexists())
+
+    async def test_detail_requests_the_same_url_as_the_sync_path(self):
+        with self.fake_tmdb(routes={'/tv/3': {'id': 3, 'name': 'Series'}}) as server:
+            await async_api_views.api_series_detail(self.factory.get('/api/series/3/'), pk=3)
+            # Cached under the sync fetch's key, external_ids included
+            await sync_to_async(utils.fetch_series_details)(3, append_to_response='external_ids')
+        self.assertEqual(server.hits['/tv/3'], 1)
+
+    async def test_batch(self):
+        await Movie.objects.acreate(id=1, title='Stored', payload={'id': 1, 'title': 'Stored'}, payload_fetched_at=timezone.now())
+        routes = {'/movie/2': {'id': 2, 'title': 'Fetched'}, '/movie/4': {'id': 4, 'title': 'Cached'}, '/tv/3': {'id': 3, 'name': 'Series'}}
+        with self.fake_tmdb(routes=routes) as server:
+            await amake_api_request(utils.details_url('movie', 4))
+            with mock.patch.object(async_api_views, 'get_cached_responses', wraps=utils.get_cached_responses) as lookup, \
+                    mock.patch.object(async_api_views, 'amake_api_request', wraps=amake_api_request) as fetch:
+                response = await async_api_views.api_batch(
+                    self.factory.get('/api/batch/', {'movies': '1,2,4', 'series': '3'}),
+                )
+        data = json.loads(response.content)
+        self.assertEqual([data['movies'][pk]['title'] for pk in '124'], ['Stored', 'Fetched', 'Cached'])
+        self.assertEqual(data['series']['3']['name'], 'Series')
+        self.assertEqual(lookup.call_count, 2)  # One get_many per media type
+        self.assertEqual(fetch.call_count, 2)  # Only movie 2 and series 3 were not cached
+        self.assertEqual(dict(server.hits), {'/movie/2': 1, '/movie/4': 1, '/tv/3': 1})
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_circuit_opens_after_failures_and_recovers(self):
+        routes = {'/movie/1': 500}
+        with FakeTMDBServer(routes=routes) as server, \
+                no_upstream_retries(failure_threshold=2, reset_timeout=0.2):
+            url = f'{server.base_url}/movie/1'
+            for _ in range(2):
+                self.assertEqual(upstream.get(url).status_code, 500)
+            self.assertEqual(upstream.get_circuit_states()['default:127.0.0.1'], 'open')
+
+            with self.assertRaises(upstream.CircuitOpenError):
+                upstream.get(url)
+            self.assertEqual(server.hits['/movie/1'], 2)
+
+            routes['/movie/1'] = {'id': 1}
+            time.sleep(0.25)
+            self.assertEqual(upstream.get(url).json(), {'id': 1})
+            self.assertEqual(upstream.get_circuit_states()['default:127.0.0.1'], 'closed')
+
+
+class UpstreamClientTests(SimpleTestCase):
+    def setUp(self):
+        upstream.close_sessions()
+        upstream.reset_circuit_breakers()
+        self.addCleanup(upstream.close_sessions)
+        self.addCleanup(upstream.reset_circuit_breakers)
+
+    def test_sessions_are_pooled_per_host_policy(self):
+        movie = upstream.get_session('https://api.themoviedb.org/3/movie/1')
+        self.assertIs(upstream.get_session('https://api.themoviedb.org/3/tv/2'), movie)
+        self.assertIsNot(upstream.get_session('https://api.tvmaze.com/shows/1'), movie)
+
+        adapter = movie.get_adapter('https://api.themoviedb.org/')
+        self.assertEqual(adapter._pool_maxsize, upstream.HOST_POLICIES['tmdb'].pool_size)
+        self.assertEqual(adapter.max_retries.total, upstream.HOST_POLICIES['tmdb'].retries)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    def test_unlisted_hosts_get_their_own_session_and_circuit(self):
+        failing, healthy = 'https://a.example/movies', 'https://b.example/movies'
+        self.assertIsNot(upstream.get_session(failing), upstream.get_session(healthy))
+        self.assertIs(upstream.get_session(failing), upstream.get_session('https://a.example/series'))
+
+        threshold = upstream.HOST_POLICIES['default'].failure_threshold
+        with mock.patch.object(upstream.get_session(failing), 'get', return_value=mock.Mock(status_code=503)):
+            for _ in range(threshold):
+                upstream.get(failing)
+            with self.assertRaises(upstream.CircuitOpenError):
+                upstream.get(failing)
+        with mock.patch.object(upstream.get_session(healthy), 'get', return_value=mock.Mock(status_code=200)):
+            self.assertEqual(upstream.get(healthy).status_code, 200)
+        self.assertEqual(upstream.get_circuit_states(), {'default:a.example': 'open', 'default:b.example': 'closed'})
+
+    def test_host_policy_timeouts_are_applied(self):
+        url = 'https://api.themoviedb.org/3/movie/1'
+        policy = upstream.HOST_POLICIES['tmdb']
+        with mock.patch.object(upstream.get_session(url), 'get', return_value=mock.Mock(status_code=200)) as get:
+            upstream.get(url)
+            upstream.get(url, timeout=1)
+        self.assertEqual(get.call_args_list[0].kwargs['timeout'], (policy.connect_timeout, policy.read_timeout))
+        self.assertEqual(get.call_args_list[1].kwargs['timeout'], 1)
+
+        with FakeTMDBServer(latency=0.5) as server, no_upstream_retries(read_timeout=0.1):
+            with self.assertRaisesRegex(requests.RequestException, r'read timeout=0\.1'):
+                upstream.get(f'{server.base_url}/movie/popular')
+            self.assertEqual(upstream.get_circuit_breaker('default:127.0.0.1').failures, 1)
+
+    def test_circuit_breaker_state_changes(self):
+        breaker = upstream.CircuitBreaker(upstream.HostPolicy(
+            hosts=(), failure_threshold=2, slow_call_seconds=1, reset_timeout=10,
+        ))
+        now = [1000.0]
+        with mock.patch('time.monotonic', side_effect=lambda: now[0]):
+            breaker.record(failed=True)
+            breaker.record(failed=False)
+            self.assertEqual((breaker.state, breaker.failures), ('closed', 0))
+
+            breaker.record(failed=True)
+            breaker.record(failed=False, elapsed=2)  # Slow calls count as failures
+            self.assertEqual(breaker.state, 'open')
+            self.assertFalse(breaker.allow())
+
+            now[0] += 10
+            self.assertTrue(breaker.allow())
+            self.assertEqual(breaker.state, 'half_open')
+            self.assertFalse(breaker.allow())  # One trial call at a time
+            breaker.record(failed=True)
+            self.assertEqual(breaker.state, 'open')
+
+            now[0] += 10
+            self.assertTrue(breaker.allow())
+            breaker.record(failed=False)
+            self.assertEqual(breaker.state, 'closed')
+
+    def test_trial_call_raising_any_error_settles_the_circuit(self):
+        url = 'https://api.themoviedb.org/3/movie/1'
+        breaker = upstream.get_circuit_breaker('tmdb')
+        breaker.state, breaker.opened_at = 'open', time.monotonic() - upstream.HOST_POLICIES['tmdb'].reset_timeout
+
+        with mock.patch.object(upstream.get_session(url), 'get', side_effect=ValueError('bad header')):
+            with self.assertRaises(ValueError):
+                upstream.get(url)
+        self.assertEqual(breaker.state, 'open')
+        with self.assertRaises(upstream.CircuitOpenError):
+            upstream.get(url)
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.workers = itertools.count()
+
+    def make_worker_cache(self):
+        """Each instance has its own L1, like a separate worker process."""
+        cache = TieredCache(self.location, {'OPTIONS': {'L1_LOCATION': f'tiered-tests-{next(self.workers)}'}})
+        self.addCleanup(cache.clear)
+        return cache
+
+    def test_l2_is_shared_and_hits_are_promoted_to_l1(self):
+        worker_a, worker_b = self.make_worker_cache(), self.make_worker_cache()
+        worker_a.set('movie', {'id': 1}, 300)
+
+        self.assertEqual(worker_b.get('movie'), {'id': 1})
+        with mock.patch.object(worker_b.l2, 'get', side_effect=AssertionError('L2 read')):
+            self.assertEqual(worker_b.get('movie'), {'id': 1})
+
+    def test_get_many_and_set_many_span_both_tiers(self):
+        worker_a, worker_b = self.make_worker_cache(), self.make_worker_cache()
+        worker_a.set_many({'a': 1, 'b': 2}, 300)
+        worker_b.set('c', 3, 300)
+
+        self.assertEqual(worker_b.get_many(['a', 'b', 'c', 'd']), {'a': 1, 'b': 2, 'c': 3})
+        with mock.patch.object(worker_b.l2, 'get_many', side_effect=AssertionError('L2 read')):
+            self.assertEqual(worker_b.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2, 'c': 3})
+
+    def test_delete_invalidates_both_tiers(self):
+        worker_a, worker_b = self.make_worker_cache(), self.make_worker_cache()
+        worker_a.set('movie', {'id': 1}, 300)
+        worker_b.get('movie')
+
+        worker_b.delete('movie')
+        self.assertIsNone(worker_b.get('movie'))
+        self.assertFalse(worker_a.l2.has_key(worker_a.make_key('movie')))
+
+    def test_add_is_decided_by_the_shared_tier(self):
+        worker_a, worker_b = self.make_worker_cache(), self.make_worker_cache()
+        self.assertTrue(worker_a.add('lock', 1, 15))
+        # Not FileBasedCache.add's has_key() then set(), which two workers can both pass
+        with mock.patch.object(worker_b.l2, 'has_key', return_value=False):
+            self.assertFalse(worker_b.add('lock', 1, 15))
+        self.assertEqual(self.l2_get(worker_b, 'lock'), 1)
+
+    def test_concurrent_adds_from_many_workers_have_one_winner(self):
+        workers = [self.make_worker_cache() for _ in range(8)]
+        for attempt in range(20):
+            start = threading.Barrier(len(workers))
+
+            def add(worker, key=f'lock-{attempt}'):
+                start.wait()
+                return worker.add(key, 1, 15)
+
+            with ThreadPoolExecutor(len(workers)) as pool:
+                self.assertEqual(sum(pool.map(add, workers)), 1)
+
+    def test_expired_key_can_be_added_again_and_l2_errors_lose_the_add(self):
+        worker_a, worker_b = self.make_worker_cache(), self.make_worker_cache()
+        with self.clock() as advance:
+            self.assertTrue(worker_a.add('lock', 'a', 1))
+            advance(2)
+            self.assertTrue(worker_b.add('lock', 'b', 15))
+            self.assertFalse(worker_a.add('lock', 'a', 15))
+        self.assertEqual(self.l2_get(worker_a, 'lock'), 'b')
+
+        with mock.patch('moviedb.cache_backends.file_add', side_effect=OSError('read-only')):
+            self.assertFalse(worker_a.add('other', 1, 15))
+        self.assertIsNone(worker_a.get('other'))
+
+    def l2_get(self, cache, key):
+        """Read the shared tier only, as a worker with a cold L1 would."""
+        return cache._unwrap(cache.l2.get(cache.make_key(key)))[0]
+
+    @contextmanager
+    def clock(self):
+        """Control time.time (used by both tiers to expire entries); yields a function that advances it."""
+        now = [time.time()]
+
+        def advance(seconds):
+            now[0] += seconds
+
+        with mock.patch('time.time', side_effect=lambda: now[0]):
+            yield advance
+
+    def test_entries_expire_after_their_timeout_in_both_tiers(self):
+        worker_a, worker_b = self.make_worker_cache(), self.make_worker_cache()
+        with self.clock() as advance:
+            worker_a.set('movie', {'id': 1}, 2)
+            worker_a.set_many({'a': 1}, 2)
+            self.assertTrue(worker_a.add('lock', 1, 2))
+            advance(1)
+            self.assertEqual(worker_b.get('movie'), {'id': 1})
+            self.assertFalse(worker_b.add('lock', 1, 2))
+
+            advance(2)
+            for worker in (worker_a, worker_b):
+                self.assertIsNone(worker.get('movie'))
+                self.assertEqual(worker.get_many(['a']), {})
+            self.assertIsNone(self.l2_get(worker_a, 'movie'))
+            self.assertTrue(worker_b.add('lock', 1, 2))
+
+    def test_touch_sets_a_relative_timeout(self):
+        cache = self.make_worker_cache()
+        with self.clock() as advance:
+            cache.set('movie', {'id': 1}, 2)
+            cache.touch('movie', 10)
+            advance(5)
+            self.assertEqual(self.l2_get(cache, 'movie'), {'id': 1})
+            advance(10)
+            self.assertIsNone(cache.get('movie'))
+
+    def test_l1_lifetime_is_capped_by_l1_timeout(self):
+        worker_a, worker_b = self.make_worker_cache(), self.make_worker_cache()
+        with self.clock() as advance:
+            worker_a.set('movie', {'id': 1}, 100)
+            worker_a.set('forever', {'id': 2}, None)
+            advance(worker_a.l1_timeout + 1)
+            self.assertIsNone(worker_a.l1.get('movie'))
+            self.assertIsNone(worker_a.l1.get('forever'))
+            self.assertEqual(worker_b.get('movie'), {'id': 1})
+
+            advance(60 * 60 * 24 * 365)
+            self.assertIsNone(worker_b.get('movie'))
+            self.assertEqual(worker_b.get('forever'), {'id': 2})
+
+    def test_zero_and_default_timeouts(self):
+        cache = TieredCache(self.location, {'TIMEOUT': 5, 'OPTIONS': {'L1_LOCATION': 'tiered-tests-default'}})
+        self.addCleanup(cache.clear)
+        with self.clock() as advance:
+            cache.set('gone', 1, 0)
+            self.assertIsNone(cache.get('gone'))
+
+            cache.set('default', 1)
+            advance(4)
+            self.assertEqual(self.l2_get(cache, 'default'), 1)
+            advance(2)
+            self.assertIsNone(cache.get('default'))
+
+    def test_incr_keeps_the_expiry(self):
+        cache = self.make_worker_cache()
+        with self.clock() as advance:
+            cache.set('count', 1, 10)
+            self.assertEqual(cache.incr('count'), 2)
+            advance(5)
+            self.assertEqual(self.make_worker_cache().get('count'), 2)
+            advance(6)
+            self.assertIsNone(cache.get('count'))
+
+    def test_l2_errors_degrade_to_l1(self):
+        cache = self.make_worker_cache()
+        with mock.patch.object(cache.l2, 'set', side_effect=OSError('read-only file system')):
+            cache.set('movie', {'id': 1}, 300)
+        self.assertEqual(cache.get('movie'), {'id': 1})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CanonicalCacheKeyTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_request_stats()
+
+    def test_equivalent_urls_share_a_key_without_credentials(self):
+        base = 'https://api.themoviedb.org/3'
+        keys = {
+            canonicalize(f'{base}/movie/popular?api_key=one&language=en-US&page=1'),
+            canonicalize(f'{base}/movie/popular?page=1&api_key=two'),
+            canonicalize(f'{base}/movie/popular?language=en-US'),
+        }
+        self.assertEqual(len(keys), 1)
+
+        request_key = keys.pop()
+        self.assertEqual(request_key.family, 'tmdb /3/movie/popular')
+        self.assertNotIn('api_key', request_key.canonical_url)
+
+        self.assertNotEqual(
+            canonicalize(f'{base}/movie/popular?page=2').cache_key,
+            request_key.cache_key,
+        )
+        self.assertEqual(
+            canonicalize(f'{base}/tv/1?append_to_response=videos,external_ids').cache_key,
+            canonicalize(f'{base}/tv/1?append_to_response=external_ids,videos&language=en-US').cache_key,
+        )
+        self.assertEqual(canonicalize(f'{base}/tv/1399/season/2').family, 'tmdb /3/tv/{id}/season/{id}')
+
+    def test_equivalent_urls_share_one_upstream_fetch_and_report_per_family(self):
+        with FakeTMDBServer() as server:
+            make_api_request(f'{server.base_url}/movie/7?api_key=a&language=en-US')
+            make_api_request(f'{server.base_url}/movie/7?language=en-US&api_key=b')
+            make_api_request(f'{server.base_url}/movie/8')
+
+        self.assertEqual(server.hits['/movie/7'], 1)
+        self.assertEqual(get_endpoint_cache_stats()['default /movie/{id}'], {
+            'hits': 1, 'stale_hits': 0, 'negative_hits': 0, 'misses': 2, 'hit_ratio': 1 / 3,
+        })
+
+
+@contextmanager
+def fake_catalog_server(routes):
+    """Point catalog ingestion at a fake TMDb server serving ``routes``."""
+    routes = {
+        '/genre/movie/list': {'genres': [{'id': 28, 'name': 'Action'}, {'id': 18, 'name': 'Drama'}]},
+        '/genre/tv/list': {'genres': [{'id': 18, 'name': 'Drama'}]},
+        **routes,
+    }
+    with FakeTMDBServer(routes=routes) as server, \
+            mock.patch.object(catalog, 'TMDB_BASE_URL', server.base_url), \
+            mock.patch.object(catalog, 'TMDB_EXPORTS_BASE_URL', f'{server.base_url}/p/exports'):
+        yield server
+
+
+def discover_page(page, kind='movie'):
+    title = 'title' if kind == 'movie' else 'name'
+    return {
+        'page': page,
+        'total_pages': 3,
+        'results': [
+            {'id': page * 100 + index, title: f'Title {page}-{index}', 'genre_ids': [18, 99]}
+            for index in range(20)
+        ],
+    }
+
+
+@override_settings(CACHES=TEST_CACHES)
+class IngestCatalogCommandTests(TestCase):
+    def test_discover_ingests_every_page_and_resumes_from_checkpoint(self):
+        routes = {'/discover/movie': lambda path: discover_page(next(pages))}
+        pages = itertools.count(1)
+        with fake_catalog_server(routes) as server:
+            call_command('ingest_catalog', kind='movie', pages=2, workers=2, stdout=io.StringIO())
+            self.assertEqual(Movie.objects.count(), 40)
+            self.assertEqual(SyncCheckpoint.objects.get(name='discover:movie').state, {'next_page': 3, 'total_pages': 3})
+
+            # Only the remaining page (total_pages is 3) is fetched on the next run
+            call_command('ingest_catalog', kind='movie', workers=2, stdout=io.StringIO())
+            self.assertEqual(server.hits['/discover/movie'], 3)
+
+        self.assertEqual(Movie.objects.count(), 60)
+        # Genres unknown to TMDb's genre list (99) are not linked
+        self.assertEqual(list(Movie.objects.get(id=100).genres.values_list('id', flat=True)), [18])
+
+    def test_export_fetches_details_and_keeps_detail_fields_on_relist(self):
+        export = '\n'.join(json.dumps(entry) for entry in [
+            {'id': 1, 'popularity': 5.0, 'adult': False},
+            {'id': 2, 'popularity': 0.1, 'adult': False},
+            {'id': 3, 'popularity': 9.0, 'adult': True},
+            {'id': 4, 'popularity': 7.0, 'adult': False},
+        ])
+        routes = {
+            '/p/exports/tv_series_ids_10_17_2026.json.gz': gzip.compress(export.encode()),
+            '/tv/1': {'id': 1, 'name': 'One', 'number_of_seasons': 2, 'genres': [{'id': 18}],
+                      'external_ids': {'imdb_id': 'tt0000001'}},
+            '/tv/4': {'id': 4, 'name': 'Four', 'status': 'Ended'},
+            '/discover/tv': {'total_pages': 1, 'results': [{'id': 1, 'name': 'One (renamed)'}]},
+        }
+        with fake_catalog_server(routes) as server:
+            call_command('ingest_catalog', '--date=2026-10-17', kind='tv', source='export',
+                         min_popularity=1, batch_size=1, stdout=io.StringIO())
+            self.assertEqual(server.hits['/tv/2'] + server.hits['/tv/3'], 0)
+            self.assertTrue(SyncCheckpoint.objects.get(name='export:tv:2026-10-17').state['done'])
+
+            call_command('ingest_catalog', kind='tv', pages=1, stdout=io.StringIO())
+
+        one = Series.objects.get(id=1)
+        self.assertEqual((one.title, one.number_of_seasons, one.imdb_id), ('One (renamed)', 2, 'tt0000001'))
+        self.assertEqual(Series.objects.get(id=4).status, 'Ended')
+        self.assertEqual(Series.objects.count(), 2)
+
+
+    def test_export_titles_that_fail_to_fetch_are_retried(self):
+        export = '\n'.join(json.dumps({'id': object_id, 'popularity': 5.0}) for object_id in (1, 2, 3))
+        attempts = itertools.count()
+        routes = {
+            '/p/exports/movie_ids_10_17_2026.json.gz': gzip.compress(export.encode()),
+            '/movie/1': {'id': 1, 'title': 'One'},
+            # Down for the whole first run (a fetch and its retry), up on the next
+            '/movie/2': lambda path: 503 if next(attempts) < 2 else {'id': 2, 'title': 'Two'},
+            '/movie/3': 404,
+        }
+        with fake_catalog_server(routes), no_upstream_retries():
+            with self.assertRaisesRegex(CommandError, '1 titles could not be fetched'):
+                call_command('ingest_catalog', '--date=2026-10-17', kind='movie', source='export',
+                             batch_size=2, stdout=io.StringIO(), stderr=io.StringIO())
+            state = SyncCheckpoint.objects.get(name='export:movie:2026-10-17').state
+            self.assertEqual(state, {'position': 3, 'failed': [2]})
+            self.assertEqual(list(Movie.objects.values_list('id', flat=True)), [1])
+
+            call_command('ingest_catalog', '--date=2026-10-17', kind='movie', source='export', stdout=io.StringIO())
+        self.assertEqual(Movie.objects.get(id=2).title, 'Two')
+        self.assertTrue(SyncCheckpoint.objects.get(name='export:movie:2026-10-17').state['done'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SyncCatalogChangesCommandTests(TestCase):
+    def test_only_changed_stored_titles_are_refetched_and_updated(self):
+        Genre.objects.create(id=28, name='Action')
+        Movie.objects.create(id=1, title='Old title')
+        Movie.objects.create(id=2, title='Unchanged')
+        series = Series.objects.create(id=10, title='Show')
+        season = Season.objects.create(series=series, season_number=1, name='Season 1')
+        Episode.objects.create(season=season, episode_number=1, name='Episode 1')
+
+        routes = {
+            '/movie/changes': {'page': 1, 'total_pages': 1, 'results': [{'id': 1}, {'id': 3}]},
+            '/tv/changes': {'page': 1, 'total_pages': 1, 'results': [{'id': 10}]},
+            '/movie/1': {'id': 1, 'title': 'New title', 'runtime': 120, 'genres': [{'id': 28}]},
+            '/tv/10': {
+                'id': 10, 'name': 'Show', 'number_of_seasons': 1,
+                'seasons': [{'season_number': 1, 'name': 'Season One', 'episode_count': 8}],
+                'season/1': {'episodes': [{'episode_number': 1, 'name': 'Pilot', 'air_date': '2024-01-01'}]},
+            },
+        }
+        with fake_catalog_server(routes) as server:
+            call_command('sync_catalog_changes', stdout=io.StringIO())
+
+        self.assertEqual(server.hits['/movie/3'], 0)
+        movie = Movie.objects.get(id=1)
+        self.assertEqual((movie.title, movie.runtime), ('New title', 120))
+        self.assertIsNotNone(movie.synced_at)
+        self.assertEqual(list(movie.genres.values_list('id', flat=True)), [28])
+        self.assertIsNone(Movie.objects.get(id=2).synced_at)
+        self.assertFalse(Movie.objects.filter(id=3).exists())
+
+        season.refresh_from_db()
+        self.assertEqual((season.name, season.episode_count), ('Season One', 8))
+        self.assertEqual(season.episodes.get().name, 'Pilot')
+        self.assertIn('since', SyncCheckpoint.objects.get(name='changes:tv').state)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class UpsertTests(TestCase):
+    def setUp(self):
+        Genre.objects.create(id=18, name='Drama')
+        self.results = [
+            {'id': index, 'title': f'Movie {index}', 'poster_path': f'/{index}.jpg', 'genre_ids': [18]}
+            for index in range(1, 21)
+        ]
+
+    def statements(self, queries):
+        return [query['sql'] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+
+    def writes(self, queries):
+        return [sql for sql in self.statements(queries) if not sql.startswith('SELECT')]
+
+    def test_batch_upsert_uses_constant_queries_and_skips_unchanged_rows(self):
+        with CaptureQueriesContext(connection) as first:
+            movies = catalog.upsert_movies(self.results)
+        self.assertEqual([movie.id for movie in movies], list(range(1, 21)))
+        # Same number of statements whatever the batch size
+        self.assertEqual(len(self.statements(first)), 6)
+
+        Movie.objects.filter(id=5).update(wootly_url='https://example.com/5')
+        self.results[4]['title'] = 'Renamed'
+        with CaptureQueriesContext(connection) as second:
+            movies = catalog.upsert_movies(self.results)
+
+        writes = self.writes(second)
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('INSERT'))
+        self.assertEqual((movies[4].title, movies[4].wootly_url), ('Renamed', 'https://example.com/5'))
+
+        with CaptureQueriesContext(connection) as third:
+            catalog.upsert_movies(self.results)
+        self.assertEqual(self.writes(third), [])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SeriesDetailsPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seasons_come_from_one_embedded_tvmaze_request_and_are_cached(self):
+        routes = {
+            '/tv/1399': {'id': 1399, 'name': 'Thrones', 'external_ids': {'tvdb_id': 121361}},
+            '/lookup/shows': {'id': 82, 'name': 'Thrones'},
+            '/shows/82': {'id': 82, '_embedded': {
+                'seasons': [{'number': number, 'name': ''} for number in (1, 2, 3)],
+                'episodes': [
+                    {'id': number * 10 + episode, 'season': number, 'number': episode, 'name': f'S{number}E{episode}'}
+                    for number in (1, 2, 3) for episode in (1, 2)
+                ],
+            }},
+        }
+        with FakeTMDBServer(routes=routes) as server, \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url), \
+                mock.patch.object(utils, 'TVMAZE_BASE_URL', server.base_url):
+            response = self.client.get('/series/1399/')
+            hits = dict(server.hits)
+            self.client.get('/series/1399/')
+            self.assertEqual(dict(server.hits), hits)  # Every stage is served from the cache
+
+        seasons = response.context['seasons']
+        self.assertEqual([season['season_number'] for season in seasons], [1, 2, 3])
+        self.assertEqual([episode['name'] for episode in seasons[2]['episodes']], ['S3E1', 'S3E2'])
+        self.assertEqual((hits['/tv/1399'], hits['/lookup/shows'], hits['/shows/82']), (1, 1, 1))
+        # No request per season or per episode
+        self.assertFalse([path for path in hits if path.startswith(('/seasons/', '/shows/82/'))])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GenrePageQueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_genre_pages_stay_within_query_budget(self):
+        routes = {
+            '/genre/movie/list': {'genres': [{'id': 18, 'name': 'Drama'}, {'id': 28, 'name': 'Action'}]},
+            '/discover/movie': discover_page(1),
+        }
+        with FakeTMDBServer(routes=routes) as server, \
+                mock.patch.object(genres, 'TMDB_BASE_URL', server.base_url):
+            # Genre catalog upsert, title diff, one bulk upsert and the genre links
+            with self.assertNumQueries(9):
+                response = self.client.get('/genre/18/')
+            self.assertEqual(len(response.context['movies']), 20)
+
+            with self.assertNumQueries(1):
+                response = self.client.get('/genre/18/')
+            self.assertEqual(len(response.context['movies']), 20)
+
+            with self.assertNumQueries(0):
+                response = self.client.get('/genres/')
+            self.assertContains(response, 'href="/genre/28/"')
+
+        self.assertEqual(server.hits['/discover/movie'], 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SeriesSeasonsPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        series = Series.objects.create(id=1, title='Long runner')
+        for season_number in (2, 1, 3):
+            season = Season.objects.create(series=series, season_number=season_number, name=f'Season {season_number}')
+            Episode.objects.bulk_create(
+                Episode(season=season, episode_number=number, name=f'Episode {number}')
+                for number in range(200, 0, -1)
+            )
+        self.season = Season.objects.get(season_number=1)
+
+    def test_seasons_load_in_constant_queries_and_are_cached(self):
+        with self.assertNumQueries(2):
+            seasons = load_series_seasons(1)
+        self.assertEqual([season['season_number'] for season in seasons], [1, 2, 3])
+        self.assertEqual([episode['episode_number'] for episode in seasons[0]['episodes']], list(range(1, 201)))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(load_series_seasons(1), seasons)
+        with self.assertNumQueries(1):
+            self.assertEqual(load_series_seasons(2), [])
+
+    def test_episode_and_season_changes_invalidate_the_cached_payload(self):
+        load_series_seasons(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Episode.objects.filter(season=self.season, episode_number=1).get().delete()
+        self.assertEqual(len(load_series_seasons(1)[0]['episodes']), 199)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.season.name = 'Pilot season'
+            self.season.save()
+        self.assertEqual(load_series_seasons(1)[0]['name'], 'Pilot season')
+
+
+@override_settings(CACHES=TEST_CACHES, WRITE_BEHIND_ENABLED=False)
+class LocalSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f'No full-text index on {connection.vendor}')
+
+    def test_title_matches_rank_above_overview_matches(self):
+        Movie.objects.create(id=1, title='A quiet evening', overview='Space pirates meet again')
+        Movie.objects.create(id=2, title='Space Pirates', overview='A crew adrift')
+        Movie.objects.create(id=3, title='Gardening', overview='Nothing about the stars')
+
+        self.assertEqual([movie.id for movie in search_local(Movie, 'space pirate')], [2, 1])
+        self.assertEqual(search_local(Movie, '"space" OR'), search_local(Movie, 'space or'))
+
+    def test_bulk_writes_keep_the_index_in_sync(self):
+        catalog.upsert_movies([{'id': 1, 'title': 'Old Name'}])
+        self.assertEqual([movie.id for movie in search_local(Movie, 'old')], [1])
+
+        catalog.upsert_movies([{'id': 1, 'title': 'New Name'}])
+        self.assertEqual(search_local(Movie, 'old'), [])
+        self.assertEqual([movie.id for movie in search_local(Movie, 'new')], [1])
+
+        Movie.objects.filter(id=1).delete()
+        self.assertEqual(search_local(Movie, 'new'), [])
+
+    def test_low_local_recall_falls_back_to_tmdb_and_stores_results(self):
+        routes = {'/search/movie': {'results': [
+            {'id': 100 + index, 'title': f'Heist {index}', 'overview': 'A job goes wrong'}
+            for index in range(6)
+        ]}}
+        with FakeTMDBServer(routes=routes) as server, \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url):
+            results = search_catalog('movie', 'heist')
+            self.assertEqual([result['id'] for result in results], list(range(100, 106)))
+            self.assertEqual(Movie.objects.count(), 6)
+
+            cache.clear()
+            self.assertEqual(len(search_catalog('movie', 'heist')), 6)
+        self.assertEqual(server.hits['/search/movie'], 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class WriteBehindQueueTests(TestCase):
+    def test_pending_writes_are_deduplicated_and_flushed_in_one_batch(self):
+        queue = WriteBehindQueue(background=False)
+        self.assertEqual(queue.enqueue('movie', [{'id': 1, 'title': 'Draft'}, {'id': 2, 'title': 'Two'}]), 2)
+        self.assertEqual(queue.enqueue('movie', [{'id': 1, 'title': 'Final'}]), 1)
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(Movie.objects.count(), 0)
+
+        # Diff read, bulk upsert and genre links, in one transaction
+        with self.assertNumQueries(4):
+            self.assertEqual(queue.flush(), 2)
+        self.assertEqual(Movie.objects.get(id=1).title, 'Final')
+
+        # Unchanged content is not queued again; changed content is
+        self.assertEqual(queue.enqueue('movie', [{'title': 'Final', 'id': 1}]), 0)
+        self.assertEqual(queue.enqueue('movie', [{'id': 1, 'title': 'Recut'}]), 1)
+        queue.stop()
+        self.assertEqual(Movie.objects.get(id=1).title, 'Recut')
+
+    def test_full_queue_flushes_on_the_enqueueing_thread(self):
+        queue = WriteBehindQueue(max_pending=3, background=False)
+        queue.enqueue('tv', [{'id': index, 'name': f'Show {index}'} for index in range(1, 3)])
+        self.assertEqual(Series.objects.count(), 0)
+        queue.enqueue('tv', [{'id': 3, 'name': 'Show 3'}])
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(Series.objects.count(), 3)
+
+
+@override_settings(CACHES=TEST_CACHES, WRITE_BEHIND_ENABLED=False)
+class DetailPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_stored_payload_is_served_from_one_read_and_refreshed_when_stale(self):
+        routes = {'/movie/7': {'id': 7, 'title': 'Se7en', 'imdb_id': 'tt0114369', 'runtime': 127}}
+        with FakeTMDBServer(routes=routes) as server, \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url):
+            self.assertEqual(self.client.get('/api/movie/7/').json()['title'], 'Se7en')
+            movie = Movie.objects.get(id=7)
+            movie.wootly_url = 'https://wootly.ch/?v=7'
+            with self.captureOnCommitCallbacks(execute=True):
+                movie.save()  # Also drops the cached detail response
+
+            with self.assertNumQueries(1):
+                movie = self.client.get('/api/movie/7/').json()
+            self.assertEqual((movie['runtime'], movie['wootly_url']), (127, 'https://wootly.ch/?v=7'))
+        self.assertEqual(server.hits['/movie/7'], 1)
+        self.assertEqual(Movie.objects.get(id=7).imdb_id, 'tt0114369')
+
+        Movie.objects.filter(id=7).update(payload_fetched_at=None)
+        invalidate_api_responses('api_movie_detail')
+        with mock.patch.object(api_views, 'refresh_detail_in_background') as refresh, self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/movie/7/').json()['title'], 'Se7en')
+        refresh.assert_called_once_with('movie', 7)
+
+    def test_batch_reads_stored_rows_once_and_fetches_only_uncached_misses(self):
+        Movie.objects.create(id=1, title='Stored', payload={'id': 1, 'title': 'Stored'}, payload_fetched_at=timezone.now())
+        routes = {
+            '/movie/2': {'id': 2, 'title': 'Cached'},
+            '/movie/3': {'id': 3, 'title': 'Fetched', 'runtime': 90},
+            '/movie/4': 404,
+            '/tv/5': {'id': 5, 'name': 'Series'},
+        }
+        with FakeTMDBServer(routes=routes) as server, no_upstream_retries(), \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url):
+            utils.fetch_movie_details(2)
+            with mock.patch.object(utils.cache, 'get_many', wraps=utils.cache.get_many) as get_many:
+                response = self.client.get('/api/batch/', {'movies': '1,2,3,4,3', 'series': '5'})
+            # One lookup of the misses per media type (the other is the response cache's)
+            upstream_lookups = [keys for (keys,), _ in get_many.call_args_list if 'api_response' not in keys[0]]
+            self.assertEqual([len(keys) for keys in upstream_lookups], [3, 1])
+        self.assertEqual(dict(server.hits), {'/movie/2': 1, '/movie/3': 1, '/movie/4': 1, '/tv/5': 1})
+
+        data = response.json()
+        self.assertEqual(list(data['movies']), ['1', '2', '3', '4'])
+        self.assertEqual([data['movies'][pk] and data['movies'][pk]['title'] for pk in '1234'],
+                         ['Stored', 'Cached', 'Fetched', None])
+        self.assertEqual(data['series']['5']['name'], 'Series')
+        self.assertIn('no-store', response['Cache-Control'])  # Movie 4 may just be TMDb failing
+        self.assertEqual(Movie.objects.get(id=3).payload['runtime'], 90)
+
+        with self.assertNumQueries(2):  # One id__in read per media type
+            stored = self.client.get('/api/batch/', {'movies': '1,2,3', 'series': '5'}).json()
+        self.assertEqual(stored['movies']['3']['title'], 'Fetched')
+
+        self.assertEqual(self.client.get('/api/batch/').status_code, 400)
+        self.assertEqual(self.client.get('/api/batch/', {'movies': '1,x'}).status_code, 400)
+        too_many = ','.join(str(pk) for pk in range(api_views.BATCH_MAX_IDS + 1))
+        self.assertEqual(self.client.get('/api/batch/', {'movies': too_many}).status_code, 400)
+
+    @override_settings(WRITE_BEHIND_ENABLED=True)
+    def test_cold_misses_are_answered_before_their_payloads_are_written(self):
+        routes = {'/movie/8': {'id': 8, 'title': 'Queued', 'runtime': 100}, '/tv/6': {'id': 6, 'name': 'Batched'}}
+        queue = WriteBehindQueue(background=False)
+        with FakeTMDBServer(routes=routes) as server, mock.patch.object(write_behind, '_queue', queue), \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get('/api/movie/8/').json()['runtime'], 100)
+                batch = self.client.get('/api/batch/', {'series': '6'}).json()
+            self.assertEqual(batch['series']['6']['name'], 'Batched')
+        self.assertFalse([query for query in queries if not query['sql'].startswith('SELECT')])
+        self.assertFalse(Movie.objects.exists() or Series.objects.exists())
+
+        self.assertEqual(queue.flush(), 2)
+        self.assertEqual(Movie.objects.get(id=8).payload['runtime'], 100)
+        self.assertEqual(Series.objects.get(id=6).payload['name'], 'Batched')
+        self.assertIsNotNone(Series.objects.get(id=6).payload_fetched_at)
+
+    def test_unknown_title_is_not_found(self):
+        with FakeTMDBServer(routes={'/tv/9': 404}) as server, no_upstream_retries(), \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url):
+            self.assertEqual(self.client.get('/api/series/9/').status_code, 404)
+        self.assertFalse(Series.objects.exists())
+
+
+STORED_MOVIES = '/api/movies/?source=stored'
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ratings repeat, so pages have to break ties on id
+        Movie.objects.bulk_create(
+            Movie(id=index, title=f'Movie {index}', overview='x' * 1000, vote_average=index % 7)
+            for index in range(1, 46)
+        )
+        cls.expected = list(Movie.objects.order_by('-vote_average', '-id').values_list('id', flat=True))
+
+    def test_pages_walk_forward_and_back_in_one_query_each(self):
+        pages, cursor = [], None
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                page = paginate(Movie.objects.all(), cursor)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('OFFSET', queries[0]['sql'].upper())
+            self.assertNotIn('overview', queries[0]['sql'])
+            pages.append([movie.id for movie in page.items])
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual([len(ids) for ids in pages], [20, 20, 5])
+        self.assertEqual(list(itertools.chain(*pages)), self.expected)
+
+        previous = paginate(Movie.objects.all(), page.previous_cursor)
+        self.assertEqual([movie.id for movie in previous.items], pages[1])
+        first = paginate(Movie.objects.all(), previous.previous_cursor)
+        self.assertEqual([movie.id for movie in first.items], pages[0])
+        self.assertFalse(first.has_previous)
+
+    def test_newest_skips_undated_titles_and_bad_cursors_are_rejected(self):
+        Movie.objects.filter(id__lte=40).update(release_date='2020-01-01')
+        page = paginate(Movie.objects.all(), sort='newest', page_size=30)
+        self.assertEqual(len(paginate(Movie.objects.all(), page.next_cursor, page_size=30).items), 10)
+
+        with self.assertRaises(InvalidCursor):
+            paginate(Movie.objects.all(), 'not-a-cursor')
+        with self.assertRaises(InvalidCursor):
+            paginate(Movie.objects.all(), sort='title')
+
+    def test_list_endpoints_use_cursors(self):
+        response = self.client.get(STORED_MOVIES)
+        data = response.json()
+        self.assertEqual([movie['id'] for movie in data['results']], self.expected[:20])
+        self.assertIsNone(data['previous_cursor'])
+
+        data = self.client.get('/api/movies/', {'cursor': data['next_cursor']}).json()
+        self.assertEqual([movie['id'] for movie in data['results']], self.expected[20:40])
+        self.assertEqual(self.client.get('/api/movies/', {'cursor': 'x'}).status_code, 400)
+
+        # Without source=stored or a cursor the endpoint still pages TMDb's popular list
+        with mock.patch.object(api_views, 'make_api_request', return_value={'results': [{'id': 99}], 'total_pages': 3}):
+            data = self.client.get('/api/movies/').json()
+        self.assertEqual((data['results'][0]['id'], data['page'], data['total_pages']), (99, 1, 3))
+
+        response = self.client.get('/movielist', {'cursor': 'x'})
+        self.assertEqual([movie.id for movie in response.context['movies']], self.expected[:20])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ApiResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Movie.objects.create(id=1, title='Stored', vote_average=7)
+
+    async def test_async_misses_are_compressed_and_stored_off_the_event_loop(self):
+        threads = []
+        compress = response_cache.compress_variants
+        with mock.patch.object(response_cache, 'compress_variants',
+                               side_effect=lambda content: threads.append(threading.get_ident()) or compress(content)):
+            response = await self.async_client.get('/api/movies/', {'source': 'stored'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+    def test_hits_skip_the_view_and_catalog_changes_invalidate(self):
+        response = self.client.get('/api/movies/', {'source': 'stored', 'sort': 'rating'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0), mock.patch.object(api_views, 'serialize_page') as serialize:
+            cached = self.client.get('/api/movies/?_=1700000000&sort=rating&cursor=&source=stored')
+        serialize.assert_not_called()
+        self.assertEqual((cached['X-Cache'], cached.content), ('HIT', response.content))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.filter(id=1).get().save()
+        self.assertEqual(self.client.get('/api/movies/', {'source': 'stored', 'sort': 'rating'})['X-Cache'], 'MISS')
+
+    def test_repeat_requests_are_answered_with_304(self):
+        response = self.client.get(STORED_MOVIES)
+        self.assertTrue(response['ETag'].startswith('"'))
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(STORED_MOVIES, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b''))
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        since = self.client.get(STORED_MOVIES, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+        fetched_at = timezone.now() - timedelta(minutes=5)
+        Movie.objects.filter(id=1).update(payload={'id': 1, 'title': 'Stored'}, payload_fetched_at=fetched_at)
+        detail = self.client.get('/api/movie/1/')
+        self.assertEqual(self.client.get('/api/movie/1/', HTTP_IF_NONE_MATCH=detail['ETag']).status_code, 304)
+
+        # The streaming URLs are edited without refetching the payload, so its fetch time is not Last-Modified
+        self.assertNotEqual(detail['Last-Modified'], http_date(fetched_at.timestamp()))
+        movie = Movie.objects.get(id=1)
+        movie.wootly_url = 'https://wootly.ch/?v=1'
+        with self.captureOnCommitCallbacks(execute=True):
+            movie.save()
+        edited = self.client.get('/api/movie/1/', HTTP_IF_MODIFIED_SINCE=http_date(fetched_at.timestamp()))
+        self.assertEqual((edited.status_code, edited.json()['wootly_url']), (200, 'https://wootly.ch/?v=1'))
+
+    def test_bodies_are_compressed_once_and_sent_per_accept_encoding(self):
+        Movie.objects.bulk_create(Movie(id=index, title=f'Movie {index}') for index in range(2, 40))
+        with mock.patch('moviedb.response_cache.gzip.compress', wraps=gzip.compress) as compress:
+            first = self.client.get(STORED_MOVIES, HTTP_ACCEPT_ENCODING='gzip, deflate')
+            second = self.client.get(STORED_MOVIES, HTTP_ACCEPT_ENCODING='gzip')
+            plain = self.client.get(STORED_MOVIES)
+        compress.assert_called_once()
+
+        self.assertEqual((first['Content-Encoding'], second['X-Cache']), ('gzip', 'HIT'))
+        self.assertEqual(json.loads(gzip.decompress(second.content)), plain.json())
+        self.assertLess(len(second.content), len(plain.content))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        self.assertNotEqual(second['ETag'], plain['ETag'])
+
+        not_modified = self.client.get(STORED_MOVIES, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_brotli_variant_is_preferred_when_accepted(self):
+        Movie.objects.bulk_create(Movie(id=index, title=f'Movie {index}') for index in range(2, 40))
+        plain = self.client.get(STORED_MOVIES)
+        brotli_response = self.client.get(STORED_MOVIES, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        gzip_response = self.client.get(STORED_MOVIES, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+
+        self.assertEqual((brotli_response['Content-Encoding'], brotli_response['X-Cache']), ('br', 'HIT'))
+        self.assertEqual(brotli.decompress(brotli_response.content), plain.content)
+        self.assertEqual(gzip_response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(gzip_response.content), plain.content)
+        self.assertEqual(len({plain['ETag'], brotli_response['ETag'], gzip_response['ETag']}), 3)
+
+    def test_accept_encoding_preferences(self):
+        both = {'gzip', 'br'}
+        self.assertEqual(choose_encoding('gzip, deflate, br', both), 'br')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip;q=0.8', both), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0.8, gzip;q=0.8', both), 'br')
+        self.assertEqual(choose_encoding('gzip;q=0, br', {'gzip'}), None)
+        self.assertEqual(choose_encoding('br;q=0, *', both), 'gzip')
+        self.assertEqual(choose_encoding('br;q=1.0, gzip;q=0.5', {'gzip'}), 'gzip')
+        self.assertEqual(choose_encoding('*', both), 'br')
+        self.assertEqual(choose_encoding('identity', both), None)
+        self.assertEqual(choose_encoding('', both), None)
+
+    @override_settings(CACHES=TIERED_TEST_CACHES)
+    def test_cached_responses_expire_after_their_route_ttl(self):
+        cache.clear()
+        movies = [{'id': 1, 'title': 'Popular'}]
+        with mock.patch.object(api_views, 'fetch_popular_movies', return_value=movies) as fetch, \
+                mock.patch.dict(RESPONSE_CACHE_TTLS, {'api_popular': 1}):
+            self.assertEqual(self.client.get('/api/popular/')['X-Cache'], 'MISS')
+            with mock.patch.object(cache, 'get', side_effect=AssertionError('one get_many per hit')):
+                self.assertEqual(self.client.get('/api/popular/')['X-Cache'], 'HIT')
+
+            time.sleep(1.1)
+            self.assertEqual(self.client.get('/api/popular/')['X-Cache'], 'MISS')
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_empty_upstream_results_are_not_cached(self):
+        with mock.patch.object(api_views, 'fetch_popular_movies', return_value=[]) as fetch:
+            self.client.get('/api/popular/')
+            response = self.client.get('/api/popular/')
+        self.assertEqual(fetch.call_count, 2)
+        self.assertIn('no-store', response['Cache-Control'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ApiHomeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_rails_are_fetched_in_one_request_and_cached_as_one_unit(self):
+        with no_upstream_retries(), FakeTMDBServer() as server, \
+                mock.patch.object(utils, 'TMDB_BASE_URL', server.base_url):
+            response = self.client.get('/api/home/')
+            self.assertEqual(list(response.json()['rails']), list(api_views.API_HOME_RAILS))
+            self.assertTrue(all(len(rail) == 20 for rail in response.json()['rails'].values()))
+            self.assertEqual(server.total_hits, len(api_views.API_HOME_RAILS))
+
+            self.assertEqual(self.client.get('/api/home/')['X-Cache'], 'HIT')
+            # Rails share the upstream cache entries of the single-rail endpoints
+            self.assertEqual(self.client.get('/api/popular/').json()['results'], response.json()['rails']['popular'])
+            self.assertEqual(server.total_hits, len(api_views.API_HOME_RAILS))
+
+            picked = self.client.get('/api/home/', {'rails': 'popular,drama'})
+            self.assertEqual(list(picked.json()['rails']), ['popular', 'drama'])
+        self.assertEqual(self.client.get('/api/home/', {'rails': 'popular,nope'}).status_code, 400)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class HotQueryIndexTests(TestCase):
+    """EXPLAIN the hot lookups and check they use the intended indexes."""
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise be read with sequential scans
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest(f'No plan expectations for {connection.vendor}')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite' and index_name.startswith('unique_'):
+            # SQLite builds unique constraints into the table as auto-indexes
+            index_name = f'sqlite_autoindex_{queryset.model._meta.db_table}'
+        self.assertIn(index_name, plan)
+        # The index also provides the ordering, so no separate sort step
+        self.assertNotIn('TEMP B-TREE' if connection.vendor == 'sqlite' else 'Sort', plan)
+
+    def test_hot_lookups_use_indexes(self):
+        self.assertUsesIndex(Movie.objects.filter(tmdb_id=550), 'movie_tmdb_id_idx')
+        self.assertUsesIndex(Movie.objects.filter(imdb_id='tt0137523'), 'movie_imdb_id_idx')
+        self.assertUsesIndex(Movie.objects.order_by('-release_date')[:20], 'movie_release_date_idx')
+        self.assertUsesIndex(Movie.objects.order_by('-vote_average')[:20], 'movie_vote_average_idx')
+        self.assertUsesIndex(Series.objects.filter(imdb_id='tt0944947'), 'series_imdb_id_idx')
+        self.assertUsesIndex(
+            Series.objects.filter(vote_average__lte=7.5).filter(Q(vote_average__lt=7.5) | Q(id__lt=10))
+            .order_by('-vote_average', '-id')[:21],
+            'series_vote_average_idx',
+        )
+        self.assertUsesIndex(
+            Season.objects.filter(series_id=1).order_by('season_number'),
+            'unique_season_per_series',
+        )
+        self.assertUsesIndex(
+            Episode.objects.filter(season_id=1).order_by('episode_number'),
+            'episode_listing_covering_idx' if connection.vendor == 'postgresql' else 'unique_episode_per_season',
+        )
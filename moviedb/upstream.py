@@ -0,0 +1,359 @@
+"""
+Shared HTTP client for the upstream APIs used by the moviedb app.
+Each upstream host gets one pooled, keep-alive session with its own timeouts,
+connection pool size and retry policy, so cache misses reuse open connections
+instead of paying a new TCP/TLS handshake per request. Each host also has a
+circuit breaker that fails fast while the host is erroring or too slow.
+Hosts without a policy of their own get the 'default' policy, but still
+their own session and breaker.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    """Connection policy for one upstream service."""
+    hosts: Tuple[str, ...]
+    connect_timeout: float = 3.05
+    read_timeout: float = 10
+    pool_size: int = 10
+    retries: int = 2
+    backoff_factor: float = 0.3
+    failure_threshold: int = 5  # consecutive failed or slow calls that open the circuit
+    slow_call_seconds: float = 5  # calls slower than this count as failures
+    reset_timeout: float = 30  # seconds the circuit stays open before a trial call
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream host.
+
+    Closed: calls go through. After ``failure_threshold`` consecutive failed
+    or slow calls it opens and rejects calls for ``reset_timeout`` seconds,
+    then lets a single trial call through (half-open) which either closes it
+    again or re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, policy: 'HostPolicy'):
+        self.policy = policy
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.policy.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record(self, failed: bool, elapsed: float = 0.0) -> None:
+        failed = failed or elapsed > self.policy.slow_call_seconds
+        with self._lock:
+            if not failed:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.policy.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+# Policy per upstream service; hosts not listed here use 'default'
+HOST_POLICIES: Dict[str, HostPolicy] = {
+    'tmdb': HostPolicy(
+        hosts=('api.themoviedb.org',),
+        pool_size=20,
+    ),
+    'tmdb_exports': HostPolicy(
+        hosts=('files.tmdb.org',),
+        read_timeout=60,  # Daily ID exports are streamed, tens of MB each
+        pool_size=2,
+    ),
+    'tvmaze': HostPolicy(
+        hosts=('api.tvmaze.com',),
+        read_timeout=10,
+        retries=2,
+        backoff_factor=0.5,  # TVMaze rate limits with 429s
+    ),
+    'jikan': HostPolicy(
+        hosts=('api.jikan.moe',),
+        read_timeout=15,
+        pool_size=5,
+        retries=3,
+        backoff_factor=1,  # Jikan allows roughly 3 requests per second
+    ),
+    'scraper': HostPolicy(
+        hosts=('en.nexus-stream.com',),
+        connect_timeout=5,
+        read_timeout=15,
+        pool_size=4,
+        retries=1,
+    ),
+    'default': HostPolicy(hosts=()),
+}
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+# httpx.AsyncClient instances are bound to the event loop that created them
+_async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_policy_name(url: str) -> str:
+    """
+    Get the name of the host policy that applies to a URL.
+
+    Args:
+        url: Absolute upstream URL
+
+    Returns:
+        Key into HOST_POLICIES
+    """
+    hostname = urlsplit(url).hostname or ''
+    for name, policy in HOST_POLICIES.items():
+        if hostname in policy.hosts:
+            return name
+    return 'default'
+
+
+def get_upstream_name(url: str) -> str:
+    """
+    Get the name the session and circuit breaker for a URL are kept under.
+
+    Hosts listed in a policy share them under the policy name; any other
+    host gets its own, named 'default:<hostname>', so one failing
+    unknown host does not open the circuit for the rest.
+
+    Args:
+        url: Absolute upstream URL
+
+    Returns:
+        Upstream name
+    """
+    name = get_policy_name(url)
+    if name != 'default':
+        return name
+    return f"default:{urlsplit(url).hostname or ''}"
+
+
+def _policy_for(upstream_name: str) -> HostPolicy:
+    return HOST_POLICIES[upstream_name.partition(':')[0]]
+
+
+def _build_session(policy: HostPolicy) -> requests.Session:
+    retry = Retry(
+        total=policy.retries,
+        backoff_factor=policy.backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=policy.pool_size,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Get the pooled session for the host of a URL, creating it on first use.
+
+    Args:
+        url: Absolute upstream URL
+
+    Returns:
+        Shared requests.Session for that host (see get_upstream_name)
+    """
+    return _session_for(get_upstream_name(url))
+
+
+def _session_for(name: str) -> requests.Session:
+    session = _sessions.get(name)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = _build_session(_policy_for(name))
+    return session
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the circuit breaker for an upstream, creating it on first use.
+
+    Args:
+        name: Upstream name (see get_upstream_name)
+
+    Returns:
+        CircuitBreaker shared by every call to that upstream
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _sessions_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(_policy_for(name)))
+    return breaker
+
+
+def get_circuit_states() -> Dict[str, str]:
+    """Get the circuit breaker state of every upstream called so far."""
+    return {name: breaker.state for name, breaker in _breakers.items()}
+
+
+def reset_circuit_breakers() -> None:
+    """Forget all circuit breaker state (e.g. after changing HOST_POLICIES)."""
+    with _sessions_lock:
+        _breakers.clear()
+
+
+def _is_failure_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def get(url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+    """
+    Send a GET request through the pooled session for the URL's host.
+
+    Args:
+        url: Absolute upstream URL
+        params: Optional query parameters
+        **kwargs: Passed through to requests; ``timeout`` overrides the
+            host policy's (connect, read) timeouts
+
+    Returns:
+        requests.Response (status is not checked)
+
+    Raises:
+        CircuitOpenError: If the host's circuit breaker is open
+        requests.RequestException: On connection errors or timeouts
+    """
+    name = get_upstream_name(url)
+    policy = _policy_for(name)
+    breaker = get_circuit_breaker(name)
+    if not breaker.allow():
+        raise CircuitOpenError(f'Circuit open for upstream {name}, not calling {url}')
+    
+    kwargs.setdefault('timeout', (policy.connect_timeout, policy.read_timeout))
+    start = time.monotonic()
+    failed = True  # Anything raised counts, so a half-open trial call always settles the circuit
+    try:
+        response = _session_for(name).get(url, params=params, **kwargs)
+        failed = _is_failure_status(response.status_code)
+        return response
+    finally:
+        breaker.record(failed, time.monotonic() - start)
+
+
+def close_sessions() -> None:
+    """Close every pooled session (e.g. on worker shutdown)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def _build_async_client(policy: HostPolicy) -> httpx.AsyncClient:
+    # httpx transports only retry failed connects; status retries stay sync-only
+    transport = httpx.AsyncHTTPTransport(
+        retries=policy.retries,
+        limits=httpx.Limits(
+            max_connections=policy.pool_size,
+            max_keepalive_connections=policy.pool_size,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(policy.read_timeout, connect=policy.connect_timeout),
+        follow_redirects=True,
+    )
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """
+    Get the pooled async client for the host of a URL on the running event loop.
+
+    Args:
+        url: Absolute upstream URL
+
+    Returns:
+        Shared httpx.AsyncClient for that host (see get_upstream_name)
+    """
+    name = get_upstream_name(url)
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        client = clients[name] = _build_async_client(_policy_for(name))
+    return client
+
+
+async def async_get(url: str, params: Optional[Dict] = None, **kwargs) -> httpx.Response:
+    """
+    Send a GET request through the pooled async client for the URL's host.
+
+    Args:
+        url: Absolute upstream URL
+        params: Optional query parameters
+        **kwargs: Passed through to httpx.AsyncClient.get
+
+    Returns:
+        httpx.Response (status is not checked)
+
+    Raises:
+        CircuitOpenError: If the host's circuit breaker is open
+        httpx.HTTPError: On connection errors or timeouts
+    """
+    name = get_upstream_name(url)
+    breaker = get_circuit_breaker(name)
+    if not breaker.allow():
+        raise CircuitOpenError(f'Circuit open for upstream {name}, not calling {url}')
+    
+    start = time.monotonic()
+    failed = True
+    try:
+        response = await get_async_client(url).get(url, params=params, **kwargs)
+        failed = _is_failure_status(response.status_code)
+        return response
+    finally:
+        breaker.record(failed, time.monotonic() - start)
+
+
+async def aclose_async_clients() -> None:
+    """Close the async clients bound to the running event loop."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
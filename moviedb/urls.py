@@ -1,19 +1,26 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from . import api_views
+from . import async_api_views
+
+# ASGI deployments can serve the JSON API from the non-blocking async views
+api = async_api_views if settings.ASYNC_API_VIEWS else api_views
 
 urlpatterns = [
     # API Endpoints for React Frontend
-    path('api/movies/', api_views.api_movies_list, name='api_movies_list'),
-    path('api/movie/<int:pk>/', api_views.api_movie_detail, name='api_movie_detail'),
-    path('api/series/', api_views.api_series_list, name='api_series_list'),
-    path('api/series/<int:pk>/', api_views.api_series_detail, name='api_series_detail'),
-    path('api/search/', api_views.api_search, name='api_search'),
-    path('api/trending/', api_views.api_trending, name='api_trending'),
-    path('api/popular/', api_views.api_popular, name='api_popular'),
-    path('api/top-rated/', api_views.api_top_rated, name='api_top_rated'),
-    path('api/latest/', api_views.api_latest, name='api_latest'),
-    path('api/genre/<str:genre_name>/', api_views.api_genre_movies, name='api_genre_movies'),
+    path('api/movies/', api.api_movies_list, name='api_movies_list'),
+    path('api/movie/<int:pk>/', api.api_movie_detail, name='api_movie_detail'),
+    path('api/series/', api.api_series_list, name='api_series_list'),
+    path('api/series/<int:pk>/', api.api_series_detail, name='api_series_detail'),
+    path('api/search/', api.api_search, name='api_search'),
+    path('api/trending/', api.api_trending, name='api_trending'),
+    path('api/popular/', api.api_popular, name='api_popular'),
+    path('api/top-rated/', api.api_top_rated, name='api_top_rated'),
+    path('api/latest/', api.api_latest, name='api_latest'),
+    path('api/genre/<str:genre_name>/', api.api_genre_movies, name='api_genre_movies'),
+    path('api/home/', api.api_home, name='api_home'),
+    path('api/batch/', api.api_batch, name='api_batch'),
     
     # Original Template-based URLs
     path('', views.home, name='home'),
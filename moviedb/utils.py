@@ -3,13 +3,22 @@ Utility functions for the moviedb app.
 This module contains helper functions for API calls, caching, and data processing.
 """
 
-import requests
+import asyncio
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from django.core.cache import cache
-from django.core.cache.utils import make_template_fragment_key as make_key
 from django.conf import settings
 from requests.exceptions import RequestException
-from typing import Optional, Dict, List, Any
+import httpx
+from asgiref.sync import sync_to_async
+from typing import Optional, Dict, List, Any, Callable, NamedTuple, Tuple
 import logging
+import threading
+import time
+
+from . import upstream
+from .cache_keys import canonicalize
 
 logger = logging.getLogger(__name__)
 
@@ -18,43 +27,487 @@ TMDB_API_KEY = settings.TMDB_API_KEY
 TRAKT_CLIENT_ID = settings.TRAKT_CLIENT_ID
 OMDB_API_KEY = settings.OMDB_API_KEY
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
+TVMAZE_BASE_URL = "https://api.tvmaze.com"
+
+# Cache lifetimes for the series detail pipeline stages
+SERIES_DETAILS_CACHE_TIMEOUT = 60 * 60
+TVMAZE_LOOKUP_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # TVDB -> TVMaze IDs never change
+TVMAZE_EPISODES_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Serialized seasons of stored series; invalidated when a Season or Episode changes
+SERIES_SEASONS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Request coalescing: how long a cross-worker fetch lock lives and how long
+# callers wait on another caller's fetch before fetching themselves
+SINGLE_FLIGHT_LOCK_TIMEOUT = 15
+SINGLE_FLIGHT_WAIT_TIMEOUT = 12
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+
+# Negative caching: how long a failed URL is answered with None without
+# calling upstream again (404s are stable, other failures may be transient)
+NOT_FOUND_CACHE_TIMEOUT = 60 * 10
+FAILURE_CACHE_TIMEOUT = 30
+
+
+class CachedResponse(NamedTuple):
+    """Cached upstream payload and the time until which it counts as fresh."""
+    data: Any
+    fresh_until: float
 
 
 def make_api_request(url: str, cache_timeout: int = 3600) -> Optional[Dict[str, Any]]:
     """
     Make an API request with caching support.
     
+    Responses are fresh for ``cache_timeout`` seconds and are then served
+    stale for up to settings.API_CACHE_STALE_TTL more seconds while a
+    background thread refreshes them; a failed refresh keeps the stale copy.
+    Failed requests are negatively cached for a short time, so bogus IDs and
+    unavailable upstreams are not called again on every request.
+    
+    Concurrent cache misses for the same URL are coalesced: one caller
+    fetches from upstream while the others wait for its result, both within
+    this process and (through a cache-backed lock) across worker processes.
+    
+    URLs are cached under their canonical key (see cache_keys.canonicalize),
+    so the same resource shares one entry however its URL was built.
+    
     Args:
         url: The API endpoint URL
-        cache_timeout: Cache timeout in seconds (default: 1 hour)
+        cache_timeout: Seconds the response is fresh (default: 1 hour)
         
     Returns:
         JSON response as dictionary or None if request fails
     """
-    cache_key = make_key('api_request', url)
+    cache_key, family, _ = canonicalize(url)
     
     # Try to get cached response
-    cached_response = cache.get(cache_key)
-    if cached_response:
-        logger.debug(f"Cache hit for URL: {url}")
-        return cached_response
+    cached_entry = cache.get(cache_key)
+    if cached_entry is not None:
+        data, is_fresh = _unpack_entry(cached_entry)
+        if is_fresh:
+            logger.debug(f"Cache hit for URL: {url}")
+            _record_lookup(family, 'hits')
+        else:
+            logger.debug(f"Serving stale response for URL: {url}")
+            _record_lookup(family, 'stale_hits')
+            _refresh_in_background(url, cache_key, cache_timeout)
+        return data
+    
+    if cache.get(_failure_key(cache_key)) is not None:
+        logger.debug(f"Negative cache hit for URL: {url}")
+        _record_lookup(family, 'negative_hits')
+        return None
+    
+    _record_lookup(family, 'misses')
+    return _fetch_single_flight(url, cache_key, cache_timeout)
+
+
+def get_cached_responses(urls: List[str], cache_timeout: int = 3600) -> Dict[str, Any]:
+    """
+    Look up many URLs' cached responses with a single cache.get_many.
+    
+    Stale responses are returned too and refreshed in the background, as
+    make_api_request does. Nothing is fetched: URLs without a cached
+    response are simply left out.
+    
+    Args:
+        urls: API endpoint URLs
+        cache_timeout: Seconds a refreshed response is fresh (as for make_api_request)
+        
+    Returns:
+        Dictionary mapping each cached URL to its response
+    """
+    keys = {url: canonicalize(url) for url in urls}
+    entries = cache.get_many([cache_key for cache_key, _, _ in keys.values()])
+    
+    responses = {}
+    for url, (cache_key, family, _) in keys.items():
+        if cache_key not in entries:
+            continue
+        data, is_fresh = _unpack_entry(entries[cache_key])
+        if is_fresh:
+            _record_lookup(family, 'hits')
+        else:
+            _record_lookup(family, 'stale_hits')
+            _refresh_in_background(url, cache_key, cache_timeout)
+        responses[url] = data
+    return responses
+
+
+def _failure_key(cache_key: str) -> str:
+    return f'{cache_key}:failed'
+
+
+def _remember_failure(cache_key: str, status_code: Optional[int]) -> None:
+    if status_code == 404:
+        # The resource is gone, so a stale copy should not be served either
+        cache.delete(cache_key)
+        timeout = NOT_FOUND_CACHE_TIMEOUT
+    else:
+        timeout = FAILURE_CACHE_TIMEOUT
+    cache.set(_failure_key(cache_key), status_code or 0, timeout)
+
+
+def _unpack_entry(entry: Any) -> Tuple[Any, bool]:
+    if isinstance(entry, CachedResponse):
+        return entry.data, entry.fresh_until > time.time()
+    return entry, True  # Plain payload cached before stale-while-revalidate
+
+
+def _build_entry(data: Any, cache_timeout: int) -> Tuple[CachedResponse, int]:
+    # Keep the entry past its freshness so it can be served stale
+    stale_ttl = getattr(settings, 'API_CACHE_STALE_TTL', 60 * 60 * 24)
+    return CachedResponse(data, time.time() + cache_timeout), cache_timeout + stale_ttl
+
+
+class _Flight:
+    """An in-process upstream fetch that other threads can wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_refreshing = set()
+_refresh_executor = None
+_request_stats = Counter()
+_endpoint_stats: Dict[str, Counter] = {}
+_request_stats_lock = threading.Lock()
+
+ENDPOINT_LOOKUP_OUTCOMES = ('hits', 'stale_hits', 'negative_hits', 'misses')
+
+
+def _record(stat: str) -> None:
+    with _request_stats_lock:
+        _request_stats[stat] += 1
+
+
+def _record_lookup(family: str, outcome: str) -> None:
+    with _request_stats_lock:
+        _endpoint_stats.setdefault(family, Counter())[outcome] += 1
+
+
+def get_request_stats() -> Dict[str, int]:
+    """
+    Get this process's upstream request counters.
+    
+    Returns:
+        Dictionary with 'upstream_fetches', 'coalesced_waits' (threads that
+        reused another thread's fetch), 'coalesced_remote_waits' (fetches
+        reused from another worker), 'coalesced_wait_timeouts', 'stale_served',
+        'background_refreshes' and 'refresh_failures'
+    """
+    with _request_stats_lock:
+        return {
+            stat: _request_stats[stat]
+            for stat in (
+                'upstream_fetches', 'coalesced_waits', 'coalesced_remote_waits', 'coalesced_wait_timeouts',
+                'stale_served', 'background_refreshes', 'refresh_failures',
+            )
+        }
+
+
+def get_endpoint_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Get this process's cache lookups per endpoint family.
+    
+    Returns:
+        Dictionary mapping each endpoint family (e.g. 'tmdb /3/movie/{id}')
+        to its 'hits', 'stale_hits', 'negative_hits' and 'misses' counts and
+        'hit_ratio' (share of lookups answered from the cache)
+    """
+    with _request_stats_lock:
+        stats = {}
+        for family, counts in sorted(_endpoint_stats.items()):
+            stats[family] = {outcome: counts[outcome] for outcome in ENDPOINT_LOOKUP_OUTCOMES}
+            lookups = sum(stats[family].values())
+            stats[family]['hit_ratio'] = (lookups - counts['misses']) / lookups if lookups else 0.0
+        return stats
+
+
+def reset_request_stats() -> None:
+    """Reset the upstream request and endpoint cache counters."""
+    with _request_stats_lock:
+        _request_stats.clear()
+        _endpoint_stats.clear()
+
+
+def _fetch_single_flight(url: str, cache_key: str, cache_timeout: int) -> Optional[Dict[str, Any]]:
+    with _flights_lock:
+        flight = _flights.get(cache_key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _flights[cache_key] = _Flight()
     
+    if not is_leader:
+        _record('coalesced_waits')
+        if not flight.done.wait(SINGLE_FLIGHT_WAIT_TIMEOUT):
+            _record('coalesced_wait_timeouts')
+        return flight.result
+    
+    try:
+        flight.result = _fetch_with_worker_lock(url, cache_key, cache_timeout)
+        return flight.result
+    finally:
+        with _flights_lock:
+            _flights.pop(cache_key, None)
+        flight.done.set()
+
+
+def _fetch_with_worker_lock(url: str, cache_key: str, cache_timeout: int) -> Optional[Dict[str, Any]]:
+    lock_key = f'{cache_key}:lock'
+    if cache.add(lock_key, True, SINGLE_FLIGHT_LOCK_TIMEOUT):
+        try:
+            return _fetch_and_cache(url, cache_key, cache_timeout)
+        finally:
+            cache.delete(lock_key)
+    
+    # Another worker holds the lock: wait for it to fill the cache
+    _record('coalesced_remote_waits')
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        cached_entry = cache.get(cache_key)
+        if cached_entry is not None:
+            return _unpack_entry(cached_entry)[0]
+        if not cache.get(lock_key):
+            break  # The other worker gave up without caching anything
+    else:
+        _record('coalesced_wait_timeouts')
+    
+    return _fetch_and_cache(url, cache_key, cache_timeout)
+
+
+def _fetch_and_cache(url: str, cache_key: str, cache_timeout: int) -> Optional[Dict[str, Any]]:
+    _record('upstream_fetches')
     try:
-        response = requests.get(url, timeout=10)
+        response = upstream.get(url)
         response.raise_for_status()
         data = response.json()
         
         # Cache the response
-        cache.set(cache_key, data, cache_timeout)
+        cache.set(cache_key, *_build_entry(data, cache_timeout))
         logger.debug(f"Cached response for URL: {url}")
         
         return data
     except RequestException as e:
         logger.error(f"API request failed for URL {url}: {str(e)}")
+        _remember_failure(cache_key, e.response.status_code if e.response is not None else None)
         return None
     except ValueError as e:
         logger.error(f"Invalid JSON response from URL {url}: {str(e)}")
+        _remember_failure(cache_key, None)
+        return None
+
+
+def _refresh_in_background(url: str, cache_key: str, cache_timeout: int) -> None:
+    global _refresh_executor
+    
+    _record('stale_served')
+    if cache.get(_failure_key(cache_key)) is not None:
+        return  # Refreshed recently and failed; keep serving stale for now
+    with _flights_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cache-refresh')
+    _refresh_executor.submit(_refresh, url, cache_key, cache_timeout)
+
+
+def _refresh(url: str, cache_key: str, cache_timeout: int) -> None:
+    lock_key = f'{cache_key}:lock'
+    try:
+        # Skip if another worker is already refreshing this key
+        if not cache.add(lock_key, True, SINGLE_FLIGHT_LOCK_TIMEOUT):
+            return
+        try:
+            if _fetch_and_cache(url, cache_key, cache_timeout) is None:
+                _record('refresh_failures')
+            else:
+                _record('background_refreshes')
+        finally:
+            cache.delete(lock_key)
+    finally:
+        with _flights_lock:
+            _refreshing.discard(cache_key)
+
+
+async def amake_api_request(url: str, cache_timeout: int = 3600) -> Optional[Dict[str, Any]]:
+    """
+    Async counterpart of make_api_request for async views.
+    
+    Shares cache entries (including stale-while-revalidate and negative
+    caching) with make_api_request, but waits on the upstream without
+    blocking a thread. Concurrent misses for the same URL are coalesced
+    the same way: one coroutine per event loop fetches while the others
+    await its result, and the cache-backed lock is shared with the sync
+    path, so sync and async callers in other workers wait on it too.
+    
+    Args:
+        url: The API endpoint URL
+        cache_timeout: Seconds the response is fresh (default: 1 hour)
+        
+    Returns:
+        JSON response as dictionary or None if request fails
+    """
+    cache_key, family, _ = canonicalize(url)
+    
+    cached_entry = await cache.aget(cache_key)
+    if cached_entry is not None:
+        data, is_fresh = _unpack_entry(cached_entry)
+        if is_fresh:
+            logger.debug(f"Cache hit for URL: {url}")
+            _record_lookup(family, 'hits')
+        else:
+            logger.debug(f"Serving stale response for URL: {url}")
+            _record_lookup(family, 'stale_hits')
+            # Reads the failure marker from the cache, so it runs off the event loop
+            await sync_to_async(_refresh_in_background)(url, cache_key, cache_timeout)
+        return data
+    
+    if await cache.aget(_failure_key(cache_key)) is not None:
+        logger.debug(f"Negative cache hit for URL: {url}")
+        _record_lookup(family, 'negative_hits')
         return None
+    
+    _record_lookup(family, 'misses')
+    return await _afetch_single_flight(url, cache_key, cache_timeout)
+
+
+# In-flight async fetches per event loop; a future can only be awaited on its own loop
+_async_flights: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _afetch_single_flight(url: str, cache_key: str, cache_timeout: int) -> Optional[Dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    flights = _async_flights.setdefault(loop, {})
+    flight = flights.get(cache_key)
+    if flight is not None:
+        _record('coalesced_waits')
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight), SINGLE_FLIGHT_WAIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            _record('coalesced_wait_timeouts')
+            return None
+    
+    flight = flights[cache_key] = loop.create_future()
+    result = None
+    try:
+        result = await _afetch_with_worker_lock(url, cache_key, cache_timeout)
+        return result
+    finally:
+        flights.pop(cache_key, None)
+        flight.set_result(result)
+
+
+async def _afetch_with_worker_lock(url: str, cache_key: str, cache_timeout: int) -> Optional[Dict[str, Any]]:
+    lock_key = f'{cache_key}:lock'
+    if await cache.aadd(lock_key, True, SINGLE_FLIGHT_LOCK_TIMEOUT):
+        try:
+            return await _afetch_and_cache(url, cache_key, cache_timeout)
+        finally:
+            await cache.adelete(lock_key)
+    
+    # Another worker holds the lock: wait for it to fill the cache
+    _record('coalesced_remote_waits')
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        cached_entry = await cache.aget(cache_key)
+        if cached_entry is not None:
+            return _unpack_entry(cached_entry)[0]
+        if not await cache.aget(lock_key):
+            break  # The other worker gave up without caching anything
+    else:
+        _record('coalesced_wait_timeouts')
+    
+    return await _afetch_and_cache(url, cache_key, cache_timeout)
+
+
+async def _afetch_and_cache(url: str, cache_key: str, cache_timeout: int) -> Optional[Dict[str, Any]]:
+    _record('upstream_fetches')
+    try:
+        response = await upstream.async_get(url)
+        response.raise_for_status()
+        data = response.json()
+        
+        await cache.aset(cache_key, *_build_entry(data, cache_timeout))
+        logger.debug(f"Cached response for URL: {url}")
+        
+        return data
+    except httpx.HTTPStatusError as e:
+        logger.error(f"API request failed for URL {url}: {str(e)}")
+        await sync_to_async(_remember_failure)(cache_key, e.response.status_code)
+        return None
+    except (httpx.HTTPError, RequestException) as e:
+        logger.error(f"API request failed for URL {url}: {str(e)}")
+        await sync_to_async(_remember_failure)(cache_key, None)
+        return None
+    except ValueError as e:
+        logger.error(f"Invalid JSON response from URL {url}: {str(e)}")
+        await sync_to_async(_remember_failure)(cache_key, None)
+        return None
+
+
+def series_seasons_cache_key(series_id: int) -> str:
+    """Get the cache key of a stored series' serialized seasons and episodes."""
+    return f'series_seasons:{series_id}'
+
+
+def invalidate_series_seasons(*series_ids: int) -> None:
+    """
+    Drop the cached seasons payload of stored series.
+    
+    Called whenever their Season or Episode rows change, including bulk
+    writes that send no model signals.
+    """
+    cache.delete_many([series_seasons_cache_key(series_id) for series_id in series_ids])
+
+
+def fetch_concurrently(
+    tasks: Dict[str, Callable[[], Any]],
+    max_workers: Optional[int] = None,
+    default_factory: Callable[[], Any] = list,
+) -> Dict[str, Any]:
+    """
+    Run independent fetch callables concurrently and collect their results.
+    
+    Page renders that need several upstream lists (e.g. the home page rails)
+    use this so a cold cache costs roughly one round trip instead of the sum
+    of all of them.
+    
+    Args:
+        tasks: Mapping of result name to a zero-argument callable
+        max_workers: Thread pool size (default: settings.API_FAN_OUT_MAX_WORKERS);
+            a value of 1 runs the tasks sequentially in the calling thread
+        default_factory: Builds the result for a task that raises an exception
+        
+    Returns:
+        Dictionary mapping each task name to its result, in task order
+    """
+    if max_workers is None:
+        max_workers = getattr(settings, 'API_FAN_OUT_MAX_WORKERS', 8)
+    max_workers = max(1, min(max_workers, len(tasks) or 1))
+    
+    def run(name: str, task: Callable[[], Any]) -> Any:
+        try:
+            return task()
+        except Exception as e:
+            logger.error(f"Concurrent fetch '{name}' failed: {str(e)}")
+            return default_factory()
+    
+    if max_workers == 1:
+        return {name: run(name, task) for name, task in tasks.items()}
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fan-out') as executor:
+        futures = {name: executor.submit(run, name, task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
 
 
 def fetch_movies_by_genre(genre_id: int, page: int = 1, language: str = 'en-US') -> List[Dict[str, Any]]:
@@ -159,6 +612,60 @@ def fetch_series_by_genre(genre_id: int, page: int = 1, language: str = 'en-US')
     return data.get('results', []) if data else []
 
 
+def fetch_latest_series(page: int = 1, language: str = 'en-US') -> List[Dict[str, Any]]:
+    """
+    Fetch latest TV series sorted by release date.
+    
+    Args:
+        page: Page number for pagination
+        language: Language code (default: en-US)
+        
+    Returns:
+        List of series dictionaries with posters
+    """
+    from datetime import datetime
+    
+    today = datetime.today().strftime('%Y-%m-%d')
+    url = (
+        f'{TMDB_BASE_URL}/discover/tv'
+        f'?api_key={TMDB_API_KEY}'
+        f'&language={language}'
+        f'&sort_by=release_date.desc'
+        f'&release_date.lte={today}'
+        f'&page={page}'
+    )
+    
+    data = make_api_request(url)
+    if not data:
+        return []
+    
+    series = data.get('results', [])
+    # Filter out series without posters
+    return [serie for serie in series if serie.get('poster_path')]
+
+
+def fetch_popular_series(page: int = 1, language: str = 'en-US') -> List[Dict[str, Any]]:
+    """
+    Fetch popular TV series from TMDb API.
+    
+    Args:
+        page: Page number for pagination
+        language: Language code (default: en-US)
+        
+    Returns:
+        List of series dictionaries
+    """
+    url = (
+        f'{TMDB_BASE_URL}/tv/popular'
+        f'?api_key={TMDB_API_KEY}'
+        f'&language={language}'
+        f'&page={page}'
+    )
+    
+    data = make_api_request(url)
+    return data.get('results', []) if data else []
+
+
 # Genre ID mapping for easy reference
 GENRE_IDS = {
     'action': 28,
@@ -182,6 +689,27 @@ GENRE_IDS = {
 }
 
 
+# TV genre ID mapping (TMDb uses a separate genre list for series)
+SERIES_GENRE_IDS = {
+    'action_adventure': 10759,
+    'animation': 16,
+    'comedy': 35,
+    'crime': 80,
+    'documentary': 99,
+    'drama': 18,
+    'family': 10751,
+    'kids': 10762,
+    'mystery': 9648,
+    'news': 10763,
+    'reality': 10764,
+    'sci_fi_fantasy': 10765,
+    'soap': 10766,
+    'talk': 10767,
+    'war_politics': 10768,
+    'western': 37,
+}
+
+
 def get_genre_id(genre_name: str) -> Optional[int]:
     """
     Get TMDb genre ID by genre name.
@@ -195,44 +723,115 @@ def get_genre_id(genre_name: str) -> Optional[int]:
     return GENRE_IDS.get(genre_name.lower())
 
 
-def fetch_movie_details(movie_id: int, language: str = 'en-US') -> Optional[Dict[str, Any]]:
+def details_url(
+    kind: str,
+    tmdb_id: int,
+    language: str = 'en-US',
+    append_to_response: Optional[str] = None,
+) -> str:
     """
-    Fetch detailed information about a specific movie.
+    Build the TMDb details URL of a movie or TV series.
     
     Args:
-        movie_id: TMDb movie ID
+        kind: 'movie' or 'tv'
+        tmdb_id: TMDb ID
         language: Language code (default: en-US)
+        append_to_response: Comma-separated sub-resources returned in the same response
         
     Returns:
-        Movie details dictionary or None if not found
+        Details endpoint URL
     """
     url = (
-        f'{TMDB_BASE_URL}/movie/{movie_id}'
+        f'{TMDB_BASE_URL}/{kind}/{tmdb_id}'
         f'?api_key={TMDB_API_KEY}'
         f'&language={language}'
     )
+    if append_to_response:
+        url += f'&append_to_response={append_to_response}'
+    return url
+
+
+def fetch_movie_details(movie_id: int, language: str = 'en-US') -> Optional[Dict[str, Any]]:
+    """
+    Fetch detailed information about a specific movie.
     
-    return make_api_request(url)
+    Args:
+        movie_id: TMDb movie ID
+        language: Language code (default: en-US)
+        
+    Returns:
+        Movie details dictionary or None if not found
+    """
+    return make_api_request(details_url('movie', movie_id, language))
 
 
-def fetch_series_details(series_id: int, language: str = 'en-US') -> Optional[Dict[str, Any]]:
+def fetch_series_details(
+    series_id: int,
+    language: str = 'en-US',
+    append_to_response: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Fetch detailed information about a specific TV series.
     
     Args:
         series_id: TMDb series ID
         language: Language code (default: en-US)
+        append_to_response: Comma-separated sub-resources (e.g. 'external_ids')
+            returned in the same response instead of separate requests
         
     Returns:
         Series details dictionary or None if not found
     """
-    url = (
-        f'{TMDB_BASE_URL}/tv/{series_id}'
-        f'?api_key={TMDB_API_KEY}'
-        f'&language={language}'
-    )
+    url = details_url('tv', series_id, language, append_to_response)
+    return make_api_request(url, SERIES_DETAILS_CACHE_TIMEOUT)
+
+
+def fetch_tvmaze_show(tvdb_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Look up a TVMaze show by its TheTVDB ID.
+    
+    Args:
+        tvdb_id: TheTVDB series ID
+        
+    Returns:
+        TVMaze show dictionary or None if not found
+    """
+    url = f'{TVMAZE_BASE_URL}/lookup/shows?thetvdb={tvdb_id}'
+    return make_api_request(url, TVMAZE_LOOKUP_CACHE_TIMEOUT)
+
+
+def fetch_tvmaze_seasons(tvmaze_id: int) -> List[Dict[str, Any]]:
+    """
+    Fetch every season of a TVMaze show together with its episodes.
+    
+    Seasons and episodes are embedded in a single show request rather than
+    requested season by season, so long-running shows cost one round trip.
+    
+    Args:
+        tvmaze_id: TVMaze show ID
+        
+    Returns:
+        List of season dictionaries with 'season_number', 'season_name'
+        and 'episodes' keys, in season order
+    """
+    url = f'{TVMAZE_BASE_URL}/shows/{tvmaze_id}?embed[]=seasons&embed[]=episodes'
+    data = make_api_request(url, TVMAZE_EPISODES_CACHE_TIMEOUT)
+    if not data:
+        return []
+    
+    embedded = data.get('_embedded', {})
+    episodes_by_season = {}
+    for episode in embedded.get('episodes', []):
+        episodes_by_season.setdefault(episode.get('season'), []).append(episode)
     
-    return make_api_request(url)
+    return [
+        {
+            'season_number': season['number'],
+            'season_name': season.get('name', f'Season {season["number"]}'),
+            'episodes': episodes_by_season.get(season['number'], []),
+        }
+        for season in embedded.get('seasons', [])
+    ]
 
 
 def search_movies(query: str, page: int = 1, language: str = 'en-US') -> List[Dict[str, Any]]:
@@ -19,18 +19,31 @@ from django.http import JsonResponse
 import urllib.parse
 from django.db import transaction
 
+from . import upstream
+from .catalog import movie_row
+from .genres import get_genre_catalog, sync_genre_titles, titles_in_genre
+from .pagination import InvalidCursor, paginate, paginate_request
+from .search import search_catalog
+from .write_behind import enqueue_upserts
+
 # Import utility functions
 from .utils import (
     make_api_request,
+    fetch_concurrently,
     fetch_movies_by_genre,
     fetch_latest_movies,
     fetch_popular_movies,
     fetch_series_by_genre,
+    fetch_latest_series,
+    fetch_popular_series,
     fetch_movie_details,
     fetch_series_details,
+    fetch_tvmaze_show,
+    fetch_tvmaze_seasons,
     search_movies,
     search_series,
     GENRE_IDS,
+    SERIES_GENRE_IDS,
     get_genre_id,
     TMDB_API_KEY,
     TRAKT_CLIENT_ID,
@@ -106,109 +119,53 @@ def fetch_crime_movies(page=1):
     return fetch_movies_by_genre(GENRE_IDS['crime'], page)
 
 
+# Rails rendered on the home page, keyed by template context name
+HOME_MOVIE_RAILS = {
+    'movies': fetch_popular_movies,
+    'action_movies': fetch_action_movies,
+    'horror_movies': fetch_horror_movies,
+    'animation_movies': fetch_animation_movies,
+    'scifi_movies': fetch_scifi_movies,
+    'romance_movies': fetch_romance_movies,
+    'investigative_movies': fetch_investigative_movies,
+    'drama_movies': fetch_drama_movies,
+    'comedy_movies': fetch_comedy_movies,
+    'latest_movies': fetch_latest_movies,
+    'family_movies': fetch_family_movies,
+    'history_movies': fetch_history_movies,
+    'documentary_movies': fetch_documentary_movies,
+    'thriller_movies': fetch_thriller_movies,
+    'fantasy_movies': fetch_fantasy_movies,
+    'adventure_movies': fetch_adventure_movies,
+    'crime_movies': fetch_crime_movies,
+}
+
+
 def home(request):
-    url = f'https://api.themoviedb.org/3/movie/popular?api_key={API_KEY}&language=en-US&page=1'
-    data = make_api_request(url)
-    movies = data['results']
-    
-    action_movies = fetch_action_movies()
-    horror_movies = fetch_horror_movies()
-    animation_movies = fetch_animation_movies()
-    scifi_movies = fetch_scifi_movies()
-    romance_movies = fetch_romance_movies()
-    investigative_movies = fetch_investigative_movies()
-    drama_movies = fetch_drama_movies()
-    comedy_movies = fetch_comedy_movies()
-    latest_movies = fetch_latest_movies()
-    family_movies = fetch_family_movies()
-    history_movies = fetch_history_movies()
-    documentary_movies = fetch_documentary_movies()
-    thriller_movies = fetch_thriller_movies()
-    fantasy_movies = fetch_fantasy_movies()
-    adventure_movies = fetch_adventure_movies()
-    crime_movies = fetch_crime_movies()
-    
-    posters = [movie['poster_path'] for movie in movies]
-    posters = [movie['poster_path'] for movie in action_movies]
-    posters = [movie['poster_path'] for movie in horror_movies]
-    posters = [movie['poster_path'] for movie in animation_movies]
-    posters = [movie['poster_path'] for movie in scifi_movies]
-    posters = [movie['poster_path'] for movie in romance_movies]
-    posters = [movie['poster_path'] for movie in investigative_movies]
-    posters = [movie['poster_path'] for movie in drama_movies]
-    posters = [movie['poster_path'] for movie in comedy_movies]
-    posters = [movie['poster_path'] for movie in latest_movies]
-    posters = [movie['poster_path'] for movie in family_movies]
-    posters = [movie['poster_path'] for movie in history_movies]
-    posters = [movie['poster_path'] for movie in documentary_movies]
-    posters = [movie['poster_path'] for movie in thriller_movies]
-    posters = [movie['poster_path'] for movie in fantasy_movies]
-    posters = [movie['poster_path'] for movie in adventure_movies]
-    posters = [movie['poster_path'] for movie in crime_movies]
-    
-    context = {
-        'movies': movies,
-        'action_movies': action_movies,
-        'horror_movies': horror_movies,
-        'animation_movies': animation_movies,
-        'scifi_movies': scifi_movies,
-        'romance_movies': romance_movies,
-        'investigative_movies': investigative_movies,
-        'drama_movies': drama_movies,
-        'comedy_movies': comedy_movies,
-        'latest_movies': latest_movies,
-        'family_movies': family_movies,
-        'fantasy_movies': fantasy_movies,
-        'adventure_movies': adventure_movies,
-        'thriller_movies': thriller_movies,
-        'documentary_movies': documentary_movies,
-        'history_movies': history_movies,
-        'crime_movies': crime_movies,
-        'posters': posters,
-    }
+    # Fetch every rail concurrently so a cold cache costs one round trip
+    context = fetch_concurrently(HOME_MOVIE_RAILS)
+    context['posters'] = [movie['poster_path'] for movie in context['crime_movies']]
     
     return render(request, 'home.html', context)
 
-def movie_list(request):
-    movies = Movie.objects.all()
-    return render(request, 'movie_list.html', {'movies': movies})
-
-    
+def paginate_stored(request, queryset):
+    # A stale or tampered cursor just starts over at the first page
+    try:
+        return paginate_request(request, queryset)
+    except InvalidCursor:
+        return paginate(queryset)
 
 def movie_list(request):
-    movies = Movie.objects.all()
-    return render(request, 'movie_list.html', {'movies': movies})
+    page = paginate_stored(request, Movie.objects.all())
+    return render(request, 'movie_list.html', {'movies': page.items, 'page': page})
 
 def genre_list(request):
-    url = f'https://api.themoviedb.org/3/genre/movie/list?api_key={API_KEY}&language=en-US'
-    genres_data = make_api_request(url).get('genres', [])
-    for genre_data in genres_data:
-        tmdb_id = genre_data.get('id')
-        name = genre_data.get('name')
-        Genre.objects.get_or_create(tmdb_id=tmdb_id, name=name)
-    genres = Genre.objects.all()
+    genres = get_genre_catalog('movie')
     return render(request, 'genre_list.html', {'genres': genres})
 
 def genre_movies(request, genre_id):
-    url = f'https://api.themoviedb.org/3/discover/movie?api_key={API_KEY}&language=en-US&sort_by=popularity.desc&with_genres={genre_id}'
-    movies_data = make_api_request(url).get('results', [])
-    for movie_data in movies_data:
-        tmdb_id = movie_data.get('id')
-        title = movie_data.get('title')
-        overview = movie_data.get('overview', '')
-        release_date = movie_data.get('release_date', '')
-        poster_path = movie_data.get('poster_path', '')
-        movie, _ = Movie.objects.get_or_create(
-            tmdb_id=tmdb_id,
-            title=title,
-            defaults={
-                'overview': overview,
-                'release_date': release_date,
-                'poster_path': poster_path,
-            }
-        )
-        movie.genres.add(Genre.objects.get(tmdb_id=genre_id))
-    movies = Movie.objects.filter(genres__tmdb_id=genre_id).distinct()
+    sync_genre_titles('movie', genre_id)
+    movies = titles_in_genre('movie', genre_id)
     return render(request, 'genre_movies.html', {'movies': movies})
 
 def search_results(request):
@@ -216,41 +173,20 @@ def search_results(request):
     if not query:
         return render(request, 'search_results.html', {'error': 'Please enter a search term.'})
 
-    tmdb_api_key = API_KEY
     movies = []
     series = []
     errors = []
 
-    search_types = [
-        {'type': 'movie', 'url': 'https://api.themoviedb.org/3/search/movie'},
-        {'type': 'tv', 'url': 'https://api.themoviedb.org/3/search/tv'}
-    ]
-
-    for search in search_types:
-        try:
-            response = requests.get(search['url'], params={
-                'api_key': tmdb_api_key,
-                'language': 'en-US',
-                'query': query
+    # Local full-text search first; TMDB is only called when few titles match
+    for kind, items in (('movie', movies), ('tv', series)):
+        for result in search_catalog(kind, query):
+            items.append({
+                'pk': result['id'],  # Using 'pk' to match Django template usage
+                'title': result.get('title') or result.get('name'),
+                'overview': result.get('overview', ''),
+                'release_date': result.get('release_date') or result.get('first_air_date'),
+                'poster_path': result.get('poster_path', ''),
             })
-            response.raise_for_status()
-            results = response.json().get('results', [])
-
-            for result in results:
-                item = {
-                    'pk': result['id'],  # Using 'pk' to match Django template usage
-                    'title': result.get('title') or result.get('name'),
-                    'overview': result.get('overview', ''),
-                    'release_date': result.get('release_date') or result.get('first_air_date'),
-                    'poster_path': result.get('poster_path', ''),
-                }
-                if search['type'] == 'movie':
-                    movies.append(item)
-                else:
-                    series.append(item)
-
-        except requests.RequestException as e:
-            errors.append(f"Error fetching {search['type']} data: {str(e)}")
 
     context = {
         'movies': movies,
@@ -274,36 +210,15 @@ def movie_details(request, pk):
 
         # Fetch movie details from TMDB
         movie_url = f'{tmdb_base_url}/movie/{pk}?api_key={tmdb_api_key}&language=en-US'
-        movie_response = requests.get(movie_url)
+        movie_response = upstream.get(movie_url)
         movie_response.raise_for_status()
         movie_data = movie_response.json()
 
-        # Extract movie details
-        movie_title = movie_data.get('title')
-        movie_overview = movie_data.get('overview', '')
-        movie_poster_path = movie_data.get('poster_path', '')
-        movie_release_date = movie_data.get('release_date', '')
-        movie_vote_average = movie_data.get('vote_average', 0)
         movie_genres = [genre['name'] for genre in movie_data.get('genres', [])]
-        movie_runtime = movie_data.get('runtime', 0)
-        movie_tagline = movie_data.get('tagline', '')
-        full_poster_url = f'https://image.tmdb.org/t/p/w500{movie_poster_path}'
-
-        # Create or update the Movie instance
-        movie, created = Movie.objects.update_or_create(
-            id=pk,
-            defaults={
-                'title': movie_title,
-                'overview': movie_overview,
-                'poster_path': full_poster_url,
-                'release_date': movie_release_date,
-                'vote_average': movie_vote_average,
-                'runtime': movie_runtime,
-                'tagline': movie_tagline,
-                'imdb_id': movie_data.get('imdb_id'),
-                'tmdb_id': movie_data.get('id'),
-            }
-        )
+
+        # Render from TMDB's data; the row is stored in the background
+        enqueue_upserts('movie', [movie_data], detailed=True)
+        movie = movie_row(movie_data)
 
         # Generate a token for the movie
         movie_token = generate_movie_token(pk)
@@ -334,7 +249,7 @@ def latest_movies(request):
     try:
         today = datetime.today().strftime('%Y-%m-%d')
         url = f'https://api.themoviedb.org/3/discover/movie?api_key={API_KEY}&language=en-US&sort_by=release_date.desc&release_date.lte={today}&page=1'
-        response = requests.get(url)
+        response = upstream.get(url)
         response.raise_for_status()
         movies = response.json().get('results', [])
         movies_with_posters = [movie for movie in movies if movie.get('poster_path')]
@@ -354,7 +269,7 @@ def get_movies_by_category(category_id, page_number):
         'page': page_number
     }
     
-    response = requests.get(url, params=params)
+    response = upstream.get(url, params=params)
     response.raise_for_status()  # Raise an exception for bad status codes
     data = response.json()
     movies = data.get('results', [])
@@ -566,13 +481,13 @@ def investigative_movies(request):
     return render(request, 'movies.html', {'movies': movies, 'category': 'Investigative'})
 
 def series_list(request):
-    series = Series.objects.all()
-    return render(request, 'serie_list.html', {'series': series})
+    page = paginate_stored(request, Series.objects.all())
+    return render(request, 'serie_list.html', {'series': page.items, 'page': page})
 
 
 def fetch_streaming_link(movie_title):
     search_url = f'https://en.nexus-stream.com/movies'
-    response = requests.get(search_url)
+    response = upstream.get(search_url)
     response.raise_for_status()
 
     soup = BeautifulSoup(response.content, 'html.parser')
@@ -582,7 +497,7 @@ def fetch_streaming_link(movie_title):
         title = result.get_text().strip()
         if title.lower() == movie_title.lower():
             movie_page_url = result['href']
-            movie_response = requests.get(movie_page_url)
+            movie_response = upstream.get(movie_page_url)
             movie_response.raise_for_status()
             movie_soup = BeautifulSoup(movie_response.content, 'html.parser')
 
@@ -593,39 +508,16 @@ def fetch_streaming_link(movie_title):
 
 
 def serie_list(request):
-    series = Series.objects.all()
-    return render(request, 'series_list.html', {'series': series})
+    page = paginate_stored(request, Series.objects.all())
+    return render(request, 'series_list.html', {'series': page.items, 'page': page})
 
 def series_genre_list(request):
-    url = f'https://api.themoviedb.org/3/genre/tv/list?api_key={API_KEY}&language=en-US'
-    genres_data = make_api_request(url).get('genres', [])
-    for genre_data in genres_data:
-        tmdb_id = genre_data.get('id')
-        name = genre_data.get('name')
-        Genre.objects.get_or_create(tmdb_id=tmdb_id, name=name)
-    genres = Genre.objects.all()
+    genres = get_genre_catalog('tv')
     return render(request, 'series_genre_list.html', {'genres': genres})
 
 def genre_series(request, genre_id):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&sort_by=popularity.desc&with_genres={genre_id}'
-    series_data = make_api_request(url).get('results', [])
-    for serie_data in series_data:
-        tmdb_id = serie_data.get('id')
-        title = serie_data.get('title')
-        overview = serie_data.get('overview', '')
-        release_date = serie_data.get('release_date', '')
-        poster_path = serie_data.get('poster_path', '')
-        serie, _ = Series.objects.get_or_create(
-            tmdb_id=tmdb_id,
-            title=title,
-            defaults={
-                'overview': overview,
-                'release_date': release_date,
-                'poster_path': poster_path,
-            }
-        )
-        serie.genres.add(Genre.objects.get(tmdb_id=genre_id))
-    series = Series.objects.filter(genres__tmdb_id=genre_id).distinct()
+    sync_genre_titles('tv', genre_id)
+    series = titles_in_genre('tv', genre_id)
     return render(request, 'genre_series.html', {'series': series})
 
 
@@ -637,7 +529,7 @@ def get_series_by_category(category_id, page_number):
         'page': page_number
     }
     
-    response = requests.get(url, params=params)
+    response = upstream.get(url, params=params)
     response.raise_for_status()  # Raise an exception for bad status codes
     data = response.json()
     series = data.get('results', [])
@@ -659,124 +551,57 @@ def paginate_series(request, series):
     
     return series
 
-def fetch_latest_series(page=1):
-    today = datetime.today().strftime('%Y-%m-%d')
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&sort_by=release_date.desc&release_date.lte={today}&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        series = response.json().get('results', [])
-        # Filter out movies without posters
-        series_with_posters = [series for series in series if series.get('poster_path')]
-        return series_with_posters
-    else:
-        response.raise_for_status()
-
 def fetch_action_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=10759&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch action & adventure series (Genre ID: 10759)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['action_adventure'], page)
+
 def fetch_soap_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=10766&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch soap series (Genre ID: 10766)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['soap'], page)
+
 def fetch_animation_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=16&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch animation series (Genre ID: 16)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['animation'], page)
+
 def fetch_scifi_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=10765&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch sci-fi & fantasy series (Genre ID: 10765)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['sci_fi_fantasy'], page)
+
 def fetch_kids_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=10762&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch kids series (Genre ID: 10762)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['kids'], page)
+
 def fetch_family_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=10751&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch family series (Genre ID: 10751)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['family'], page)
+
 def fetch_drama_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=18&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch drama series (Genre ID: 18)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['drama'], page)
+
 def fetch_comedy_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=35&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch comedy series (Genre ID: 35)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['comedy'], page)
+
 def fetch_politics_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=10768&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-        
+    """Fetch war & politics series (Genre ID: 10768)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['war_politics'], page)
+
 def fetch_mystery_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=9648&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
+    """Fetch mystery series (Genre ID: 9648)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['mystery'], page)
 
-        
 def fetch_reality_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=10764&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
+    """Fetch reality series (Genre ID: 10764)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['reality'], page)
 
 def fetch_crime_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=80&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
+    """Fetch crime series (Genre ID: 80)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['crime'], page)
 
 def fetch_documentary_series(page=1):
-    url = f'https://api.themoviedb.org/3/discover/tv?api_key={API_KEY}&language=en-US&with_genres=99&page={page}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    else:
-        response.raise_for_status()
-
-
+    """Fetch documentary series (Genre ID: 99)"""
+    return fetch_series_by_genre(SERIES_GENRE_IDS['documentary'], page)
 
 
 def action_series(request):
@@ -944,60 +769,30 @@ def soap_series(request):
     
     return render(request, 'series21.html', {'series': series, 'category': 'Soaps'})
 
+# Rails rendered on the series home page, keyed by template context name
+HOME_SERIES_RAILS = {
+    'series': fetch_popular_series,
+    'action_series': fetch_action_series,
+    'reality_series': fetch_reality_series,
+    'animation_series': fetch_animation_series,
+    'scifi_series': fetch_scifi_series,
+    'mystery_series': fetch_mystery_series,
+    'drama_series': fetch_drama_series,
+    'comedy_series': fetch_comedy_series,
+    'latest_series': fetch_latest_series,
+    'family_series': fetch_family_series,
+    'politics_series': fetch_politics_series,
+    'kids_series': fetch_kids_series,
+    'soap_series': fetch_soap_series,
+    'crime_series': fetch_crime_series,
+    'documentary_series': fetch_documentary_series,
+}
+
+
 def home_series(request):
-    url = f'https://api.themoviedb.org/3/tv/popular?api_key={API_KEY}&language=en-US&page=1'
-    data = make_api_request(url)
-    series = data['results']
-    
-    action_series = fetch_action_series()
-    reality_series = fetch_reality_series()
-    animation_series = fetch_animation_series()
-    scifi_series = fetch_scifi_series()
-    mystery_series = fetch_mystery_series()
-    drama_series = fetch_drama_series()
-    comedy_series = fetch_comedy_series()
-    latest_series = fetch_latest_series()
-    family_series = fetch_family_series()
-    politics_series = fetch_politics_series()
-    kids_series = fetch_kids_series()
-    soap_series = fetch_soap_series()
-    crime_series = fetch_crime_series()
-    documentary_series = fetch_documentary_series()
-    
-    posters = [serie['poster_path'] for serie in series]
-    posters = [serie['poster_path'] for serie in action_series]
-    posters = [serie['poster_path'] for serie in kids_series]
-    posters = [serie['poster_path'] for serie in animation_series]
-    posters = [serie['poster_path'] for serie in scifi_series]
-    posters = [serie['poster_path'] for serie in soap_series]
-    posters = [serie['poster_path'] for serie in mystery_series]
-    posters = [serie['poster_path'] for serie in drama_series]
-    posters = [serie['poster_path'] for serie in comedy_series]
-    posters = [serie['poster_path'] for serie in latest_series]
-    posters = [serie['poster_path'] for serie in family_series]
-    posters = [serie['poster_path'] for serie in reality_series]
-    posters = [serie['poster_path'] for serie in politics_series]
-    posters = [serie['poster_path'] for serie in crime_series]
-    posters = [serie['poster_path'] for serie in documentary_series]
-    
-    context = {
-        'series': series,
-        'action_series': action_series,
-        'politics_series': politics_series,
-        'animation_series': animation_series,
-        'scifi_series': scifi_series,
-        'drama_series': drama_series,
-        'comedy_series': comedy_series,
-        'latest_series': latest_series,
-        'family_series': family_series,
-        'reality_series': reality_series,
-        'soap_series': soap_series,
-        'kids_series': kids_series,
-        'mystery_series': mystery_series,
-        'crime_series': crime_series,
-        'documentary_series': documentary_series,
-        'posters': posters,
-    }
+    # Fetch every rail concurrently so a cold cache costs one round trip
+    context = fetch_concurrently(HOME_SERIES_RAILS)
+    context['posters'] = [serie['poster_path'] for serie in context['documentary_series']]
     
     return render(request, 'series.html', context)
 
@@ -1009,15 +804,15 @@ logger = logging.getLogger(__name__)
 
 def serie_details(request, pk):
     try:
-        tmdb_api_key = API_KEY  # Ensure API_KEY is defined in settings.py
-        tmdb_base_url = 'https://api.themoviedb.org/3'
-        tvmaze_base_url = 'https://api.tvmaze.com'
-
-        # Fetch series details from TMDB
-        series_url = f'{tmdb_base_url}/tv/{pk}?api_key={tmdb_api_key}&language=en-US'
-        series_response = requests.get(series_url)
-        series_response.raise_for_status()
-        serie_data = series_response.json()
+        # TMDB details (with external IDs appended) and the latest rail are
+        # independent, so fetch them together
+        results = fetch_concurrently({
+            'serie_data': lambda: fetch_series_details(pk, append_to_response='external_ids'),
+            'latest_series': fetch_latest_series,
+        })
+        serie_data = results['serie_data']
+        if not serie_data:
+            raise requests.RequestException(f'TMDB details unavailable for series {pk}')
 
         # Extract series details
         serie_name = serie_data.get('name')
@@ -1034,48 +829,18 @@ def serie_details(request, pk):
         # The `pk` is the TMDB ID in this case
         tmdb_id = pk
 
-        # Fetch TVDB ID from TMDB
-        external_ids_url = f'{tmdb_base_url}/tv/{pk}/external_ids?api_key={tmdb_api_key}'
-        external_ids_response = requests.get(external_ids_url)
-        external_ids_response.raise_for_status()
-        external_ids_data = external_ids_response.json()
-        tvdb_id = external_ids_data.get('tvdb_id')
-
+        tvdb_id = serie_data.get('external_ids', {}).get('tvdb_id')
         if not tvdb_id:
             raise ValueError('TVDB ID not found for the series in TMDB')
 
-        # Fetch series details from TVMaze
-        tvmaze_url = f'{tvmaze_base_url}/lookup/shows?thetvdb={tvdb_id}'
-        tvmaze_response = requests.get(tvmaze_url)
-        tvmaze_response.raise_for_status()
-        tvmaze_data = tvmaze_response.json()
-        serie_tvmaze_id = tvmaze_data['id']
-
-        # Fetch seasons data from TVMaze
-        seasons_url = f'{tvmaze_base_url}/shows/{serie_tvmaze_id}/seasons'
-        seasons_response = requests.get(seasons_url)
-        seasons_response.raise_for_status()
-        seasons_data = seasons_response.json()
-
-        # Fetch episodes for each season
-        seasons_with_episodes = []
-        for season in seasons_data:
-            season_id = season['id']
-            episodes_url = f'{tvmaze_base_url}/seasons/{season_id}/episodes'
-            episodes_response = requests.get(episodes_url)
-            episodes_response.raise_for_status()
-            episodes_data = episodes_response.json()
-
-            seasons_with_episodes.append({
-                'season_number': season['number'],
-                'season_name': season.get('name', f'Season {season["number"]}'),
-                'episodes': episodes_data
-            })
-            
-              
+        # Resolve the TVMaze show, then load all seasons and episodes at once
+        tvmaze_data = fetch_tvmaze_show(tvdb_id)
+        if not tvmaze_data:
+            raise requests.RequestException(f'TVMaze show not found for TVDB ID {tvdb_id}')
+        seasons_with_episodes = fetch_tvmaze_seasons(tvmaze_data['id'])
 
         serie_token = generate_serie_token(pk)
-        latest_series = fetch_latest_series()
+        latest_series = results['latest_series']
 
         context = {
             'serie': {
@@ -1113,7 +878,7 @@ def paginate_anime(request, anime_list):
 
 def fetch_anime_by_genre(genre_id, page=1):
     url = f'https://api.jikan.moe/v4/anime?genres={genre_id}&page={page}'
-    response = requests.get(
+    response = upstream.get(
         url,
         params={
                 'genres': genre_id,
@@ -1206,7 +971,7 @@ def home_anime(request):
 
 def fetch_anime_details_from_jikan(mal_id):
     url = f'https://api.jikan.moe/v4/anime/{mal_id}'
-    response = requests.get(url)
+    response = upstream.get(url)
     if response.status_code == 200:
         return response.json().get('data', {})
     else:
@@ -1214,7 +979,7 @@ def fetch_anime_details_from_jikan(mal_id):
 
 def search_tmdb_for_anime(title):
     url = f'https://api.themoviedb.org/3/search/tv?api_key={API_KEY}&query={title}'
-    response = requests.get(url)
+    response = upstream.get(url)
     if response.status_code == 200:
         results = response.json().get('results', [])
         return results[0] if results else None
@@ -1233,7 +998,7 @@ def anime_details(request, mal_id):
         if tmdb_anime_data:
             tmdb_id = tmdb_anime_data['id']
             tmdb_anime_url = f'https://api.themoviedb.org/3/tv/{tmdb_id}?api_key={API_KEY}&language=en-US'
-            tmdb_anime_response = requests.get(tmdb_anime_url)
+            tmdb_anime_response = upstream.get(tmdb_anime_url)
             tmdb_anime_response.raise_for_status()
             tmdb_anime_details = tmdb_anime_response.json()
         else:
@@ -0,0 +1,192 @@
+"""
+Write-behind queue for catalog upserts triggered by page views.
+Detail pages and searches hand their TMDb payloads to the queue instead of
+writing inline, so a read request never waits on a write (or on SQLite's
+database-wide write lock). A background thread flushes the pending
+payloads in batched transactions through catalog.upsert_batch (details
+payloads also store the serialized detail JSON the API serves).
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+
+from . import catalog
+
+logger = logging.getLogger(__name__)
+
+# Pending titles before enqueue flushes inline instead of queueing more
+WRITE_BEHIND_MAX_PENDING = 1000
+WRITE_BEHIND_FLUSH_INTERVAL = 2.0  # seconds
+WRITE_BEHIND_BATCH_SIZE = 200
+
+# Content hashes of written payloads remembered to skip unchanged rewrites
+WRITTEN_HASHES_MAX = 10000
+
+PendingKey = Tuple[str, bool, int]  # (kind, detailed, TMDb ID)
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """Hash a TMDb payload's content, independent of key order."""
+    content = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class WriteBehindQueue:
+    """
+    Pending catalog upserts, deduplicated by title and flushed in batches.
+
+    A payload replaces any pending payload of the same title, and is
+    dropped if it hashes the same as the last one written for it. When
+    max_pending titles are waiting, the enqueueing thread flushes them
+    itself, so the queue never grows without bound.
+    """
+
+    def __init__(self, max_pending: int = WRITE_BEHIND_MAX_PENDING,
+                 flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+                 batch_size: int = WRITE_BEHIND_BATCH_SIZE, background: bool = True):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.background = background
+        self._pending: Dict[PendingKey, Tuple[Dict[str, Any], str]] = {}
+        self._written: 'OrderedDict[PendingKey, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, kind: str, payloads: Iterable[Dict[str, Any]], detailed: bool = False) -> int:
+        """
+        Queue TMDb payloads to be upserted.
+
+        Args:
+            kind: 'movie' or 'tv'
+            payloads: TMDb list results or details payloads
+            detailed: Whether the payloads are details payloads
+
+        Returns:
+            Number of payloads queued (unchanged ones are skipped)
+        """
+        queued = 0
+        with self._lock:
+            for payload in payloads:
+                if not payload.get('id'):
+                    continue
+                key = (kind, detailed, payload['id'])
+                digest = payload_hash(payload)
+                if self._written.get(key) == digest:
+                    continue  # Same content as the last write
+                self._pending[key] = (payload, digest)
+                queued += 1
+            full = len(self._pending) >= self.max_pending
+            if self.background and self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._worker.start()
+
+        if full:
+            self.flush()
+        return queued
+
+    def flush(self) -> int:
+        """
+        Write every pending payload now, one transaction per batch.
+
+        A batch that fails is logged and dropped; the next view of those
+        titles queues them again.
+
+        Returns:
+            Number of payloads written
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+
+            groups: Dict[Tuple[str, bool], List[Tuple[PendingKey, Dict[str, Any], str]]] = {}
+            for key, (payload, digest) in pending.items():
+                groups.setdefault(key[:2], []).append((key, payload, digest))
+
+            written = 0
+            for (kind, detailed), items in groups.items():
+                for start in range(0, len(items), self.batch_size):
+                    batch = items[start:start + self.batch_size]
+                    try:
+                        write_payloads(kind, [payload for _, payload, _ in batch], detailed)
+                    except DatabaseError:
+                        logger.exception(f'Write-behind flush of {len(batch)} {kind} titles failed')
+                        continue
+                    with self._lock:
+                        for key, _, digest in batch:
+                            self._remember(key, digest)
+                    written += len(batch)
+            return written
+
+    def stop(self) -> None:
+        """Stop the background thread and write whatever is still pending."""
+        self._stopping.set()
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+        self.flush()
+
+    def _remember(self, key: PendingKey, digest: str) -> None:
+        self._written[key] = digest
+        self._written.move_to_end(key)
+        while len(self._written) > WRITTEN_HASHES_MAX:
+            self._written.popitem(last=False)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Write-behind flush failed')
+            finally:
+                close_old_connections()
+
+
+def write_payloads(kind: str, payloads: List[Dict[str, Any]], detailed: bool = False) -> None:
+    """Upsert TMDb payloads now; details payloads also get their stored detail JSON."""
+    if detailed:
+        # api_views imports this module (through search), so it is imported on use
+        from .api_views import store_detail_payloads
+        store_detail_payloads(kind, payloads)
+    else:
+        catalog.upsert_batch(catalog.CATALOG_KINDS[kind], payloads)
+
+
+_queue = WriteBehindQueue()
+atexit.register(_queue.stop)
+
+
+def enqueue_upserts(kind: str, payloads: Iterable[Dict[str, Any]], detailed: bool = False) -> None:
+    """
+    Store TMDb payloads without holding up the current request.
+
+    Payloads go to the write-behind queue, or are upserted right away
+    when settings.WRITE_BEHIND_ENABLED is off.
+
+    Args:
+        kind: 'movie' or 'tv'
+        payloads: TMDb list results or details payloads
+        detailed: Whether the payloads are details payloads
+    """
+    if getattr(settings, 'WRITE_BEHIND_ENABLED', True):
+        _queue.enqueue(kind, payloads, detailed)
+    else:
+        write_payloads(kind, [payload for payload in payloads if payload.get('id')], detailed)
+
+
+def flush() -> int:
+    """Write all pending payloads now (e.g. before shutdown or in tests)."""
+    return _queue.flush()